@@ -1,18 +1,139 @@
+from typing import Callable, Optional, TypeVar
+from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from .config import settings
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _pool_options(url: str) -> dict:
+    """Pool sizing for the engine; in-memory SQLite uses a per-thread pool that takes none"""
+    if make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {"pool_size": settings.database_pool_size, "max_overflow": settings.database_max_overflow}
+
+
+# The engine (dialect, driver import, pool) is built on first use rather than
+# at import, so a serverless cold start that never touches the database, or
+# touches it late, doesn't pay for it up front
+_engine = None
+_sessionmaker = None
 
 Base = declarative_base()
 
+T = TypeVar("T")
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(settings.database_url, **_pool_options(settings.database_url))
+    return _engine
+
+
+def get_sessionmaker():
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _sessionmaker
+
+
+def __getattr__(name: str):
+    # `from app.database import engine, SessionLocal` keeps working, creating them on demand
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_schema() -> None:
+    """Create missing tables for every model.
+
+    Runs at import outside serverless mode; serverless deployments run
+    `python -m app.schema` as a deploy step instead.
+    """
+    Base.metadata.create_all(bind=get_engine())
+
 
 def get_db():
     """Dependency to get database session"""
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+# ========== Async engine (ASYNC_DATABASE=true) ==========
+# Async drivers for each sync dialect; asyncpg takes `ssl` where libpq takes `sslmode`
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver equivalent of a sync database URL"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    parsed = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+def get_async_sessionmaker():
+    """Async session factory, creating the async engine on first use"""
+    global _async_engine, _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        _async_engine = create_async_engine(
+            async_database_url(settings.database_url), **_pool_options(settings.database_url)
+        )
+        _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_sessionmaker
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+class DatabaseRunner:
+    """Runs synchronous ORM code from async routes without blocking the event loop.
+
+    With the async engine the code runs on an AsyncSession's connection via
+    `run_sync`; otherwise on a regular Session in the threadpool. Either way
+    route logic written against `Session` is reused unchanged.
+    """
+
+    def __init__(self, session: Optional[Session] = None, async_session=None):
+        self._session = session
+        self._async_session = async_session
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self._async_session is not None:
+            return await self._async_session.run_sync(fn, *args)
+        return await run_in_threadpool(fn, self._session, *args)
+
+
+# The runner reuses the request's session, so a route that also depends on
+# get_current_user holds one pooled connection rather than two
+async def _get_db_runner_sync(db: Session = Depends(get_db)):
+    return DatabaseRunner(session=db)
+
+
+async def _get_db_runner_async(db=Depends(get_async_db)):
+    return DatabaseRunner(async_session=db)
+
+
+# Dependency for async routes: a DatabaseRunner over the configured engine
+get_db_runner = _get_db_runner_async if settings.async_database else _get_db_runner_sync
@@ -1,12 +1,26 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
-from .database import engine, Base
-from .routers import auth, components, forum
+from .config import settings
+from .database import create_schema
+from .routers import advisor, auth, components, compatibility, forum, watches
+# Importing the projection services registers their flush hooks
+from .services import (  # noqa: F401
+    compatibility as compatibility_index,
+    forum_search,
+    price_history,
+    price_stream,
+    price_summary,
+    price_watch,
+    search,
+    spec_attributes,
+)
 import os
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables. Serverless cold starts skip this round trip and
+# reflection; the schema is applied at deploy time with `python -m app.schema`
+if not settings.serverless:
+    create_schema()
 
 app = FastAPI(
     title="PCease API",
@@ -32,12 +46,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(components.router)
+app.include_router(compatibility.router)
+app.include_router(advisor.router)
 app.include_router(forum.router)
+app.include_router(watches.router)
 
 
 @app.get("/")
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Numeric, Float, Boolean, DateTime, ForeignKey, JSON, Index, UniqueConstraint, DDL, event
+from sqlalchemy.dialects import postgresql  # noqa: F401  typed to_tsvector() for the GIN index expressions
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from ..database import Base
 
 
@@ -28,9 +29,92 @@ class Component(Base):
     image_url = Column(String(500))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # Keyset pagination by name
+    __table_args__ = (
+        Index("ix_components_name_id", "name", "id"),
+    )
+    
     # Relationships
     category = relationship("Category", back_populates="components")
     prices = relationship("ComponentPrice", back_populates="component")
+    price_summary = relationship("ComponentPriceSummary", back_populates="component", uselist=False)
+    search_document = relationship("ComponentSearchDocument", back_populates="component", uselist=False)
+    attributes = relationship("ComponentAttribute", back_populates="component")
+    compatibility_keys = relationship("ComponentCompatibilityKey", back_populates="component")
+
+
+class ComponentAttribute(Base):
+    """Typed spec value parsed from Component.specs (e.g. boost_clock=5400 MHz, socket=AM5)"""
+    __tablename__ = "component_attributes"
+    
+    component_id = Column(Integer, ForeignKey("components.id"), primary_key=True)
+    name = Column(String(100), primary_key=True)
+    num_value = Column(Float)  # in the canonical unit below
+    text_value = Column(String(255))
+    unit = Column(String(20))
+    
+    # Range and equality filters scan one index slice per attribute
+    __table_args__ = (
+        Index("ix_component_attributes_num", "name", "num_value", "component_id"),
+        Index("ix_component_attributes_text", "name", "text_value", "component_id"),
+    )
+    
+    # Relationships
+    component = relationship("Component", back_populates="attributes")
+
+
+class ComponentCompatibilityKey(Base):
+    """Precomputed compatibility key, e.g. rule "socket" / key "AM5" for a CPU or motherboard"""
+    __tablename__ = "component_compatibility_keys"
+    
+    component_id = Column(Integer, ForeignKey("components.id"), primary_key=True)
+    rule = Column(String(50), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    
+    # Finds every component sharing a key, e.g. all AM5 motherboards
+    __table_args__ = (
+        Index("ix_compatibility_keys_rule_key", "rule", "key", "component_id"),
+    )
+    
+    # Relationships
+    component = relationship("Component", back_populates="compatibility_keys")
+
+
+class ComponentSearchDocument(Base):
+    """Flattened searchable text for a component, rebuilt whenever the component is written"""
+    __tablename__ = "component_search_documents"
+    
+    component_id = Column(Integer, ForeignKey("components.id"), primary_key=True)
+    title = Column(Text, nullable=False)  # name + brand, ranked highest
+    body = Column(Text, nullable=False)  # flattened spec values
+    
+    # Relationships
+    component = relationship("Component", back_populates="search_document")
+
+
+def component_search_vector():
+    """Weighted tsvector over a search document; must match the GIN index expression exactly"""
+    # text() rather than literal_column(): a table-less column in the expression
+    # would keep the Index from finding its table, so it would never be created
+    config = text("'simple'::regconfig")
+    return func.setweight(func.to_tsvector(config, ComponentSearchDocument.title), text("'A'")).op("||")(
+        func.setweight(func.to_tsvector(config, ComponentSearchDocument.body), text("'B'"))
+    )
+
+
+# Postgres-only search indexes; other dialects use the in-process index in services.search
+event.listen(
+    ComponentSearchDocument.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+Index("ix_component_search_vector", component_search_vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
+Index(
+    "ix_component_search_title_trgm",
+    ComponentSearchDocument.title,
+    postgresql_using="gin",
+    postgresql_ops={"title": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
 
 
 class Vendor(Base):
@@ -49,18 +133,69 @@ class ComponentPrice(Base):
     __tablename__ = "component_prices"
     
     id = Column(Integer, primary_key=True, index=True)
-    component_id = Column(Integer, ForeignKey("components.id"), nullable=False)
+    component_id = Column(Integer, ForeignKey("components.id"), nullable=False, index=True)
     vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
     price = Column(Numeric(12, 2), nullable=False)
     in_stock = Column(Boolean, default=True)
     url = Column(String(500))
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # One offer per vendor per component; price feeds upsert against it
+    __table_args__ = (
+        UniqueConstraint("component_id", "vendor_id", name="uq_component_prices_component_vendor"),
+    )
+    
     # Relationships
     component = relationship("Component", back_populates="prices")
     vendor = relationship("Vendor", back_populates="prices")
 
 
+class ComponentPriceSummary(Base):
+    """Per-component projection of ComponentPrice, kept in sync on every price write"""
+    __tablename__ = "component_price_summaries"
+    
+    component_id = Column(Integer, ForeignKey("components.id"), primary_key=True)
+    lowest_price = Column(Numeric(12, 2))
+    lowest_in_stock_price = Column(Numeric(12, 2))
+    vendor_count = Column(Integer, nullable=False, default=0)
+    in_stock = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Composite indexes double as tie-broken sort keys for price ordering
+    __table_args__ = (
+        Index("ix_price_summary_lowest_price", "lowest_price", "component_id"),
+        Index("ix_price_summary_in_stock_price", "lowest_in_stock_price", "component_id"),
+    )
+    
+    # Relationships
+    component = relationship("Component", back_populates="price_summary")
+
+
+class ComponentPriceHistory(Base):
+    """Append-only log of vendor price observations.
+    
+    Every price write appends a raw point (low = high = price). Compaction
+    folds raw points older than the retention window into one daily row per
+    component and vendor holding the day's low, high and closing price.
+    """
+    __tablename__ = "component_price_history"
+    
+    id = Column(Integer, primary_key=True)
+    component_id = Column(Integer, ForeignKey("components.id"), nullable=False)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), nullable=False)
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    price = Column(Numeric(12, 2), nullable=False)  # closing price for daily rows
+    low_price = Column(Numeric(12, 2), nullable=False)
+    high_price = Column(Numeric(12, 2), nullable=False)
+    in_stock = Column(Boolean, nullable=False, default=True)
+    is_daily = Column(Boolean, nullable=False, default=False)
+    
+    # Range reads scan one component's points in time order
+    __table_args__ = (
+        Index("ix_price_history_component_time", "component_id", "recorded_at"),
+    )
+
+
 class Build(Base):
     __tablename__ = "builds"
     
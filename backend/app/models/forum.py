@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects import postgresql  # noqa: F401  typed to_tsvector() for the GIN index expressions
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from ..database import Base
 
 
@@ -15,9 +16,24 @@ class ForumThread(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Denormalized from forum_replies, maintained by services.forum_activity;
+    # last_activity_at is the thread's creation or its latest reply
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_reply_at = Column(DateTime(timezone=True))
+    last_activity_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    # Keyset pagination by newest first and by latest activity
+    __table_args__ = (
+        Index("ix_forum_threads_created_at_id", "created_at", "id"),
+        Index("ix_forum_threads_last_activity_at_id", "last_activity_at", "id"),
+    )
+    
     # Relationships
     author = relationship("User", back_populates="threads")
     replies = relationship("ForumReply", back_populates="thread", cascade="all, delete-orphan")
+    search_document = relationship(
+        "ForumSearchDocument", back_populates="thread", uselist=False, cascade="all, delete-orphan"
+    )
 
 
 class ForumReply(Base):
@@ -29,6 +45,40 @@ class ForumReply(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    # Replies of a thread in posting order, for keyset paging
+    __table_args__ = (
+        Index("ix_forum_replies_thread_created_at_id", "thread_id", "created_at", "id"),
+    )
+    
     # Relationships
     thread = relationship("ForumThread", back_populates="replies")
     author = relationship("User", back_populates="replies")
+
+
+class ForumSearchDocument(Base):
+    """Searchable text for a thread: rebuilt when the thread is edited, appended to on each reply"""
+    __tablename__ = "forum_search_documents"
+    
+    thread_id = Column(Integer, ForeignKey("forum_threads.id"), primary_key=True)
+    title = Column(Text, nullable=False)  # ranked highest
+    body = Column(Text, nullable=False)  # the opening post
+    replies = Column(Text, nullable=False, default="", server_default="")  # every reply, in posting order
+    
+    # Relationships
+    thread = relationship("ForumThread", back_populates="search_document")
+
+
+def forum_search_vector():
+    """Weighted tsvector over a forum document; must match the GIN index expression exactly"""
+    # text() rather than literal_column(): a table-less column in the expression
+    # would keep the Index from finding its table, so it would never be created
+    config = text("'simple'::regconfig")
+    return func.setweight(func.to_tsvector(config, ForumSearchDocument.title), text("'A'")).op("||")(
+        func.setweight(func.to_tsvector(config, ForumSearchDocument.body), text("'B'"))
+    ).op("||")(
+        func.setweight(func.to_tsvector(config, ForumSearchDocument.replies), text("'C'"))
+    )
+
+
+# Postgres-only; other dialects use the in-process index in services.forum_search
+Index("ix_forum_search_vector", forum_search_vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, Numeric, Boolean, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class PriceWatch(Base):
+    """A user's target price for a component; fires once when any offer drops to it"""
+    __tablename__ = "price_watches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    component_id = Column(Integer, ForeignKey("components.id"), nullable=False)
+    target_price = Column(Numeric(12, 2), nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    triggered_at = Column(DateTime(timezone=True))
+    triggered_price = Column(Numeric(12, 2))
+    
+    # Sorted thresholds per component: a price change range-scans only the
+    # watches whose target lies between the old and new price
+    __table_args__ = (
+        Index("ix_price_watches_component_target", "component_id", "is_active", "target_price"),
+    )
+    
+    # Relationships
+    component = relationship("Component")
+
+
+class Notification(Base):
+    """Outbox of notifications for a dispatcher (email, push) to deliver"""
+    __tablename__ = "notifications"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    kind = Column(String(50), nullable=False)  # price_alert
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True))
+    
+    __table_args__ = (
+        Index("ix_notifications_user_id_id", "user_id", "id"),
+        Index("ix_notifications_sent_at_id", "sent_at", "id"),
+    )
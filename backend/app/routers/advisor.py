@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..schemas.component import AdvisorRequest, AdvisorRecommendation
+from ..services.optimizer import recommend_build, NoBuildFound
+
+router = APIRouter(prefix="/api/advisor", tags=["Advisor"])
+
+
+@router.post("/recommend", response_model=AdvisorRecommendation)
+def recommend(request: AdvisorRequest, db: Session = Depends(get_db)):
+    """Recommend the best compatible build under a budget for a use case"""
+    try:
+        return recommend_build(db, float(request.budget), request.profile)
+    except NoBuildFound as e:
+        raise HTTPException(status_code=422, detail=str(e))
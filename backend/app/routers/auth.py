@@ -1,24 +1,24 @@
 from datetime import timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db_runner, DatabaseRunner
 from ..models.user import User
 from ..schemas.user import UserCreate, UserResponse, Token
 from ..utils.auth import (
-    verify_password,
-    get_password_hash,
+    hash_password,
+    verify_and_update_password,
     create_access_token,
-    get_current_user
+    get_current_user,
+    Principal
 )
 from ..config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user"""
+def _check_available(db: Session, user: UserCreate) -> None:
     # Check if email exists
     if db.query(User).filter(User.email == user.email).first():
         raise HTTPException(
@@ -32,12 +32,13 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
-    
-    # Create new user
+
+
+def _create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     db_user = User(
         email=user.email,
         username=user.username,
-        hashed_password=get_password_hash(user.password)
+        hashed_password=hashed_password
     )
     db.add(db_user)
     db.commit()
@@ -45,29 +46,57 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 
+def _find_user(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _store_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+# Hashing runs on a dedicated bcrypt pool and queries through the runner, so
+# a burst of sign-ins neither blocks the event loop nor fills the threadpool
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register(user: UserCreate, db: DatabaseRunner = Depends(get_db_runner)):
+    """Register a new user"""
+    await db.run(_check_available, user)
+    hashed_password = await hash_password(user.password)
+    return await db.run(_create_user, user, hashed_password)
+
+
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: DatabaseRunner = Depends(get_db_runner)
 ):
-    """Login and get access token"""
-    user = db.query(User).filter(User.email == form_data.username).first()
+    """Login and get access token.
+
+    A stored hash made with an older bcrypt cost is replaced on success.
+    """
+    user = await db.run(_find_user, form_data.username)
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        await db.run(_store_password_hash, user, new_hash)
+    
     access_token = create_access_token(
-        data={"sub": user.id},
+        data={"sub": str(user.id)},  # JWT subjects must be strings
         expires_delta=timedelta(minutes=settings.access_token_expire_minutes)
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: Principal = Depends(get_current_user)):
     """Get current authenticated user"""
     return current_user
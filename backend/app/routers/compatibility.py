@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..schemas.component import CompatibilityCheck, CompatibilityReport
+from ..services.compatibility import check_build
+
+router = APIRouter(prefix="/api/compatibility", tags=["Compatibility"])
+
+
+@router.post("/check", response_model=CompatibilityReport)
+def check_compatibility(build: CompatibilityCheck, db: Session = Depends(get_db)):
+    """Check a build for socket, memory, form factor and power compatibility"""
+    try:
+        return check_build(db, build.components.values())
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Components not found: {e.args[0]}")
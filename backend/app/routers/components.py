@@ -1,26 +1,55 @@
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
-from ..database import get_db
-from ..models.component import Category, Component, Vendor, ComponentPrice, Build
-from ..models.user import User
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import or_, tuple_
+from ..config import settings
+from ..database import get_db, get_db_runner, DatabaseRunner
+from ..models.component import Category, Component, Vendor, ComponentPrice, ComponentPriceSummary, Build
 from ..schemas.component import (
     CategoryResponse, CategoryCreate,
-    ComponentResponse, ComponentCreate, ComponentDetailResponse,
-    VendorResponse, VendorCreate,
-    BuildResponse, BuildCreate
+    ComponentResponse, ComponentCreate, ComponentDetailResponse, ComponentFacetsResponse, PriceHistoryResponse,
+    VendorResponse, VendorCreate, PriceFeedReport,
+    BuildResponse, BuildCreate, BuildPriceRequest, BuildPriceResponse
 )
-from ..utils.auth import get_current_user
+from ..services.catalog_cache import catalog_cache
+from ..services.facets import compute_facets
+from ..services.price_feed import FeedRowError, detect_format, ingest_feed
+from ..services.price_history import get_price_series
+from ..services.price_stream import price_stream
+from ..services.pricing import price_build
+from ..services.search import apply_component_search
+from ..services.spec_attributes import apply_spec_filters
+from ..utils.auth import get_current_user, Principal
+from ..utils.http_cache import conditional_response, conditional_response_async, render_json, render_trusted_json
+from ..utils.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from ..utils.sse import event_stream_response, require_streaming, too_many_streams
 
 router = APIRouter(prefix="/api", tags=["Components"])
 
+# Cache-Control per route. Catalog responses carry content-hash ETags, so
+# short max-ages are cheap: once they lapse, clients revalidate and get a 304.
+CACHE_CONTROL = {
+    "categories": "public, max-age=300",
+    "vendors": "public, max-age=300",
+    "stats": "public, max-age=60",
+    "components": "public, max-age=0, must-revalidate",
+    "component": "public, max-age=60",
+    "facets": "public, max-age=60",
+    "price_history": "public, max-age=300",
+    "builds": "private, no-store",
+}
+
 
 # ========== Categories ==========
 @router.get("/categories", response_model=List[CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(request: Request, db: Session = Depends(get_db)):
     """Get all component categories"""
-    return db.query(Category).all()
+    return conditional_response(
+        request, catalog_cache, ("categories",),
+        lambda: render_json([CategoryResponse.model_validate(c) for c in db.query(Category).all()]),
+        CACHE_CONTROL["categories"]
+    )
 
 
 @router.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
@@ -34,55 +63,270 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
 
 
 # ========== Components ==========
+def _filter_components(query, db, category=None, brand=None, min_price=None, max_price=None, search=None, spec=(),
+                       search_limit=None):
+    """Apply the shared listing filters to a query joined to the price summary.
+    
+    Returns the filtered query and a search rank expression (None without a search).
+    `search_limit` keeps only that many of the best search matches.
+    """
+    # Filter by category
+    if category:
+        query = query.filter(Component.category_id.in_(
+            db.query(Category.id).filter(Category.slug == category)
+        ))
+    
+    # Filter by brand
+    if brand:
+        query = query.filter(Component.brand == brand)
+    
+    # Filter by lowest vendor price (from the maintained price summary)
+    if min_price is not None:
+        query = query.filter(ComponentPriceSummary.lowest_price >= min_price)
+    if max_price is not None:
+        query = query.filter(ComponentPriceSummary.lowest_price <= max_price)
+    
+    # Typed spec filters like "tdp<=65" or "socket=AM5"
+    if spec:
+        query = apply_spec_filters(query, spec)
+    
+    # Full-text search over name, brand and spec values, within the other filters
+    rank = None
+    if search:
+        query, rank = apply_component_search(query, db, search, search_limit)
+    
+    return query, rank
+
+
 @router.get("/components", response_model=List[ComponentResponse])
-def get_components(
+async def get_components(
+    request: Request,
     category: Optional[str] = None,
     brand: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     search: Optional[str] = None,
-    sort: str = Query("price-low", pattern="^(price-low|price-high|name)$"),
+    spec: List[str] = Query([]),
+    sort: str = Query("price-low", pattern="^(price-low|price-high|name|relevance)$"),
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    db: DatabaseRunner = Depends(get_db_runner)
 ):
-    """Get components with optional filters"""
-    query = db.query(Component).options(joinedload(Component.category))
+    """Get components with optional filters.
     
-    # Filter by category
-    if category:
-        query = query.join(Category).filter(Category.slug == category)
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the
+    next page by keyset instead of `skip`; the header is absent on the last page.
+    `sort=relevance` ranks search matches and pages by `skip` only.
+    Repeat `spec` for typed spec filters, e.g. `spec=tdp<=65&spec=boost_clock>=5GHz`.
+    """
+    def load(session: Session):
+        components, next_cursor = _list_components(
+            session, category, brand, min_price, max_price, search, spec, sort, skip, limit, cursor,
+            rows=settings.fast_serialization
+        )
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+        if settings.fast_serialization:
+            return render_trusted_json([_component_row_dict(row) for row in components], headers)
+        return render_json([ComponentResponse.model_validate(c) for c in components], headers)
     
-    # Filter by brand
-    if brand:
-        query = query.filter(Component.brand == brand)
-    
-    # Search by name
-    if search:
-        query = query.filter(Component.name.ilike(f"%{search}%"))
+    key = ("components", tuple(sorted(request.query_params.multi_items())))
+    return await conditional_response_async(
+        request, catalog_cache, key, lambda: db.run(load), CACHE_CONTROL["components"]
+    )
+
+
+# ComponentResponse's fields as plain columns, for the fast serialization path
+_COMPONENT_ROW_COLUMNS = (
+    Component.name, Component.brand, Component.specs, Component.image_url,
+    Component.id, Component.category_id, Component.created_at,
+    ComponentPriceSummary.component_id.label("summary_component_id"),
+    ComponentPriceSummary.lowest_price, ComponentPriceSummary.lowest_in_stock_price,
+    ComponentPriceSummary.vendor_count, ComponentPriceSummary.in_stock,
+)
+
+
+def _component_row_dict(row) -> dict:
+    """A listing row in ComponentResponse's shape and field order"""
+    summary = None
+    if row.summary_component_id is not None:
+        summary = {
+            "lowest_price": row.lowest_price,
+            "lowest_in_stock_price": row.lowest_in_stock_price,
+            "vendor_count": row.vendor_count,
+            "in_stock": row.in_stock,
+        }
+    return {
+        "name": row.name,
+        "brand": row.brand,
+        "specs": row.specs,
+        "image_url": row.image_url,
+        "id": row.id,
+        "category_id": row.category_id,
+        "created_at": row.created_at,
+        "price_summary": summary,
+    }
+
+
+def _list_components(db, category, brand, min_price, max_price, search, spec, sort, skip, limit, cursor, rows=False):
+    """Run the listing query; returns the page and the next cursor (None on the last page).
     
-    # Price filtering would require joining with prices
-    # For now, we'll handle this in a more complex query if needed
+    With `rows`, the page holds column rows for `_component_row_dict` instead of ORM objects.
+    """
+    if rows:
+        query = db.query(*_COMPONENT_ROW_COLUMNS).select_from(Component).outerjoin(Component.price_summary)
+    else:
+        query = db.query(Component).outerjoin(Component.price_summary).options(
+            joinedload(Component.category),
+            contains_eager(Component.price_summary)
+        )
+    # A relevance page needs only the best matches up to its end; other orders need them all
+    search_limit = skip + limit if sort == "relevance" and not cursor else None
+    query, rank = _filter_components(query, db, category, brand, min_price, max_price, search, spec, search_limit)
     
-    # Sorting
+    # Sorting (id breaks ties so pages are stable); unpriced components go last
+    price = ComponentPriceSummary.lowest_price
+    if sort == "relevance" and rank is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported for relevance sort")
+        return query.order_by(rank.desc(), Component.id).offset(skip).limit(limit).all(), None
     if sort == "name":
-        query = query.order_by(Component.name)
+        query = query.order_by(Component.name, Component.id)
+    elif sort == "price-high":
+        query = query.order_by(price.desc().nulls_last(), Component.id.desc())
+    else:
+        query = query.order_by(price.asc().nulls_last(), Component.id)
+    
+    # Keyset pagination: continue strictly after the last row of the previous page
+    if cursor:
+        last_key, last_id = decode_cursor(cursor, sort, 2)
+        if sort == "name":
+            query = query.filter(tuple_(Component.name, Component.id) > (last_key, last_id))
+        elif last_key is None:
+            id_after = Component.id < last_id if sort == "price-high" else Component.id > last_id
+            query = query.filter(price.is_(None), id_after)
+        elif sort == "price-high":
+            query = query.filter(or_(tuple_(price, Component.id) < (last_key, last_id), price.is_(None)))
+        else:
+            query = query.filter(or_(tuple_(price, Component.id) > (last_key, last_id), price.is_(None)))
+    else:
+        query = query.offset(skip)
     
-    return query.offset(skip).limit(limit).all()
+    components = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(components) > limit:
+        components = components[:limit]
+        last = components[-1]
+        if sort == "name":
+            last_key = last.name
+        elif rows:
+            last_key = last.lowest_price
+        else:
+            last_key = last.price_summary.lowest_price if last.price_summary else None
+        next_cursor = encode_cursor(sort, last_key, last.id)
+    
+    return components, next_cursor
+
+
+@router.get("/components/facets", response_model=ComponentFacetsResponse)
+def get_component_facets(
+    response: Response,
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    search: Optional[str] = None,
+    spec: List[str] = Query([]),
+    db: Session = Depends(get_db)
+):
+    """Get brand, category, socket, memory type and price bucket counts for a filter set.
+    
+    Takes the same filters as the component listing. Category and brand counts
+    ignore their own filter so every option shows what selecting it would return.
+    """
+    query = db.query(Component).outerjoin(Component.price_summary)
+    query, _ = _filter_components(query, db, None, None, min_price, max_price, search, spec)
+    response.headers["Cache-Control"] = CACHE_CONTROL["facets"]
+    return compute_facets(query, category=category, brand=brand)
 
 
 @router.get("/components/{component_id}", response_model=ComponentDetailResponse)
-def get_component(component_id: int, db: Session = Depends(get_db)):
+async def get_component(component_id: int, request: Request, db: DatabaseRunner = Depends(get_db_runner)):
     """Get component details with prices"""
-    component = db.query(Component).options(
-        joinedload(Component.category),
-        joinedload(Component.prices).joinedload(ComponentPrice.vendor)
-    ).filter(Component.id == component_id).first()
+    def load(session: Session):
+        component = session.query(Component).options(
+            joinedload(Component.category),
+            joinedload(Component.prices).joinedload(ComponentPrice.vendor)
+        ).filter(Component.id == component_id).first()
+        
+        if not component:
+            raise HTTPException(status_code=404, detail="Component not found")
+        
+        return render_json(ComponentDetailResponse.model_validate(component))
     
-    if not component:
+    return await conditional_response_async(
+        request, catalog_cache, ("component", component_id), lambda: db.run(load), CACHE_CONTROL["component"]
+    )
+
+
+@router.get("/components/{component_id}/price-history", response_model=PriceHistoryResponse)
+def get_component_price_history(
+    component_id: int,
+    response: Response,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    vendor_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a component's price series per vendor, defaulting to the last 90 days.
+    
+    Recent points are individual vendor updates; older ones are daily rows
+    with the day's low, high and closing price.
+    """
+    if not db.query(Component.id).filter(Component.id == component_id).first():
         raise HTTPException(status_code=404, detail="Component not found")
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=90)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    response.headers["Cache-Control"] = CACHE_CONTROL["price_history"]
+    return {
+        "component_id": component_id,
+        "start": start,
+        "end": end,
+        "vendors": get_price_series(db, component_id, start, end, vendor_id),
+    }
+
+
+@router.get("/prices/stream")
+async def stream_prices(request: Request, ids: List[int] = Query(...)):
+    """Server-sent lowest-price updates for the components of an open build.
+    
+    The first `prices` event holds the current price summary of every
+    requested component (null when it has no offers); later ones hold only
+    the components whose summary changed, at most one event per update
+    interval. A client that reconnects, or receives `evicted`, starts again
+    from a fresh snapshot.
+    """
+    require_streaming()
+    component_ids = sorted(set(ids))
+    if len(component_ids) > settings.price_stream_max_components:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.price_stream_max_components} components per price stream"
+        )
     
-    return component
+    # Subscribe before reading the snapshot so no committed change falls in between
+    subscription = price_stream.subscribe(component_ids)
+    if subscription is None:
+        raise too_many_streams()
+    try:
+        price_stream.send_snapshot(subscription, await price_stream.load(component_ids))
+    except Exception:
+        price_stream.unsubscribe(subscription)
+        raise
+    return event_stream_response(request, subscription, price_stream.unsubscribe)
 
 
 @router.post("/components", response_model=ComponentResponse, status_code=status.HTTP_201_CREATED)
@@ -97,9 +341,13 @@ def create_component(component: ComponentCreate, db: Session = Depends(get_db)):
 
 # ========== Vendors ==========
 @router.get("/vendors", response_model=List[VendorResponse])
-def get_vendors(db: Session = Depends(get_db)):
+def get_vendors(request: Request, db: Session = Depends(get_db)):
     """Get all vendors"""
-    return db.query(Vendor).all()
+    return conditional_response(
+        request, catalog_cache, ("vendors",),
+        lambda: render_json([VendorResponse.model_validate(v) for v in db.query(Vendor).all()]),
+        CACHE_CONTROL["vendors"]
+    )
 
 
 @router.post("/vendors", response_model=VendorResponse, status_code=status.HTTP_201_CREATED)
@@ -112,36 +360,55 @@ def create_vendor(vendor: VendorCreate, db: Session = Depends(get_db)):
     return db_vendor
 
 
+# ========== Price Feeds ==========
+@router.post("/price-feeds", response_model=PriceFeedReport)
+def upload_price_feed(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    vendor_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Bulk upsert vendor prices from a CSV or NDJSON feed (admin only in production).
+    
+    Rows carry `component_id` or `component` (name), `vendor_id` or `vendor`,
+    `price`, and optionally `in_stock` and `url`. Pass `vendor_id` to push a
+    single vendor's feed without a vendor column. Bad rows are skipped and
+    reported with their line numbers; a CSV record the parser cannot read
+    (e.g. an oversized field) is reported the same way and ends the feed.
+    """
+    fmt = format or detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Cannot tell the feed format, pass format=csv or format=ndjson")
+    try:
+        return ingest_feed(db, file.file, fmt, vendor_id)
+    except FeedRowError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Feed must be UTF-8 encoded")
+
+
 # ========== Builds ==========
 @router.get("/builds", response_model=List[BuildResponse])
-def get_builds(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_builds(
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
+    db: DatabaseRunner = Depends(get_db_runner)
 ):
     """Get current user's saved builds"""
-    return db.query(Build).filter(Build.user_id == current_user.id).all()
+    response.headers["Cache-Control"] = CACHE_CONTROL["builds"]
+    return await db.run(lambda session: session.query(Build).filter(Build.user_id == current_user.id).all())
 
 
 @router.post("/builds", response_model=BuildResponse, status_code=status.HTTP_201_CREATED)
 def create_build(
     build: BuildCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Save a new build"""
-    # Calculate total price from components
-    total_price = 0
-    if build.components:
-        for category, component_id in build.components.items():
-            component = db.query(Component).filter(Component.id == component_id).first()
-            if component:
-                # Get lowest price for this component
-                lowest_price = db.query(ComponentPrice).filter(
-                    ComponentPrice.component_id == component_id
-                ).order_by(ComponentPrice.price).first()
-                if lowest_price:
-                    total_price += float(lowest_price.price)
-    
+    # Price every component in one query
+    total_price = price_build(db, build.components)["total_price"] if build.components else 0
+
     db_build = Build(
         user_id=current_user.id,
         name=build.name,
@@ -154,10 +421,16 @@ def create_build(
     return db_build
 
 
+@router.post("/builds/price", response_model=BuildPriceResponse)
+def price_build_components(request: BuildPriceRequest, db: Session = Depends(get_db)):
+    """Price a build without saving it: cheapest total plus a per-vendor breakdown"""
+    return price_build(db, request.components)
+
+
 @router.delete("/builds/{build_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_build(
     build_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a build"""
@@ -175,10 +448,17 @@ def delete_build(
 
 # ========== Statistics ==========
 @router.get("/stats")
-def get_stats(db: Session = Depends(get_db)):
+def get_stats(request: Request, db: Session = Depends(get_db)):
     """Get platform statistics"""
-    return {
+    return conditional_response(request, catalog_cache, ("stats",), lambda: render_json({
         "categories": db.query(Category).count(),
         "components": db.query(Component).count(),
         "vendors": db.query(Vendor).count()
-    }
+    }), CACHE_CONTROL["stats"])
+
+
+@router.get("/stats/cache")
+def get_cache_stats(response: Response):
+    """Catalog cache size and hit/miss counters, for sizing the cache"""
+    response.headers["Cache-Control"] = "no-store"
+    return catalog_cache.stats()
@@ -1,64 +1,143 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, tuple_
+from ..config import settings
+from ..database import get_db, get_db_runner, DatabaseRunner
 from ..models.forum import ForumThread, ForumReply
 from ..models.user import User
 from ..schemas.forum import (
     ThreadCreate, ThreadResponse, ThreadDetailResponse,
     ReplyCreate, ReplyResponse
 )
-from ..utils.auth import get_current_user
+from ..services.broker import broker
+from ..services.forum_activity import record_reply
+from ..services.forum_search import apply_forum_search, search_snippets
+from ..utils.auth import get_current_user, Principal
+from ..utils.fast_json import TrustedJSONResponse
+from ..utils.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from ..utils.sse import event_stream_response, require_streaming, too_many_streams
 
 router = APIRouter(prefix="/api/forum", tags=["Forum"])
 
+# Broker topics: every new thread and reply, and one thread's replies
+FORUM_TOPIC = "forum"
+
+
+def thread_topic(thread_id: int) -> str:
+    return f"forum:thread:{thread_id}"
+
 
 @router.get("/threads", response_model=List[ThreadResponse])
-def get_threads(
+async def get_threads(
+    response: Response,
     category: Optional[str] = None,
     search: Optional[str] = None,
+    sort: str = Query("newest", pattern="^(newest|activity|relevance)$"),
     skip: int = 0,
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1),
+    cursor: Optional[str] = None,
+    db: DatabaseRunner = Depends(get_db_runner)
 ):
-    """Get forum threads with optional filters"""
+    """Get forum threads with optional filters.
+    
+    `sort=newest` orders by creation, `sort=activity` by the latest reply
+    (or creation, for threads without replies). `search` matches titles,
+    opening posts and replies, and each result carries a highlighted
+    snippet; `sort=relevance` ranks the matches and pages by `skip` only.
+    
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the
+    next page by keyset instead of `skip`; the header is absent on the last page.
+    """
+    threads, next_cursor = await db.run(_list_threads, category, search, sort, skip, limit, cursor)
+    return _page_response(response, threads, next_cursor)
+
+
+def _page_response(response: Response, items: List[dict], next_cursor: Optional[str]):
+    """A list page with its X-Next-Cursor header; encoded directly when fast serialization is on"""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    if settings.fast_serialization:
+        return TrustedJSONResponse(items, headers=headers)
+    response.headers.update(headers)
+    return items
+
+
+def _list_threads(db: Session, category, search, sort, skip, limit, cursor):
+    """Run the thread listing query; returns the page and the next cursor (None on the last page)"""
+    sort_column = ForumThread.last_activity_at if sort == "activity" else ForumThread.created_at
     query = db.query(
         ForumThread,
-        User.username.label("author_username"),
-        func.count(ForumReply.id).label("reply_count")
-    ).join(User).outerjoin(ForumReply).group_by(ForumThread.id, User.username)
+        User.username.label("author_username")
+    ).join(User, ForumThread.author)
+    rank = None
     
     if category:
         query = query.filter(ForumThread.category == category)
     
     if search:
-        query = query.filter(ForumThread.title.ilike(f"%{search}%"))
-    
-    results = query.order_by(ForumThread.created_at.desc()).offset(skip).limit(limit).all()
-    
-    # Transform results
-    threads = []
-    for thread, author_username, reply_count in results:
-        thread_dict = {
-            "id": thread.id,
-            "user_id": thread.user_id,
-            "title": thread.title,
-            "content": thread.content,
-            "category": thread.category,
-            "created_at": thread.created_at,
-            "author_username": author_username,
-            "reply_count": reply_count
-        }
-        threads.append(thread_dict)
+        query, rank = apply_forum_search(query, db, search)
+    
+    if sort == "relevance" and rank is not None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported for relevance sort")
+        results = query.order_by(rank.desc(), ForumThread.id.desc()).offset(skip).limit(limit).all()
+        return _thread_page(db, results, search), None
+    
+    query = query.order_by(sort_column.desc(), ForumThread.id.desc())
+    
+    # Keyset pagination: continue strictly after the last thread of the previous page
+    if cursor:
+        last_key, last_id = decode_cursor(cursor, sort, 2)
+        # Compare against the stored timestamp so the key matches the database's own
+        # representation; the cursor value only matters if that thread was deleted
+        anchor = select(sort_column).where(ForumThread.id == last_id).scalar_subquery()
+        query = query.filter(
+            tuple_(sort_column, ForumThread.id) < tuple_(func.coalesce(anchor, last_key), last_id)
+        )
+    else:
+        query = query.offset(skip)
+    
+    results = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1][0]
+        last_key = last.last_activity_at if sort == "activity" else last.created_at
+        next_cursor = encode_cursor(sort, last_key, last.id)
     
+    return _thread_page(db, results, search), next_cursor
+
+
+def _thread_page(db: Session, results, search: Optional[str]) -> List[dict]:
+    threads = [_thread_dict(thread, author_username) for thread, author_username in results]
+    snippets = search_snippets(db, [t["id"] for t in threads], search) if search else {}
+    for thread in threads:
+        thread["snippet"] = snippets.get(thread["id"])
     return threads
 
 
+def _thread_dict(thread: ForumThread, author_username: Optional[str]) -> dict:
+    # Keys in ThreadResponse's field order, so fast serialization emits the same bytes;
+    # the full listing shape, so pushed and fetched threads look alike
+    return {
+        "title": thread.title,
+        "content": thread.content,
+        "category": thread.category,
+        "id": thread.id,
+        "user_id": thread.user_id,
+        "created_at": thread.created_at,
+        "author_username": author_username,
+        "reply_count": thread.reply_count,
+        "last_reply_at": thread.last_reply_at,
+        "last_activity_at": thread.last_activity_at,
+        "snippet": None
+    }
+
+
 @router.post("/threads", response_model=ThreadResponse, status_code=status.HTTP_201_CREATED)
 def create_thread(
     thread: ThreadCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new forum thread"""
@@ -72,57 +151,111 @@ def create_thread(
     db.commit()
     db.refresh(db_thread)
     
-    return {
-        "id": db_thread.id,
-        "user_id": db_thread.user_id,
-        "title": db_thread.title,
-        "content": db_thread.content,
-        "category": db_thread.category,
-        "created_at": db_thread.created_at,
-        "author_username": current_user.username,
-        "reply_count": 0
-    }
+    payload = _thread_dict(db_thread, current_user.username)
+    broker.publish(FORUM_TOPIC, "thread", payload)
+    return payload
 
 
 @router.get("/threads/{thread_id}", response_model=ThreadDetailResponse)
-def get_thread(thread_id: int, db: Session = Depends(get_db)):
-    """Get thread with all replies"""
-    thread = db.query(ForumThread).options(
-        joinedload(ForumThread.author),
-        joinedload(ForumThread.replies).joinedload(ForumReply.author)
-    ).filter(ForumThread.id == thread_id).first()
+async def get_thread(
+    thread_id: int,
+    reply_limit: int = Query(50, ge=1, le=200),
+    db: DatabaseRunner = Depends(get_db_runner)
+):
+    """Get a thread with its first page of replies, oldest first.
     
-    if not thread:
+    When more replies remain, pass `next_replies_cursor` to
+    `/threads/{thread_id}/replies` for the next page.
+    """
+    thread = await db.run(_load_thread, thread_id, reply_limit)
+    return TrustedJSONResponse(thread) if settings.fast_serialization else thread
+
+
+@router.get("/threads/{thread_id}/header", response_model=ThreadResponse)
+async def get_thread_header(thread_id: int, db: DatabaseRunner = Depends(get_db_runner)):
+    """Get a thread without its replies"""
+    return await db.run(_load_thread_header, thread_id)
+
+
+@router.get("/threads/{thread_id}/replies", response_model=List[ReplyResponse])
+async def get_replies(
+    thread_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: DatabaseRunner = Depends(get_db_runner)
+):
+    """Get a page of a thread's replies, oldest first.
+    
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next
+    page; the header is absent on the last page.
+    """
+    replies, next_cursor = await db.run(_load_replies, thread_id, limit, cursor)
+    return _page_response(response, replies, next_cursor)
+
+
+def _load_thread_header(db: Session, thread_id: int) -> dict:
+    row = db.query(ForumThread, User.username).join(User, ForumThread.author).filter(
+        ForumThread.id == thread_id
+    ).first()
+    
+    if not row:
         raise HTTPException(status_code=404, detail="Thread not found")
+    return _thread_dict(*row)
+
+
+def _load_thread(db: Session, thread_id: int, reply_limit: int) -> dict:
+    thread = _load_thread_header(db, thread_id)
+    replies, next_cursor = _reply_page(db, thread_id, reply_limit, None)
+    return {**thread, "replies": replies, "next_replies_cursor": next_cursor}
+
+
+def _load_replies(db: Session, thread_id: int, limit: int, cursor: Optional[str]):
+    # A cursor was issued for an existing thread; only a first page needs the check
+    if not cursor and not db.query(ForumThread.id).filter(ForumThread.id == thread_id).first():
+        raise HTTPException(status_code=404, detail="Thread not found")
+    return _reply_page(db, thread_id, limit, cursor)
+
+
+def _reply_page(db: Session, thread_id: int, limit: int, cursor: Optional[str]):
+    """A page of replies by (created_at, id) on the thread's index; returns it and the next cursor"""
+    query = db.query(ForumReply).filter(ForumReply.thread_id == thread_id)
+    
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, "replies", 2)
+        anchor = select(ForumReply.created_at).where(ForumReply.id == last_id).scalar_subquery()
+        query = query.filter(
+            tuple_(ForumReply.created_at, ForumReply.id) > tuple_(func.coalesce(anchor, last_created_at), last_id)
+        )
+    
+    replies = query.order_by(ForumReply.created_at, ForumReply.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(replies) > limit:
+        replies = replies[:limit]
+        next_cursor = encode_cursor("replies", replies[-1].created_at, replies[-1].id)
+    
+    # One lookup for the page's distinct authors rather than a join per reply
+    author_ids = {r.user_id for r in replies}
+    usernames = dict(
+        db.query(User.id, User.username).filter(User.id.in_(author_ids)).all()
+    ) if author_ids else {}
     
-    # Build response with usernames
-    replies = [{
+    # Keys in ReplyResponse's field order, as in _thread_dict
+    return [{
+        "content": r.content,
         "id": r.id,
         "thread_id": r.thread_id,
         "user_id": r.user_id,
-        "content": r.content,
         "created_at": r.created_at,
-        "author_username": r.author.username
-    } for r in thread.replies]
-    
-    return {
-        "id": thread.id,
-        "user_id": thread.user_id,
-        "title": thread.title,
-        "content": thread.content,
-        "category": thread.category,
-        "created_at": thread.created_at,
-        "author_username": thread.author.username,
-        "reply_count": len(replies),
-        "replies": replies
-    }
+        "author_username": usernames.get(r.user_id)
+    } for r in replies], next_cursor
 
 
 @router.post("/threads/{thread_id}/replies", response_model=ReplyResponse, status_code=status.HTTP_201_CREATED)
 def create_reply(
     thread_id: int,
     reply: ReplyCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Add a reply to a thread"""
@@ -137,23 +270,46 @@ def create_reply(
         content=reply.content
     )
     db.add(db_reply)
+    db.flush()
+    record_reply(db.connection(), thread_id)
     db.commit()
     db.refresh(db_reply)
     
-    return {
+    payload = {
+        "content": db_reply.content,
         "id": db_reply.id,
         "thread_id": db_reply.thread_id,
         "user_id": db_reply.user_id,
-        "content": db_reply.content,
         "created_at": db_reply.created_at,
         "author_username": current_user.username
     }
+    broker.publish(FORUM_TOPIC, "reply", payload)
+    broker.publish(thread_topic(thread_id), "reply", payload)
+    return payload
+
+
+@router.get("/events")
+async def forum_events(request: Request, thread_id: Optional[int] = None):
+    """Server-sent events for new forum posts, replacing polling.
+    
+    Streams `thread` events (a new thread, as in the listing) and `reply`
+    events (a new reply, as in `/threads/{id}/replies`); with `thread_id`,
+    only that thread's replies. Events are not replayed: a client that
+    reconnects, or receives `evicted` after falling too far behind, should
+    refetch what it shows. Streams are per worker and need a long-lived
+    server, so they are unavailable in serverless mode.
+    """
+    require_streaming()
+    subscription = broker.subscribe([thread_topic(thread_id) if thread_id else FORUM_TOPIC])
+    if subscription is None:
+        raise too_many_streams()
+    return event_stream_response(request, subscription, broker.unsubscribe)
 
 
 @router.delete("/threads/{thread_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_thread(
     thread_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Delete a thread (author only)"""
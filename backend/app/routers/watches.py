@@ -0,0 +1,81 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.component import Component
+from ..models.watch import Notification, PriceWatch
+from ..schemas.watch import PriceWatchCreate, PriceWatchResponse, NotificationResponse
+from ..services.price_watch import check_new_watch
+from ..utils.auth import get_current_user, Principal
+
+router = APIRouter(prefix="/api/watches", tags=["Price Watches"])
+
+
+@router.get("", response_model=List[PriceWatchResponse])
+def get_watches(
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get current user's price watches, newest first"""
+    return db.query(PriceWatch).filter(
+        PriceWatch.user_id == current_user.id
+    ).order_by(PriceWatch.id.desc()).all()
+
+
+@router.post("", response_model=PriceWatchResponse, status_code=status.HTTP_201_CREATED)
+def create_watch(
+    watch: PriceWatchCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Watch a component for a target price.
+
+    The watch fires once, the first time any vendor offers the component at
+    or below the target, and an alert lands in the user's notifications. A
+    component already at the target fires immediately.
+    """
+    if not db.query(Component.id).filter(Component.id == watch.component_id).first():
+        raise HTTPException(status_code=404, detail="Component not found")
+    
+    db_watch = PriceWatch(
+        user_id=current_user.id,
+        component_id=watch.component_id,
+        target_price=watch.target_price
+    )
+    db.add(db_watch)
+    db.flush()
+    check_new_watch(db.connection(), db_watch)
+    db.commit()
+    db.refresh(db_watch)
+    return db_watch
+
+
+@router.delete("/{watch_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_watch(
+    watch_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete a price watch"""
+    watch = db.query(PriceWatch).filter(
+        PriceWatch.id == watch_id,
+        PriceWatch.user_id == current_user.id
+    ).first()
+    
+    if not watch:
+        raise HTTPException(status_code=404, detail="Watch not found")
+    
+    db.delete(watch)
+    db.commit()
+
+
+@router.get("/notifications", response_model=List[NotificationResponse])
+def get_notifications(
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get current user's price alerts, newest first"""
+    return db.query(Notification).filter(
+        Notification.user_id == current_user.id
+    ).order_by(Notification.id.desc()).limit(limit).all()
@@ -0,0 +1,16 @@
+"""
+Create the database schema.
+
+Serverless deployments (SERVERLESS=true) skip table creation at startup, so
+run this once per deploy, before traffic reaches the new version:
+
+    python -m app.schema
+"""
+from .database import create_schema
+# Every model must be imported for its table to be created
+from .models import component, forum, user, watch  # noqa: F401
+
+
+if __name__ == "__main__":
+    create_schema()
+    print("✅ Schema is up to date")
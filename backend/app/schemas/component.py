@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List, Any
+from typing import Annotated, Optional, List, Any, Dict
 from decimal import Decimal
 
 
@@ -62,6 +62,17 @@ class ComponentPriceResponse(ComponentPriceBase):
         from_attributes = True
 
 
+# Component Price Summary Schemas
+class ComponentPriceSummaryResponse(BaseModel):
+    lowest_price: Optional[Decimal] = None
+    lowest_in_stock_price: Optional[Decimal] = None
+    vendor_count: int = 0
+    in_stock: bool = False
+    
+    class Config:
+        from_attributes = True
+
+
 # Component Schemas
 class ComponentBase(BaseModel):
     name: str
@@ -78,6 +89,7 @@ class ComponentResponse(ComponentBase):
     id: int
     category_id: int
     created_at: datetime
+    price_summary: Optional[ComponentPriceSummaryResponse] = None
     
     class Config:
         from_attributes = True
@@ -88,14 +100,80 @@ class ComponentDetailResponse(ComponentResponse):
     prices: List[ComponentPriceResponse] = []
 
 
+# Price History Schemas
+class PricePoint(BaseModel):
+    recorded_at: datetime
+    price: Decimal  # closing price for daily points
+    low_price: Decimal
+    high_price: Decimal
+    in_stock: bool
+    is_daily: bool = False
+
+
+class VendorPriceSeries(BaseModel):
+    vendor_id: int
+    vendor_name: str
+    points: List[PricePoint] = []
+
+
+class PriceHistoryResponse(BaseModel):
+    component_id: int
+    start: datetime
+    end: datetime
+    vendors: List[VendorPriceSeries] = []
+
+
+# Facet Schemas
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    min_price: Decimal
+    max_price: Optional[Decimal] = None  # exclusive; None for the open-ended top bucket
+    count: int
+
+
+class ComponentFacetsResponse(BaseModel):
+    total: int
+    categories: List[FacetCount] = []
+    brands: List[FacetCount] = []
+    sockets: List[FacetCount] = []
+    memory_types: List[FacetCount] = []
+    price_buckets: List[PriceBucketCount] = []
+
+
+# Price Feed Schemas
+class RejectedFeedRow(BaseModel):
+    line: int
+    reason: str
+
+
+class PriceFeedReport(BaseModel):
+    format: str
+    rows_read: int
+    rows_upserted: int
+    rows_rejected: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    rejected: List[RejectedFeedRow] = []  # first rejected rows only
+    rejected_truncated: bool = False
+
+
 # Build Schemas
+# A component id in a build's {category: component_id} map; bounded to a database integer
+ComponentId = Annotated[int, Field(ge=1, le=2**63 - 1)]
+
+
 class BuildBase(BaseModel):
     name: str
     components: Optional[dict] = None  # {category: component_id}
 
 
 class BuildCreate(BuildBase):
-    pass
+    components: Optional[Dict[str, Optional[ComponentId]]] = None  # {category: component_id}
 
 
 class BuildResponse(BuildBase):
@@ -108,6 +186,83 @@ class BuildResponse(BuildBase):
         from_attributes = True
 
 
+# Build Pricing Schemas
+class BuildPriceRequest(BaseModel):
+    components: Dict[str, Optional[ComponentId]]  # {category: component_id}, same shape as a build
+
+
+class PriceOffer(BaseModel):
+    vendor_id: int
+    vendor_name: str
+    price: Decimal
+    in_stock: bool
+    url: Optional[str] = None
+
+
+class PricedComponent(BaseModel):
+    slot: str
+    component_id: int
+    cheapest: Optional[PriceOffer] = None
+    offers: List[PriceOffer] = []
+
+
+class VendorBuildTotal(BaseModel):
+    vendor_id: int
+    vendor_name: str
+    total: Decimal
+    component_count: int
+    missing_component_ids: List[int] = []
+
+
+class BuildPriceResponse(BaseModel):
+    total_price: Decimal
+    components: List[PricedComponent] = []
+    vendors: List[VendorBuildTotal] = []
+    missing_component_ids: List[int] = []  # components with no price listed
+
+
+# Compatibility Schemas
+class CompatibilityCheck(BaseModel):
+    components: dict  # {category: component_id}, same shape as a build
+
+
+class CompatibilityIssue(BaseModel):
+    rule: str
+    severity: str  # "error" or "warning"
+    message: str
+    component_ids: List[int] = []
+
+
+class CompatibilityReport(BaseModel):
+    compatible: bool
+    issues: List[CompatibilityIssue] = []
+    estimated_wattage: int
+    recommended_psu_wattage: int
+    psu_wattage: Optional[int] = None
+
+
+# Advisor Schemas
+class AdvisorRequest(BaseModel):
+    budget: Decimal = Field(gt=0)
+    profile: str = Field("gaming", pattern="^(gaming|workstation|budget)$")
+
+
+class RecommendedComponent(BaseModel):
+    id: int
+    name: str
+    brand: Optional[str] = None
+    price: Decimal
+
+
+class AdvisorRecommendation(BaseModel):
+    profile: str
+    budget: Decimal
+    total_price: Decimal
+    score: float
+    estimated_wattage: int
+    components: dict  # {category: RecommendedComponent}
+
+
 # Search & Filter Schemas
 class ComponentFilter(BaseModel):
     category: Optional[str] = None
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 
 # Thread Schemas
@@ -14,12 +14,22 @@ class ThreadCreate(ThreadBase):
     pass
 
 
+class SearchSnippet(BaseModel):
+    text: str
+    # [start, end) character offsets of matched words within text
+    highlights: List[Tuple[int, int]] = []
+
+
 class ThreadResponse(ThreadBase):
     id: int
     user_id: int
     created_at: datetime
     author_username: Optional[str] = None
     reply_count: int = 0
+    last_reply_at: Optional[datetime] = None
+    last_activity_at: Optional[datetime] = None
+    # Only set on search results
+    snippet: Optional[SearchSnippet] = None
     
     class Config:
         from_attributes = True
@@ -47,3 +57,5 @@ class ReplyResponse(ReplyBase):
 
 class ThreadDetailResponse(ThreadResponse):
     replies: List[ReplyResponse] = []
+    # Cursor for /threads/{id}/replies when the thread has more replies
+    next_replies_cursor: Optional[str] = None
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+from decimal import Decimal
+from .component import ComponentId
+
+
+# Price Watch Schemas
+class PriceWatchCreate(BaseModel):
+    component_id: ComponentId
+    # Numeric(12, 2) column
+    target_price: Decimal = Field(gt=0, max_digits=12, decimal_places=2)
+
+
+class PriceWatchResponse(BaseModel):
+    id: int
+    component_id: int
+    target_price: Decimal
+    is_active: bool
+    created_at: datetime
+    triggered_at: Optional[datetime] = None
+    triggered_price: Optional[Decimal] = None
+    
+    class Config:
+        from_attributes = True
+
+
+# Notification Schemas
+class NotificationResponse(BaseModel):
+    id: int
+    kind: str
+    payload: dict
+    created_at: datetime
+    sent_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,16 +1,31 @@
 """
 Comprehensive seed script with 100+ PC components
 Run with: python -m app.seed
+
+Bulk mode generates a synthetic catalog of any size from the same data:
+    python -m app.seed --bulk --components 300000 --threads 15000 --replies 60000
 """
-from .database import SessionLocal, engine, Base
-from .models.component import Category, Component, Vendor, ComponentPrice
+import argparse
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from .database import SessionLocal, create_schema, get_engine
+from .models.component import (
+    Category, Component, Vendor, ComponentPrice, ComponentAttribute, ComponentCompatibilityKey,
+    ComponentPriceHistory, ComponentPriceSummary, ComponentSearchDocument
+)
 from .models.user import User
-from .models.forum import ForumThread
+from .models.forum import ForumReply, ForumSearchDocument, ForumThread
+# Importing the projection services registers their flush hooks
+from .services import compatibility, forum_search, price_history, price_summary, search, spec_attributes  # noqa: F401
+from .services.compatibility import compatibility_keys
+from .services.search import build_document
+from .services.spec_attributes import extract_attributes
 from .utils.auth import get_password_hash
-import random
 
 # Create all tables
-Base.metadata.create_all(bind=engine)
+create_schema()
 
 
 # ==================== COMPONENT DATA ====================
@@ -248,8 +263,15 @@ FORUM_THREADS = [
 ]
 
 
+# Fixed RNG seed, so every run produces the same prices and stock
+SEED = 42
+
+DEMO_USER = {"email": "demo@pcease.in", "username": "demo", "password": "demo123"}
+
+
 def seed_database():
     db = SessionLocal()
+    rng = random.Random(SEED)
     
     try:
         print("🌱 Starting database seed...")
@@ -285,7 +307,7 @@ def seed_database():
             for item in items:
                 existing = db.query(Component).filter(Component.name == item["name"]).first()
                 if not existing:
-                    base_price = item.pop("price")
+                    base_price = item["price"]
                     comp = Component(
                         category_id=cat_map[category_slug].id,
                         name=item["name"],
@@ -297,15 +319,15 @@ def seed_database():
                     
                     # Add prices from random vendors (3-5 vendors per product)
                     vendor_list = list(vendor_map.values())
-                    random.shuffle(vendor_list)
-                    for vendor in vendor_list[:random.randint(3, len(vendor_list))]:
+                    rng.shuffle(vendor_list)
+                    for vendor in vendor_list[:rng.randint(3, len(vendor_list))]:
                         # Price variation: ±5%
-                        price_mult = 1 + (random.random() * 0.1 - 0.05)
+                        price_mult = 1 + (rng.random() * 0.1 - 0.05)
                         price = ComponentPrice(
                             component_id=comp.id,
                             vendor_id=vendor.id,
                             price=int(base_price * price_mult),
-                            in_stock=random.random() > 0.1,  # 90% in stock
+                            in_stock=rng.random() > 0.1,  # 90% in stock
                             url=f"{vendor.website}/product/{comp.id}"
                         )
                         db.add(price)
@@ -336,12 +358,12 @@ def seed_database():
         
         # ===== Demo User =====
         print("  → Creating demo user...")
-        existing_user = db.query(User).filter(User.email == "demo@pcease.in").first()
+        existing_user = db.query(User).filter(User.email == DEMO_USER["email"]).first()
         if not existing_user:
             demo_user = User(
-                email="demo@pcease.in",
-                username="demo",
-                hashed_password=get_password_hash("demo123")
+                email=DEMO_USER["email"],
+                username=DEMO_USER["username"],
+                hashed_password=get_password_hash(DEMO_USER["password"])
             )
             db.add(demo_user)
             db.flush()
@@ -374,5 +396,353 @@ def seed_database():
         db.close()
 
 
+# ==================== BULK SEEDING ====================
+# Synthetic catalogs built from the component data above: every generated
+# component is a variant of a real one (same brand and specs, so filters,
+# search and compatibility behave as on real data) with its price spread
+# log-normally around the original. Vendor popularity and forum posting
+# are Zipf-skewed, and reply counts per thread are Pareto-distributed.
+
+# Rows per Core insert batch
+BULK_BATCH_SIZE = 5000
+
+COMPONENT_LISTS = {
+    "cpu": CPUS, "gpu": GPUS, "motherboard": MOTHERBOARDS, "ram": RAM,
+    "storage": STORAGE, "psu": PSUS, "pcCase": CASES, "monitor": MONITORS,
+}
+
+# Share of the catalog per category
+CATEGORY_WEIGHTS = {
+    "cpu": 8, "gpu": 14, "motherboard": 14, "ram": 14,
+    "storage": 18, "psu": 10, "pcCase": 10, "monitor": 12,
+}
+
+# (vendors offering a component, relative frequency)
+OFFER_COUNTS = [(1, 12), (2, 18), (3, 24), (4, 20), (5, 13), (6, 8), (7, 5)]
+
+VARIANT_SUFFIXES = ["", " OC", " Pro", " Gaming", " V2", " Lite", " Plus", " Edition", " White", " Refurbished"]
+
+THREAD_TITLES = [
+    "Is the {a} worth it in {year}?",
+    "{a} vs {b} for a mid-range build?",
+    "Help: {a} not detected after install",
+    "Build review: {a} + {b}",
+    "Best price for {a} right now?",
+    "Upgrading from {b} to {a}",
+]
+THREAD_CATEGORIES = ["Build Help", "Troubleshooting", "Discussion", "Showcase"]
+SENTENCES = [
+    "I have been running the {a} for a few weeks now.",
+    "Temperatures stay under control with a decent cooler.",
+    "Prices dropped a lot since launch, so it is a good time to buy.",
+    "Make sure the BIOS is updated before you install it.",
+    "Pairing it with the {b} works fine for 1440p gaming.",
+    "The vendor shipped it in two days with proper packaging.",
+    "Check the PSU headroom if you plan to overclock.",
+    "I would wait for the next sale unless you need it now.",
+]
+
+
+def bulk_scale(components: int) -> dict:
+    """Default row counts to go with a catalog of this many components"""
+    threads = max(50, components // 20)
+    return {
+        "components": components,
+        "vendors": min(200, max(len(VENDORS), components // 2000)),
+        "users": max(50, components // 50),
+        "threads": threads,
+        "replies": threads * 3,
+    }
+
+
+def _templates():
+    """Seed components per category, with the projection rows every variant shares"""
+    return {
+        slug: [
+            {
+                "name": item["name"], "brand": item["brand"], "price": item["price"], "specs": item["specs"],
+                "attributes": extract_attributes(None, item["specs"]),
+                "keys": [
+                    (rule, key)
+                    for rule, keys in compatibility_keys(slug, item["name"], item["specs"]).items() for key in keys
+                ],
+                "body": build_document(item["name"], item["brand"], item["specs"])["body"],
+            }
+            for item in items
+        ]
+        for slug, items in COMPONENT_LISTS.items()
+    }
+
+
+def _zipf_cum_weights(count: int, exponent: float) -> list:
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def _draws(rng: random.Random, population: list, cum_weights: list, size: int):
+    """Endless weighted draws, taken from the RNG `size` at a time"""
+    while True:
+        yield from rng.choices(population, cum_weights=cum_weights, k=size)
+
+
+def _insert(connection, table, rows: list, batch_size: int) -> None:
+    """Insert rows (all with the same keys) in batches.
+
+    On SQLite, Core's per-row parameter handling costs more than the insert
+    itself, so the rows go straight to the driver's executemany as tuples,
+    each value still passed through its column type's bind processor.
+    Postgres drivers batch Core executemany into multi-row VALUES already.
+    """
+    if not rows:
+        return
+    dialect = connection.dialect
+    if dialect.name != "sqlite":
+        for start in range(0, len(rows), batch_size):
+            connection.execute(table.insert(), rows[start:start + batch_size])
+        return
+
+    compiled = table.insert().compile(dialect=dialect, column_keys=list(rows[0]))
+    processors = [
+        (name, table.c[name].type.dialect_impl(dialect).bind_processor(dialect))
+        for name in compiled.positiontup
+    ]
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        columns = []
+        for name, process in processors:
+            values = [row[name] for row in chunk]
+            if process is not None:
+                try:
+                    # Timestamps and flags repeat a lot, so convert each distinct value once
+                    converted = {value: process(value) for value in set(values)}
+                    values = [converted[value] for value in values]
+                except TypeError:  # unhashable, e.g. JSON
+                    values = list(map(process, values))
+            columns.append(values)
+        connection.exec_driver_sql(str(compiled), list(zip(*columns)))
+
+
+def seed_bulk(
+    components: int,
+    vendors: int = None,
+    users: int = None,
+    threads: int = None,
+    replies: int = None,
+    seed: int = SEED,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> dict:
+    """Fill an empty database with a synthetic catalog; returns row counts and step timings.
+
+    Counts left as None scale with `components` (see `bulk_scale`). Ids are
+    assigned up front and rows go in as batched Core inserts, one
+    transaction per batch. Core writes skip the ORM flush hooks, so the
+    projection rows (price summaries and history, spec attributes,
+    compatibility keys, search documents, forum activity) are built
+    alongside, mostly from per-template rows computed once. The RNG is
+    seeded, so the same arguments always produce the same catalog.
+    """
+    sizes = bulk_scale(components)
+    for name, value in (("vendors", vendors), ("users", users), ("threads", threads), ("replies", replies)):
+        if value is not None:
+            sizes[name] = value
+    rng = random.Random(seed)
+    templates = _templates()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    counts = dict.fromkeys(["components", "prices", "vendors", "users", "threads", "replies"], 0)
+    timings = {}
+    engine = get_engine()
+
+    with engine.connect() as connection:
+        if connection.execute(Component.__table__.select().limit(1)).first():
+            raise RuntimeError("The database already has components; bulk seeding needs an empty catalog")
+
+    with engine.connect() as connection:
+        # ===== Categories, vendors, users =====
+        started = time.perf_counter()
+        category_ids = {c["slug"]: i for i, c in enumerate(CATEGORIES, start=1)}
+        vendor_rows = [dict(v) for v in VENDORS]
+        vendor_rows += [
+            {"name": f"Vendor {i}", "website": f"https://vendor{i}.example.in", "logo_url": None}
+            for i in range(len(vendor_rows) + 1, sizes["vendors"] + 1)
+        ]
+        vendor_rows = vendor_rows[:sizes["vendors"]]
+        for i, vendor in enumerate(vendor_rows, start=1):
+            vendor["id"] = i
+        # Every user shares the demo password, hashed once
+        password_hash = get_password_hash(DEMO_USER["password"])
+        user_rows = [{"id": 1, "email": DEMO_USER["email"], "username": DEMO_USER["username"],
+                      "hashed_password": password_hash, "is_active": True, "created_at": now}]
+        user_rows += [
+            {"id": i, "email": f"user{i}@bulk.pcease.in", "username": f"user{i}",
+             "hashed_password": password_hash, "is_active": True,
+             "created_at": now - timedelta(days=rng.uniform(0, 730))}
+            for i in range(2, sizes["users"] + 1)
+        ]
+        with connection.begin():
+            _insert(connection, Category.__table__, [{"id": category_ids[c["slug"]], **c} for c in CATEGORIES], batch_size)
+            _insert(connection, Vendor.__table__, vendor_rows, batch_size)
+            _insert(connection, User.__table__, user_rows, batch_size)
+        counts["vendors"], counts["users"] = len(vendor_rows), len(user_rows)
+        timings["vendors_users"] = time.perf_counter() - started
+
+        # ===== Components, offers and their projections =====
+        started = time.perf_counter()
+        slug_draws = _draws(rng, list(CATEGORY_WEIGHTS), list(itertools.accumulate(CATEGORY_WEIGHTS.values())), batch_size)
+        offer_draws = _draws(
+            rng, [count for count, _ in OFFER_COUNTS], list(itertools.accumulate(w for _, w in OFFER_COUNTS)), batch_size
+        )
+        vendor_ids = [v["id"] for v in vendor_rows]
+        vendor_draws = _draws(rng, vendor_ids, _zipf_cum_weights(len(vendor_ids), 0.9), batch_size * 4)
+        websites = {v["id"]: v["website"] for v in vendor_rows}
+        price_id = itertools.count(1)
+        component_names = []
+
+        for batch_start in range(1, components + 1, batch_size):
+            batch = {name: [] for name in ("components", "prices", "history", "summaries", "attributes", "keys", "documents")}
+            for component_id in range(batch_start, min(components, batch_start + batch_size - 1) + 1):
+                slug = next(slug_draws)
+                template = rng.choice(templates[slug])
+                name = f"{template['name']}{rng.choice(VARIANT_SUFFIXES)} #{component_id}"
+                price = template["price"] * rng.lognormvariate(0, 0.35)
+                if len(component_names) < 5000:
+                    component_names.append(name)
+                batch["components"].append({
+                    "id": component_id, "category_id": category_ids[slug], "name": name,
+                    "brand": template["brand"], "specs": template["specs"],
+                    "created_at": now - timedelta(days=rng.uniform(0, 730)),
+                })
+                batch["attributes"].extend({**attr, "component_id": component_id} for attr in template["attributes"])
+                batch["keys"].extend(
+                    {"component_id": component_id, "rule": rule, "key": key} for rule, key in template["keys"]
+                )
+                batch["documents"].append({
+                    "component_id": component_id, "title": f"{name} {template['brand']}", "body": template["body"],
+                })
+
+                offers = min(len(vendor_ids), next(offer_draws))
+                chosen = set()
+                while len(chosen) < offers:
+                    chosen.add(next(vendor_draws))
+                lowest = lowest_in_stock = None
+                for vendor_id in chosen:
+                    offer = {
+                        "component_id": component_id, "vendor_id": vendor_id,
+                        "price": max(100, round(price * (1 + rng.gauss(0, 0.03)))),
+                        "in_stock": rng.random() > 0.1,
+                    }
+                    batch["prices"].append({
+                        "id": next(price_id), **offer, "updated_at": now,
+                        "url": f"{websites[vendor_id]}/product/{component_id}",
+                    })
+                    batch["history"].append({
+                        **offer, "recorded_at": now, "low_price": offer["price"], "high_price": offer["price"],
+                        "is_daily": False,
+                    })
+                    lowest = min(lowest or offer["price"], offer["price"])
+                    if offer["in_stock"]:
+                        lowest_in_stock = min(lowest_in_stock or offer["price"], offer["price"])
+                batch["summaries"].append({
+                    "component_id": component_id, "lowest_price": lowest, "lowest_in_stock_price": lowest_in_stock,
+                    "vendor_count": len(chosen), "in_stock": lowest_in_stock is not None, "updated_at": now,
+                })
+
+            with connection.begin():
+                _insert(connection, Component.__table__, batch["components"], batch_size)
+                _insert(connection, ComponentPrice.__table__, batch["prices"], batch_size)
+                _insert(connection, ComponentPriceHistory.__table__, batch["history"], batch_size)
+                _insert(connection, ComponentPriceSummary.__table__, batch["summaries"], batch_size)
+                _insert(connection, ComponentAttribute.__table__, batch["attributes"], batch_size)
+                _insert(connection, ComponentCompatibilityKey.__table__, batch["keys"], batch_size)
+                _insert(connection, ComponentSearchDocument.__table__, batch["documents"], batch_size)
+            counts["components"] += len(batch["components"])
+            counts["prices"] += len(batch["prices"])
+        timings["components"] = time.perf_counter() - started
+
+        # ===== Forum =====
+        started = time.perf_counter()
+        # Spread the replies over threads by Pareto-distributed weight
+        weights = [rng.paretovariate(1.3) for _ in range(sizes["threads"])]
+        per_weight = sizes["replies"] / sum(weights) if weights else 0
+        reply_counts = [int(weight * per_weight) for weight in weights]
+        for _ in range(sizes["replies"] - sum(reply_counts) if weights else 0):
+            reply_counts[rng.randrange(len(reply_counts))] += 1
+        user_draws = _draws(rng, [u["id"] for u in user_rows], _zipf_cum_weights(len(user_rows), 0.7), batch_size)
+        reply_id = itertools.count(1)
+        thread_batch = max(1, batch_size // 10)
+
+        for batch_start in range(1, sizes["threads"] + 1, thread_batch):
+            thread_rows, reply_rows, document_rows = [], [], []
+            for thread_id in range(batch_start, min(sizes["threads"], batch_start + thread_batch - 1) + 1):
+                a, b = rng.choice(component_names), rng.choice(component_names)
+                created = now - timedelta(days=rng.uniform(0, 365))
+                last_reply_at = None
+                reply_text = []
+                for _ in range(reply_counts[thread_id - 1]):
+                    last_reply_at = min(now, (last_reply_at or created) + timedelta(hours=rng.expovariate(1 / 12)))
+                    content = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(1, 4))).format(a=a, b=b)
+                    reply_text.append(content)
+                    reply_rows.append({
+                        "id": next(reply_id), "thread_id": thread_id, "user_id": next(user_draws),
+                        "content": content, "created_at": last_reply_at,
+                    })
+                title = rng.choice(THREAD_TITLES).format(a=a, b=b, year=now.year)[:255]
+                content = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 6))).format(a=a, b=b)
+                thread_rows.append({
+                    "id": thread_id, "user_id": next(user_draws), "title": title, "content": content,
+                    "category": rng.choice(THREAD_CATEGORIES), "created_at": created,
+                    "reply_count": len(reply_text), "last_reply_at": last_reply_at,
+                    "last_activity_at": last_reply_at or created,
+                })
+                document_rows.append({
+                    "thread_id": thread_id, "title": title, "body": content,
+                    "replies": "".join("\n" + text for text in reply_text),
+                })
+            with connection.begin():
+                _insert(connection, ForumThread.__table__, thread_rows, batch_size)
+                _insert(connection, ForumReply.__table__, reply_rows, batch_size)
+                _insert(connection, ForumSearchDocument.__table__, document_rows, batch_size)
+            counts["threads"] += len(thread_rows)
+            counts["replies"] += len(reply_rows)
+        timings["forum"] = time.perf_counter() - started
+
+        if engine.dialect.name == "postgresql":
+            _sync_sequences(connection)
+    counts["seconds"] = {step: round(seconds, 1) for step, seconds in timings.items()}
+    return counts
+
+
+def _sync_sequences(connection) -> None:
+    """Move id sequences past the pre-assigned ids so later inserts don't collide"""
+    from sqlalchemy import text
+    tables = ["categories", "vendors", "components", "component_prices", "users", "forum_threads", "forum_replies"]
+    with connection.begin():
+        for table in tables:
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+            ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with demo data, or a synthetic catalog in bulk")
+    parser.add_argument("--bulk", action="store_true", help="generate a synthetic catalog into an empty database")
+    parser.add_argument("--components", type=int, default=100_000)
+    parser.add_argument("--vendors", type=int, help="defaults scale with --components")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--replies", type=int, help="total replies across all threads")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if not args.bulk:
+        seed_database()
+        return
+    print("🌱 Starting bulk seed...")
+    started = time.perf_counter()
+    counts = seed_bulk(args.components, args.vendors, args.users, args.threads, args.replies, args.seed, args.batch_size)
+    print(f"\n✅ Database seeded in {time.perf_counter() - started:.1f}s")
+    for name in ("components", "prices", "vendors", "users", "threads", "replies"):
+        print(f"   • {name.capitalize()}: {counts[name]}")
+
+
 if __name__ == "__main__":
-    seed_database()
+    main()
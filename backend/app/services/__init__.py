@@ -0,0 +1,3 @@
+"""
+PCease Backend - Services
+"""
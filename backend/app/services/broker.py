@@ -0,0 +1,161 @@
+"""
+In-process pub/sub for server-sent events.
+
+Routes publish to named topics ("forum", "forum:thread:42") and every
+subscriber of the topic receives the event on its own bounded buffer. An
+event is encoded to SSE bytes once per publish, however many subscribers
+there are, and delivered by one callback per event loop, so publishing
+from the threadpool (sync routes) is safe and cheap.
+
+A subscriber whose buffer is full when an event arrives is evicted instead
+of blocking the publisher or growing without bound: it gets a final
+`evicted` event and its stream ends, and the client reconnects and
+refetches. Idle subscribers cost a buffer and a parked coroutine each, so
+a worker holds thousands of them.
+
+The broker is per process: with several workers, a client only sees events
+published by the worker it is connected to. Fanning out across workers
+would need an external broker (e.g. Postgres LISTEN/NOTIFY or Redis).
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Set
+from fastapi.encoders import jsonable_encoder
+from ..config import settings
+
+
+def encode_event(event: str, data, event_id: Optional[int] = None) -> bytes:
+    """One SSE message; data is JSON-encoded on a single line"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", "data: " + json.dumps(jsonable_encoder(data), separators=(",", ":"))]
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+class Subscription:
+    """One client's bounded buffer of encoded events"""
+
+    def __init__(self, topics: List[str], buffer_size: int):
+        self.topics = topics
+        self.buffer_size = buffer_size
+        self.loop = asyncio.get_running_loop()
+        self._buffer: deque = deque()
+        self._wake = asyncio.Event()
+        self.evicted = False
+
+    def deliver(self, message: bytes) -> bool:
+        """Buffer a message (event loop thread only); False when the buffer is full"""
+        if self.evicted:
+            return True
+        if len(self._buffer) >= self.buffer_size:
+            return False
+        self._buffer.append(message)
+        self._wake.set()
+        return True
+
+    def evict(self) -> None:
+        self.evicted = True
+        self._buffer.clear()
+        self._wake.set()
+
+    async def messages(self, keepalive_seconds: float) -> AsyncIterator[bytes]:
+        """Buffered messages as they arrive, a keepalive comment when idle; ends after eviction"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield KEEPALIVE
+                continue
+            self._wake.clear()
+            while self._buffer:
+                yield self._buffer.popleft()
+            if self.evicted:
+                yield encode_event("evicted", {"reason": "slow consumer"})
+                return
+
+
+class Broker:
+    def __init__(self, buffer_size: int = 64, max_subscribers: int = 10000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._topics: Dict[str, Set[Subscription]] = {}
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.evictions = 0
+
+    def subscribe(self, topics: List[str]) -> Optional[Subscription]:
+        """A new subscription to the topics, or None when the worker is at capacity"""
+        subscription = Subscription(topics, self.buffer_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            self._subscribers.add(subscription)
+            for topic in topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def subscribers(self, topic: str) -> List[Subscription]:
+        with self._lock:
+            return list(self._topics.get(topic, ()))
+
+    def publish(self, topic: str, event: str, data) -> int:
+        """Fan an event out to the topic's subscribers; callable from any thread. Returns the event id"""
+        event_id = next(self._ids)
+        with self._lock:
+            self.published += 1
+            subscribers = list(self._topics.get(topic, ()))
+        if not subscribers:
+            return event_id
+        message = encode_event(event, data, event_id)
+        by_loop: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for subscription in subscribers:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, group in by_loop.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._deliver, group, message)
+        return event_id
+
+    def send(self, subscription: Subscription, event: str, data) -> None:
+        """Deliver an event to one subscriber; call from its event loop's thread"""
+        with self._lock:
+            self.published += 1
+        self._deliver([subscription], encode_event(event, data, next(self._ids)))
+
+    def _deliver(self, subscribers: List[Subscription], message: bytes) -> None:
+        slow = [s for s in subscribers if not s.deliver(message)]
+        for subscription in slow:
+            self.unsubscribe(subscription)
+            subscription.evict()
+        if slow:
+            with self._lock:
+                self.evictions += len(slow)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "subscribers": len(self._subscribers),
+                "buffer_size": self.buffer_size,
+                "published": self.published,
+                "evictions": self.evictions,
+            }
+
+
+broker = Broker(buffer_size=settings.event_buffer_size, max_subscribers=settings.event_max_subscribers)
@@ -0,0 +1,80 @@
+"""
+Catalog read cache.
+
+Categories, vendors, stats, component listings and details change rarely
+but are read on every page, so the components router serves them from a
+bounded LRU/TTL cache of serialized responses with their ETags; the build
+advisor keeps its loaded candidates here too. Writes
+made through a Session are tracked by a flush hook and invalidate only the
+entries they affect once the transaction commits; the TTL bounds staleness
+from writes made by other processes. Core bulk writers that bypass the
+ORM must call `invalidate_components` themselves.
+"""
+from typing import Iterable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.component import Category, Component, ComponentPrice, Vendor
+from ..utils.cache import TTLCache
+
+catalog_cache = TTLCache(maxsize=settings.catalog_cache_size, ttl=settings.catalog_cache_ttl_seconds)
+
+
+def invalidate_components(component_ids: Optional[Iterable[int]] = None) -> None:
+    """Drop cached details for the given components (all when None), listings and stats"""
+    if component_ids is None:
+        catalog_cache.invalidate("component")
+    else:
+        for component_id in set(component_ids):
+            catalog_cache.invalidate("component", component_id)
+    catalog_cache.invalidate("components")
+    catalog_cache.invalidate("stats")
+    catalog_cache.invalidate("advisor")
+
+
+def _affected_entries(session: Session) -> set:
+    """(scope, ident) pairs made stale by the objects being flushed; ident None means the whole scope"""
+    stale = set()
+    changed = [(obj, obj in session.new) for obj in list(session.new) + list(session.dirty) + list(session.deleted)]
+    for obj, is_new in changed:
+        if not is_new and obj not in session.deleted and not session.is_modified(obj):
+            continue
+        if isinstance(obj, Category):
+            stale.update({("categories", None), ("stats", None)})
+            if not is_new:
+                # Component listings and details embed their category, and the advisor picks by it
+                stale.update({("component", None), ("components", None), ("advisor", None)})
+        elif isinstance(obj, Vendor):
+            stale.update({("vendors", None), ("stats", None)})
+            if not is_new:
+                # Component details embed vendor names through their prices
+                stale.add(("component", None))
+        elif isinstance(obj, Component):
+            stale.update({("component", obj.id), ("components", None), ("stats", None), ("advisor", None)})
+        elif isinstance(obj, ComponentPrice):
+            # Listings show the price summary, which follows every price write, as do advisor candidates
+            stale.update({("component", obj.component_id), ("components", None), ("advisor", None)})
+    return stale
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session, flush_context):
+    stale = _affected_entries(session)
+    if stale:
+        session.info.setdefault("pending_catalog_invalidations", set()).update(stale)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    stale = session.info.pop("pending_catalog_invalidations", None)
+    if not stale:
+        return
+    whole_scopes = {scope for scope, ident in stale if ident is None}
+    for scope, ident in stale:
+        if ident is None or scope not in whole_scopes:
+            catalog_cache.invalidate(scope, ident)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("pending_catalog_invalidations", None)
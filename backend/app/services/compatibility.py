@@ -0,0 +1,214 @@
+"""
+Build compatibility engine.
+
+Pairwise rules between categories are precomputed into
+`component_compatibility_keys`: each component gets the keys it offers or
+needs per rule (a CPU gets socket=AM5, a motherboard socket=AM5,
+memory=DDR5 and form_factor=ATX, a case one form_factor key per board size
+it fits). Two components are compatible on a rule when their keys
+intersect, so checking a build is a handful of indexed lookups rather than
+a scan over specs. Keys are rebuilt by a flush hook whenever a component
+is written.
+
+Power is a whole-build rule: the PSU must cover the summed CPU and GPU
+`tdp` plus a base system draw, with headroom.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from ..models.component import Category, Component, ComponentAttribute, ComponentCompatibilityKey
+
+BATCH_SIZE = 500
+
+# (rule, category, other category, what the rule checks)
+PAIR_RULES = [
+    ("socket", "cpu", "motherboard", "CPU socket must match the motherboard socket"),
+    ("memory", "ram", "motherboard", "Memory generation must be supported by the motherboard"),
+    ("form_factor", "motherboard", "pcCase", "Motherboard form factor must fit in the case"),
+]
+
+# Motherboard sizes, smallest first; a case fits its own size and anything smaller
+FORM_FACTORS = ["ITX", "MATX", "ATX", "EATX"]
+_FORM_FACTOR_ALIASES = {
+    "MINIITX": "ITX", "ITX": "ITX",
+    "MATX": "MATX", "MICROATX": "MATX", "UATX": "MATX",
+    "ATX": "ATX",
+    "EATX": "EATX", "EXTENDEDATX": "EATX",
+}
+
+# Memory generation implied by socket when a board's specs and name don't say
+_SOCKET_MEMORY = {"AM5": "DDR5", "AM4": "DDR4", "LGA1700": "DDR5", "LGA1851": "DDR5"}
+_MEMORY_RE = re.compile(r"\bDDR[2-5]\b", re.IGNORECASE)
+
+# Power budget: base draw for board, memory, storage and fans, and PSU headroom
+BASE_SYSTEM_WATTS = 75
+PSU_HEADROOM = 1.3
+
+
+def normalize_form_factor(value) -> Optional[str]:
+    if not value:
+        return None
+    return _FORM_FACTOR_ALIASES.get(re.sub(r"[^A-Z]", "", str(value).upper()))
+
+
+def _normalize(value) -> Optional[str]:
+    return str(value).strip().upper() if value not in (None, "") else None
+
+
+def compatibility_keys(category_slug: str, name: str, specs: Optional[dict]) -> Dict[str, Set[str]]:
+    """Keys per rule for one component"""
+    specs = specs or {}
+    keys: Dict[str, Set[str]] = defaultdict(set)
+
+    if category_slug in ("cpu", "motherboard") and _normalize(specs.get("socket")):
+        keys["socket"].add(_normalize(specs["socket"]))
+
+    if category_slug == "ram" and _normalize(specs.get("type")):
+        keys["memory"].add(_normalize(specs["type"]))
+
+    if category_slug == "motherboard":
+        memory = _normalize(specs.get("memory_type"))
+        if not memory:
+            match = _MEMORY_RE.search(name or "")
+            memory = match.group(0).upper() if match else _SOCKET_MEMORY.get(_normalize(specs.get("socket")))
+        if memory:
+            keys["memory"].add(memory)
+        form_factor = normalize_form_factor(specs.get("form_factor"))
+        if form_factor:
+            keys["form_factor"].add(form_factor)
+
+    if category_slug == "pcCase":
+        largest = normalize_form_factor(specs.get("motherboard_support"))
+        if largest:
+            keys["form_factor"].update(FORM_FACTORS[:FORM_FACTORS.index(largest) + 1])
+
+    return keys
+
+
+# ========== Index maintenance ==========
+def refresh_compatibility_keys(connection, component_ids: Optional[Iterable[int]] = None) -> None:
+    """Rebuild compatibility keys for the given components, or all of them when None"""
+    components = Component.__table__
+    table = ComponentCompatibilityKey.__table__
+    query = select(components.c.id, components.c.name, components.c.specs, Category.__table__.c.slug).join(
+        Category.__table__, components.c.category_id == Category.__table__.c.id
+    )
+
+    if component_ids is None:
+        connection.execute(table.delete())
+        batches = [connection.execute(query).all()]
+    else:
+        ids = sorted(set(component_ids))
+        batches = []
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            connection.execute(table.delete().where(table.c.component_id.in_(batch)))
+            batches.append(connection.execute(query.where(components.c.id.in_(batch))).all())
+
+    rows = [
+        {"component_id": row.id, "rule": rule, "key": key}
+        for batch in batches for row in batch
+        for rule, keys in compatibility_keys(row.slug, row.name, row.specs).items()
+        for key in keys
+    ]
+    if rows:
+        connection.execute(table.insert(), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_after_flush(session, flush_context):
+    touched = {
+        obj.id for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Component) and (obj in session.new or session.is_modified(obj))
+    }
+    if touched:
+        refresh_compatibility_keys(session.connection(), touched)
+
+
+# ========== Build checks ==========
+def _issue(rule: str, severity: str, message: str, component_ids: List[int]) -> dict:
+    return {"rule": rule, "severity": severity, "message": message, "component_ids": component_ids}
+
+
+def check_build(db: Session, component_ids: Iterable[int]) -> dict:
+    """Validate a set of components against every compatibility rule.
+
+    Returns a report with `compatible`, a list of `issues` (errors fail the
+    build, warnings flag rules that could not be verified or thin PSU
+    headroom) and the power estimate. Missing components raise KeyError.
+    """
+    ids = sorted(set(component_ids))
+    categories = dict(db.execute(
+        select(Component.id, Category.slug).join(Category).where(Component.id.in_(ids))
+    ).all())
+    missing = [i for i in ids if i not in categories]
+    if missing:
+        raise KeyError(missing)
+
+    keys: Dict[int, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+    for component_id, rule, key in db.execute(
+        select(ComponentCompatibilityKey.component_id, ComponentCompatibilityKey.rule, ComponentCompatibilityKey.key)
+        .where(ComponentCompatibilityKey.component_id.in_(ids))
+    ):
+        keys[component_id][rule].add(key)
+
+    by_category: Dict[str, List[int]] = defaultdict(list)
+    for component_id, slug in categories.items():
+        by_category[slug].append(component_id)
+
+    issues = []
+    for rule, category, other, description in PAIR_RULES:
+        for a in by_category.get(category, []):
+            for b in by_category.get(other, []):
+                a_keys, b_keys = keys[a].get(rule), keys[b].get(rule)
+                if not a_keys or not b_keys:
+                    issues.append(_issue(rule, "warning", f"Could not verify: {description}", [a, b]))
+                elif not a_keys & b_keys:
+                    detail = f"{'/'.join(sorted(a_keys))} vs {'/'.join(sorted(b_keys))}"
+                    issues.append(_issue(rule, "error", f"{description} ({detail})", [a, b]))
+
+    # Power budget from typed attributes
+    power = dict(
+        ((component_id, name), value) for component_id, name, value in db.execute(
+            select(ComponentAttribute.component_id, ComponentAttribute.name, ComponentAttribute.num_value)
+            .where(ComponentAttribute.component_id.in_(ids), ComponentAttribute.name.in_(["tdp", "wattage"]))
+        )
+    )
+    draw_ids = by_category.get("cpu", []) + by_category.get("gpu", [])
+    estimated = BASE_SYSTEM_WATTS + sum(power.get((i, "tdp")) or 0 for i in draw_ids)
+    psu_wattage = None
+    for psu in by_category.get("psu", []):
+        psu_wattage = power.get((psu, "wattage"))
+        if psu_wattage is None:
+            issues.append(_issue("power", "warning", "Could not verify: PSU wattage is unknown", [psu]))
+        elif psu_wattage < estimated:
+            issues.append(_issue(
+                "power", "error",
+                f"PSU provides {psu_wattage:.0f}W but the build draws about {estimated:.0f}W",
+                [psu] + draw_ids
+            ))
+        elif psu_wattage < estimated * PSU_HEADROOM:
+            issues.append(_issue(
+                "power", "warning",
+                f"PSU leaves little headroom: {psu_wattage:.0f}W for about {estimated:.0f}W "
+                f"(recommended {estimated * PSU_HEADROOM:.0f}W)",
+                [psu] + draw_ids
+            ))
+
+    return {
+        "compatible": not any(issue["severity"] == "error" for issue in issues),
+        "issues": issues,
+        "estimated_wattage": round(estimated),
+        "recommended_psu_wattage": round(estimated * PSU_HEADROOM),
+        "psu_wattage": round(psu_wattage) if psu_wattage is not None else None,
+    }
+
+
+if __name__ == "__main__":
+    # Backfill keys for an existing database: python -m app.services.compatibility
+    from ..database import engine
+    with engine.begin() as conn:
+        refresh_compatibility_keys(conn)
+    print("✅ Compatibility keys rebuilt")
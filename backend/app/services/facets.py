@@ -0,0 +1,106 @@
+"""
+Facet counts for the Browse sidebar.
+
+All facets come from one GROUP BY over the distinct combinations of
+(category, brand, socket, memory, price bucket) in the filtered component
+set. The number of combinations is tiny compared to the number of rows, so
+rolling them up into per-facet counts in Python is cheap.
+
+Category and brand counts are disjunctive: they ignore their own filter,
+so the sidebar can show how many results selecting another value would give.
+"""
+import re
+from collections import Counter
+from typing import Optional
+from sqlalchemy import case, func, null
+from sqlalchemy.orm import Query
+from ..models.component import Category, Component, ComponentPriceSummary
+
+# Upper edges (INR) of the price buckets; the last bucket is open-ended
+PRICE_BUCKET_EDGES = [5000, 10000, 20000, 40000, 80000]
+
+_GPU_MEMORY_TYPE_RE = re.compile(r"G?DDR\w*", re.IGNORECASE)
+
+
+def _price_bucket():
+    price = ComponentPriceSummary.lowest_price
+    return case(
+        (price.is_(None), null()),
+        *[(price < edge, index) for index, edge in enumerate(PRICE_BUCKET_EDGES)],
+        else_=len(PRICE_BUCKET_EDGES)
+    )
+
+
+def _memory_type(category_slug: str, raw: Optional[str]) -> Optional[str]:
+    """RAM specs store the generation directly; GPU specs embed it in e.g. '8GB GDDR6'"""
+    if not raw:
+        return None
+    if category_slug == "gpu":
+        match = _GPU_MEMORY_TYPE_RE.search(raw)
+        return match.group(0).upper() if match else None
+    return raw
+
+
+def _bucket_bounds(index: int) -> tuple:
+    low = PRICE_BUCKET_EDGES[index - 1] if index > 0 else 0
+    high = PRICE_BUCKET_EDGES[index] if index < len(PRICE_BUCKET_EDGES) else None
+    return low, high
+
+
+def _counts(counter: Counter) -> list:
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
+def compute_facets(query: Query, category: Optional[str] = None, brand: Optional[str] = None) -> dict:
+    """Facet counts for a filtered Component query (without its category/brand filters)"""
+    memory_raw = case(
+        (Category.slug == "ram", Component.specs["type"].as_string()),
+        (Category.slug == "gpu", Component.specs["memory"].as_string()),
+    )
+    group = [
+        Category.slug,
+        Component.brand,
+        Component.specs["socket"].as_string(),
+        memory_raw,
+        _price_bucket(),
+    ]
+    rows = query.join(Category, Component.category_id == Category.id).with_entities(
+        *group, func.count(Component.id)
+    ).group_by(*group).all()
+
+    categories, brands, sockets, memory_types, buckets = Counter(), Counter(), Counter(), Counter(), Counter()
+    total = 0
+    for slug, row_brand, socket, memory, bucket, count in rows:
+        in_category = category is None or slug == category
+        in_brand = brand is None or row_brand == brand
+        if in_brand:
+            categories[slug] += count
+        if in_category and row_brand:
+            brands[row_brand] += count
+        if not (in_category and in_brand):
+            continue
+        total += count
+        if socket:
+            sockets[socket] += count
+        memory_type = _memory_type(slug, memory)
+        if memory_type:
+            memory_types[memory_type] += count
+        if bucket is not None:
+            buckets[bucket] += count
+
+    price_buckets = []
+    for index in range(len(PRICE_BUCKET_EDGES) + 1):
+        low, high = _bucket_bounds(index)
+        price_buckets.append({"min_price": low, "max_price": high, "count": buckets.get(index, 0)})
+
+    return {
+        "total": total,
+        "categories": _counts(categories),
+        "brands": _counts(brands),
+        "sockets": _counts(sockets),
+        "memory_types": _counts(memory_types),
+        "price_buckets": price_buckets,
+    }
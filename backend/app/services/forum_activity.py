@@ -0,0 +1,53 @@
+"""
+Forum thread activity counters.
+
+`forum_threads` carries reply_count, last_reply_at and last_activity_at so
+the thread listing is a single indexed scan instead of a GROUP BY over all
+replies, and can be ordered by latest activity. `record_reply` bumps them
+in the transaction that adds the reply; `rebuild_thread_activity`
+recomputes them from `forum_replies`, e.g. to backfill an existing
+database.
+"""
+from typing import Iterable, Optional
+from sqlalchemy import func, select
+from ..models.forum import ForumReply, ForumThread
+
+
+def record_reply(connection, thread_id: int) -> None:
+    """Count a new reply on its thread; run in the transaction that inserts it"""
+    threads = ForumThread.__table__
+    # An in-place increment, so concurrent replies can't lose a count
+    connection.execute(
+        threads.update()
+        .where(threads.c.id == thread_id)
+        .values(
+            reply_count=threads.c.reply_count + 1,
+            last_reply_at=func.now(),
+            last_activity_at=func.now(),
+        )
+    )
+
+
+def rebuild_thread_activity(connection, thread_ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute counters from forum_replies for the given threads (all when None)"""
+    threads = ForumThread.__table__
+    replies = ForumReply.__table__
+    count = select(func.count(replies.c.id)).where(replies.c.thread_id == threads.c.id).scalar_subquery()
+    latest = select(func.max(replies.c.created_at)).where(replies.c.thread_id == threads.c.id).scalar_subquery()
+    statement = threads.update().values(
+        reply_count=count,
+        last_reply_at=latest,
+        last_activity_at=func.coalesce(latest, threads.c.created_at),
+    )
+    if thread_ids is not None:
+        statement = statement.where(threads.c.id.in_(list(thread_ids)))
+    connection.execute(statement)
+
+
+if __name__ == "__main__":
+    # Backfill counters for an existing database: python -m app.services.forum_activity
+    from ..database import engine
+    from ..models import user  # noqa: F401
+    with engine.begin() as conn:
+        rebuild_thread_activity(conn)
+    print("✅ Forum thread activity rebuilt")
@@ -0,0 +1,245 @@
+"""
+Forum full-text search.
+
+Every thread has a row in `forum_search_documents` holding its title, its
+opening post and the text of all its replies. A flush hook keeps it
+current: new threads get a document, edits to a thread rebuild it, and each
+new reply is appended to its thread's document with one UPDATE instead of
+re-reading every reply. That UPDATE still rewrites the whole document, and
+on PostgreSQL re-indexes its tsvector, so a reply's write cost grows with
+the length of its thread; the in-process index only tokenizes the new text.
+
+On PostgreSQL, searches run against a weighted tsvector GIN index (title
+over opening post over replies) with prefix matching and ts_rank. Other
+dialects (SQLite test setups) use the same in-process inverted index as
+component search, loaded on first use and updated on commit. Results carry
+a snippet around the first match with highlight offsets, built in Python
+so both paths return the same shape.
+"""
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, case, event, func, literal, select
+from sqlalchemy.orm import Session, Query
+from ..models.forum import ForumReply, ForumSearchDocument, ForumThread, forum_search_vector
+from .search import InvertedIndex, tokenize
+
+BATCH_SIZE = 500
+
+# Snippet length in characters, and how much of it precedes the first match
+SNIPPET_CHARS = 160
+SNIPPET_LEAD_CHARS = 40
+
+# Same tokens as search.tokenize, located in the original text
+_WORD_RE = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*", re.IGNORECASE)
+
+
+# ========== Document maintenance ==========
+def refresh_forum_documents(connection, thread_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    """Rebuild documents for the given threads, or all of them when None"""
+    threads = ForumThread.__table__
+    replies = ForumReply.__table__
+    documents = ForumSearchDocument.__table__
+
+    if thread_ids is None:
+        connection.execute(documents.delete())
+        batches = [None]
+    else:
+        ids = sorted(set(thread_ids))
+        batches = [ids[start:start + BATCH_SIZE] for start in range(0, len(ids), BATCH_SIZE)]
+
+    rows = []
+    for batch in batches:
+        thread_query = select(threads.c.id, threads.c.title, threads.c.content)
+        reply_query = select(replies.c.thread_id, replies.c.content).order_by(
+            replies.c.thread_id, replies.c.created_at, replies.c.id
+        )
+        if batch is not None:
+            connection.execute(documents.delete().where(documents.c.thread_id.in_(batch)))
+            thread_query = thread_query.where(threads.c.id.in_(batch))
+            reply_query = reply_query.where(replies.c.thread_id.in_(batch))
+        reply_text: Dict[int, List[str]] = {}
+        for thread_id, content in connection.execute(reply_query):
+            reply_text.setdefault(thread_id, []).append(content)
+        rows.extend(
+            {"thread_id": row.id, "title": row.title, "body": row.content,
+             "replies": "".join("\n" + text for text in reply_text.get(row.id, []))}
+            for row in connection.execute(thread_query)
+        )
+    if rows:
+        connection.execute(documents.insert(), rows)
+    return rows
+
+
+def append_replies(connection, replies: List[dict]) -> None:
+    """Append new replies ({thread_id, content}) to their threads' documents"""
+    documents = ForumSearchDocument.__table__
+    added: Dict[int, str] = {}
+    for reply in replies:
+        added[reply["thread_id"]] = added.get(reply["thread_id"], "") + "\n" + reply["content"]
+    if added:
+        connection.execute(
+            documents.update()
+            .where(documents.c.thread_id == bindparam("doc_thread_id"))
+            .values(replies=documents.c.replies + bindparam("text")),
+            [{"doc_thread_id": thread_id, "text": text} for thread_id, text in added.items()],
+        )
+
+
+def _pending_changes(session: Session) -> Tuple[set, List[dict], set]:
+    """(threads to rebuild, replies to append, threads deleted) for the objects being flushed"""
+    rebuilt, removed = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, ForumThread):
+            continue
+        if obj in session.deleted:
+            removed.add(obj.id)
+        elif obj in session.new or session.is_modified(obj):
+            rebuilt.add(obj.id)
+    # A rebuilt document already includes its thread's new replies
+    appended = [
+        {"thread_id": obj.thread_id, "content": obj.content}
+        for obj in session.new
+        if isinstance(obj, ForumReply) and obj.thread_id not in rebuilt | removed
+    ]
+    return rebuilt, appended, removed
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_after_flush(session, flush_context):
+    rebuilt, appended, removed = _pending_changes(session)
+    if not (rebuilt or appended or removed):
+        return
+    connection = session.connection()
+    rows = refresh_forum_documents(connection, rebuilt) if rebuilt else []
+    append_replies(connection, appended)
+    if session.bind is not None and session.bind.dialect.name != "postgresql":
+        pending = session.info.setdefault("pending_forum_documents", [])
+        pending.extend(("remove", thread_id, None) for thread_id in removed)
+        pending.extend(("add", row["thread_id"], row) for row in rows)
+        pending.extend(("extend", reply["thread_id"], reply["content"]) for reply in appended)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    pending = session.info.pop("pending_forum_documents", None)
+    if not pending or _memory_index is None:
+        return
+    for op, thread_id, data in pending:
+        if op == "remove":
+            _memory_index.remove(thread_id)
+        elif op == "add":
+            _memory_index.add(thread_id, data["title"], data["body"] + data["replies"])
+        else:
+            _memory_index.extend(thread_id, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("pending_forum_documents", None)
+
+
+# ========== In-process index ==========
+_memory_index: Optional[InvertedIndex] = None
+_memory_index_lock = threading.Lock()
+
+
+def get_memory_index(db: Session) -> InvertedIndex:
+    """The process-wide fallback index, loaded from the documents table on first use"""
+    global _memory_index
+    if _memory_index is None:
+        with _memory_index_lock:
+            if _memory_index is None:
+                index = InvertedIndex()
+                for row in db.execute(select(ForumSearchDocument.__table__)):
+                    index.add(row.thread_id, row.title, row.body + row.replies)
+                _memory_index = index
+    return _memory_index
+
+
+# ========== Query integration ==========
+def apply_forum_search(query: Query, db: Session, text: str) -> Tuple[Query, object]:
+    """Restrict a ForumThread query to search matches; returns the query and a rank expression"""
+    terms = tokenize(text)
+    if not terms:
+        return query.filter(literal(False)), literal(0)
+
+    if db.bind.dialect.name == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = forum_search_vector()
+        query = query.join(ForumSearchDocument, ForumSearchDocument.thread_id == ForumThread.id).filter(
+            vector.op("@@")(tsquery)
+        )
+        return query, func.ts_rank(vector, tsquery)
+
+    matches = get_memory_index(db).search(text)
+    if not matches:
+        return query.filter(literal(False)), literal(0)
+    scores = dict(matches)
+    query = query.filter(ForumThread.id.in_(list(scores)))
+    return query, case(scores, value=ForumThread.id, else_=0)
+
+
+# ========== Snippets ==========
+def make_snippet(text: str, terms: List[str]) -> Optional[dict]:
+    """About SNIPPET_CHARS of text around the first token matching a term (by prefix), or None.
+
+    Highlights are [start, end) character offsets into the snippet text.
+    """
+    words = list(_WORD_RE.finditer(text))
+    first = next((w for w in words if any(w.group().lower().startswith(t) for t in terms)), None)
+    if first is None:
+        return None
+
+    start = max(0, first.start() - SNIPPET_LEAD_CHARS)
+    if start > 0:
+        # Begin on a word boundary rather than mid-word
+        start = next((w.start() for w in words if w.start() >= start), first.start())
+    end = min(len(text), start + SNIPPET_CHARS)
+    if end < len(text):
+        end = max(first.end(), text.rfind(" ", start, end))
+
+    prefix = "…" if start > 0 else ""
+    highlights = [
+        [len(prefix) + w.start() - start, len(prefix) + w.end() - start]
+        for w in words
+        if start <= w.start() and w.end() <= end and any(w.group().lower().startswith(t) for t in terms)
+    ]
+    snippet = prefix + text[start:end].replace("\n", " ") + ("…" if end < len(text) else "")
+    return {"text": snippet, "highlights": highlights}
+
+
+def _lead_snippet(text: str) -> dict:
+    if len(text) <= SNIPPET_CHARS:
+        return {"text": text, "highlights": []}
+    end = text.rfind(" ", 0, SNIPPET_CHARS)
+    return {"text": text[:end if end > 0 else SNIPPET_CHARS] + "…", "highlights": []}
+
+
+def search_snippets(db: Session, thread_ids: List[int], text: str) -> Dict[int, dict]:
+    """Snippet per thread from the opening post, else its replies; threads matched only by
+    title (or fuzzily) get the start of the opening post without highlights"""
+    terms = tokenize(text)
+    if not thread_ids:
+        return {}
+    documents = ForumSearchDocument.__table__
+    snippets = {}
+    for thread_id, body, replies in db.execute(
+        select(documents.c.thread_id, documents.c.body, documents.c.replies)
+        .where(documents.c.thread_id.in_(thread_ids))
+    ):
+        snippets[thread_id] = (
+            make_snippet(body, terms)
+            or make_snippet(replies.lstrip("\n"), terms)
+            or _lead_snippet(body)
+        )
+    return snippets
+
+
+if __name__ == "__main__":
+    # Backfill documents for an existing database: python -m app.services.forum_search
+    from ..database import engine
+    from ..models import user  # noqa: F401
+    with engine.begin() as conn:
+        count = len(refresh_forum_documents(conn))
+    print(f"✅ Forum search documents rebuilt for {count} threads")
@@ -0,0 +1,350 @@
+"""
+Budget-constrained build optimizer.
+
+Finds the highest-scoring compatible build under a budget from the live
+catalog, priced at each component's lowest in-stock price.
+
+1. Candidates are loaded per category with three set-based queries (prices,
+   typed attributes, compatibility keys) and scored per use-case profile.
+2. Within each category, candidates that share compatibility keys are
+   pruned by dominance: anything with a cheaper-or-equal alternative that
+   scores at least as well (and draws no more power / supplies no less)
+   can never be part of an optimal build. Dominance on raw performance
+   holds at any budget, so the loaded catalog and each profile's surviving
+   candidates are kept in the catalog cache, dropped on catalog writes;
+   a request only filters by budget and prunes again on final utility.
+3. A depth-first branch-and-bound picks one part per slot, enforcing the
+   pairwise compatibility keys and the PSU power rule, and prunes any
+   branch whose optimistic bound (best affordable part per remaining slot,
+   ignoring compatibility) cannot beat the best build found so far.
+"""
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.component import (
+    Category, Component, ComponentAttribute, ComponentCompatibilityKey, ComponentPriceSummary
+)
+from .catalog_cache import catalog_cache
+from .compatibility import BASE_SYSTEM_WATTS, PSU_HEADROOM
+
+# Search order: most constraining and most valuable slots first
+SLOTS = ["cpu", "motherboard", "ram", "gpu", "psu", "pcCase", "storage"]
+
+# Share of the build score each slot contributes, per profile; `price_penalty`
+# trades score for savings (utility drops by penalty * price / budget)
+PROFILES = {
+    "gaming": {
+        "weights": {"gpu": 0.45, "cpu": 0.22, "ram": 0.1, "storage": 0.1,
+                    "motherboard": 0.05, "psu": 0.04, "pcCase": 0.04},
+        "price_penalty": 0.0,
+    },
+    "workstation": {
+        "weights": {"cpu": 0.4, "ram": 0.18, "gpu": 0.18, "storage": 0.12,
+                    "motherboard": 0.05, "psu": 0.04, "pcCase": 0.03},
+        "price_penalty": 0.0,
+    },
+    "budget": {
+        "weights": {"gpu": 0.35, "cpu": 0.25, "ram": 0.12, "storage": 0.12,
+                    "motherboard": 0.06, "psu": 0.05, "pcCase": 0.05},
+        "price_penalty": 0.35,
+    },
+}
+
+ATTRIBUTES = [
+    "cores", "threads", "boost_clock", "base_clock", "tdp", "cuda_cores", "stream_processors",
+    "memory", "capacity", "speed", "read_speed", "wattage", "efficiency", "ram_slots",
+    "pcie_slots", "included_fans",
+]
+
+# AMD stream processors do roughly half the work of an NVIDIA CUDA core per clock here
+AMD_SHADER_FACTOR = 0.5
+EFFICIENCY_TIERS = {"white": 1, "bronze": 2, "silver": 3, "gold": 4, "platinum": 5, "titanium": 6}
+
+# Safety valves so a pathological catalog still answers quickly
+MAX_NODES = 200_000
+MAX_SECONDS = 0.5
+
+
+@dataclass
+class Candidate:
+    id: int
+    name: str
+    brand: Optional[str]
+    slot: str
+    price: float
+    attrs: Dict[str, object] = field(default_factory=dict)
+    keys: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    utility: float = 0.0
+
+    @property
+    def tdp(self) -> float:
+        return float(self.attrs.get("tdp") or 0)
+
+    @property
+    def wattage(self) -> float:
+        return float(self.attrs.get("wattage") or 0)
+
+
+class NoBuildFound(Exception):
+    """No compatible build fits the budget"""
+
+
+# ========== Scoring ==========
+def _num(candidate: Candidate, name: str, default: float = 0.0) -> float:
+    value = candidate.attrs.get(name)
+    return float(value) if isinstance(value, (int, float)) else default
+
+
+def _raw_score(candidate: Candidate, profile: str) -> float:
+    """Unnormalized performance estimate for one part under a profile"""
+    slot = candidate.slot
+    workstation = profile == "workstation"
+    if slot == "cpu":
+        clock = _num(candidate, "boost_clock") or _num(candidate, "base_clock", 3000)
+        cores = _num(candidate, "cores", 4)
+        threads = _num(candidate, "threads", cores)
+        if workstation:
+            return threads * clock / 1000
+        # Games scale with clock speed and only loosely past 8 cores
+        return (clock / 1000) * min(cores, 8) ** 0.5
+    if slot == "gpu":
+        shaders = _num(candidate, "cuda_cores") or _num(candidate, "stream_processors") * AMD_SHADER_FACTOR
+        throughput = shaders * _num(candidate, "boost_clock", 2000) / 1000
+        return throughput * (1 + _num(candidate, "memory") / 24) if workstation else throughput
+    if slot == "ram":
+        target = 128 if workstation else 32
+        return min(_num(candidate, "capacity"), target) / target * 0.75 + _num(candidate, "speed") / 8000 * 0.25
+    if slot == "storage":
+        return min(_num(candidate, "capacity"), 2000) / 2000 * 0.5 + min(_num(candidate, "read_speed"), 7500) / 7500 * 0.5
+    if slot == "motherboard":
+        return _num(candidate, "ram_slots", 2) / 4 * 0.5 + _num(candidate, "pcie_slots", 1) / 4 * 0.5
+    if slot == "psu":
+        efficiency = str(candidate.attrs.get("efficiency") or "").lower()
+        tier = next((rank for name, rank in EFFICIENCY_TIERS.items() if name in efficiency), 1)
+        return tier / len(EFFICIENCY_TIERS)
+    if slot == "pcCase":
+        return min(_num(candidate, "included_fans"), 5) / 5 + 0.2
+    return 0.0
+
+
+def _score(candidates: Dict[str, List[Candidate]], profile: str, budget: float) -> None:
+    config = PROFILES[profile]
+    for slot, items in candidates.items():
+        raw = [_raw_score(c, profile) for c in items]
+        top = max(raw, default=0) or 1
+        for candidate, value in zip(items, raw):
+            candidate.utility = (
+                config["weights"][slot] * value / top
+                - config["price_penalty"] * candidate.price / budget
+            )
+
+
+# ========== Candidate loading and pruning ==========
+def _load_catalog(db: Session) -> Dict[str, List[Candidate]]:
+    """Every in-stock part per slot, with attributes and compatibility keys"""
+    price = ComponentPriceSummary.lowest_in_stock_price
+    rows = db.execute(
+        select(Component.id, Component.name, Component.brand, Category.slug, price)
+        .join(Category, Component.category_id == Category.id)
+        .join(ComponentPriceSummary, ComponentPriceSummary.component_id == Component.id)
+        .where(Category.slug.in_(SLOTS), price.isnot(None))
+    ).all()
+    by_id = {
+        row.id: Candidate(id=row.id, name=row.name, brand=row.brand, slot=row.slug, price=float(row[4]))
+        for row in rows
+    }
+
+    in_stock = (
+        select(ComponentPriceSummary.component_id)
+        .join(Component, Component.id == ComponentPriceSummary.component_id)
+        .join(Category, Component.category_id == Category.id)
+        .where(Category.slug.in_(SLOTS), price.isnot(None))
+    )
+    for component_id, name, num_value, text_value in db.execute(
+        select(ComponentAttribute.component_id, ComponentAttribute.name,
+               ComponentAttribute.num_value, ComponentAttribute.text_value)
+        .where(ComponentAttribute.name.in_(ATTRIBUTES), ComponentAttribute.component_id.in_(in_stock))
+    ):
+        if component_id in by_id:
+            by_id[component_id].attrs[name] = num_value if num_value is not None else text_value
+
+    keys = defaultdict(lambda: defaultdict(set))
+    for component_id, rule, key in db.execute(
+        select(ComponentCompatibilityKey.component_id, ComponentCompatibilityKey.rule, ComponentCompatibilityKey.key)
+        .where(ComponentCompatibilityKey.component_id.in_(in_stock))
+    ):
+        keys[component_id][rule].add(key)
+    for component_id, rules in keys.items():
+        if component_id in by_id:
+            by_id[component_id].keys = {rule: frozenset(values) for rule, values in rules.items()}
+
+    candidates: Dict[str, List[Candidate]] = {slot: [] for slot in SLOTS}
+    for candidate in by_id.values():
+        candidates[candidate.slot].append(candidate)
+    return candidates
+
+
+def _profile_candidates(db: Session, profile: str) -> Dict[str, List[Candidate]]:
+    """Parts per slot not dominated on price, raw performance and power under a profile.
+
+    Utility is raw performance scaled by a positive per-slot factor minus a
+    penalty rising with price, so a part dominated here stays dominated
+    under every budget, and the best in-budget raw score always survives.
+    """
+    catalog = catalog_cache.get_or_load(("advisor", "catalog"), lambda: _load_catalog(db))
+    survivors = {}
+    for slot, items in catalog.items():
+        scored = [replace(c, utility=_raw_score(c, profile)) for c in items]
+        survivors[slot] = prune_dominated(scored)
+    return survivors
+
+
+def load_candidates(db: Session, budget: float, profile: str) -> Dict[str, List[Candidate]]:
+    """In-stock parts per slot priced within budget that can be in an optimal build for the profile"""
+    survivors = catalog_cache.get_or_load(("advisor", profile), lambda: _profile_candidates(db, profile))
+    # Copies, since scoring sets each candidate's utility for this budget
+    return {slot: [replace(c) for c in items if c.price <= budget] for slot, items in survivors.items()}
+
+
+def _power_key(candidate: Candidate) -> float:
+    """Power dimension where smaller is better: CPU/GPU draw, or negative PSU capacity"""
+    if candidate.slot in ("cpu", "gpu"):
+        return candidate.tdp
+    if candidate.slot == "psu":
+        return -candidate.wattage
+    return 0.0
+
+
+def prune_dominated(items: List[Candidate]) -> List[Candidate]:
+    """Drop parts beaten on price, utility and power by a part with the same compatibility keys"""
+    groups: Dict[tuple, List[Candidate]] = defaultdict(list)
+    for candidate in items:
+        signature = tuple(sorted((rule, tuple(sorted(keys))) for rule, keys in candidate.keys.items()))
+        groups[signature].append(candidate)
+
+    kept = []
+    for group in groups.values():
+        entries = sorted(((c.price, -c.utility, _power_key(c), c) for c in group), key=lambda e: e[:3])
+        # Walking by price, a part survives only if no cheaper survivor beats it on
+        # utility and power; without a power dimension that is a running maximum
+        frontier: List[Tuple[float, float]] = []
+        best_utility = float("-inf")
+        for _, neg_utility, power, candidate in entries:
+            utility = -neg_utility
+            if power == 0.0:
+                if utility > best_utility:
+                    best_utility = utility
+                    frontier.append((utility, power))
+                    kept.append(candidate)
+                continue
+            if not any(u >= utility and p <= power for u, p in frontier):
+                frontier.append((utility, power))
+                kept.append(candidate)
+    return kept
+
+
+# ========== Branch and bound ==========
+class _Bound:
+    """Best utility affordable within a price, per slot (compatibility relaxed)"""
+
+    def __init__(self, items: List[Candidate]):
+        ordered = sorted(items, key=lambda c: c.price)
+        self.prices = [c.price for c in ordered]
+        self.best = []
+        best = float("-inf")
+        for candidate in ordered:
+            best = max(best, candidate.utility)
+            self.best.append(best)
+
+    def at(self, remaining: float) -> float:
+        index = bisect_right(self.prices, remaining)
+        return self.best[index - 1] if index else float("-inf")
+
+
+def _compatible(candidate: Candidate, chosen: Dict[str, Candidate]) -> bool:
+    slot = candidate.slot
+    board = chosen.get("motherboard")
+    if slot == "motherboard":
+        cpu = chosen["cpu"]
+        return bool(cpu.keys.get("socket", frozenset()) & candidate.keys.get("socket", frozenset()))
+    if slot == "ram":
+        return bool(board.keys.get("memory", frozenset()) & candidate.keys.get("memory", frozenset()))
+    if slot == "pcCase":
+        return bool(board.keys.get("form_factor", frozenset()) & candidate.keys.get("form_factor", frozenset()))
+    if slot == "psu":
+        draw = BASE_SYSTEM_WATTS + chosen["cpu"].tdp + chosen["gpu"].tdp
+        return candidate.wattage >= draw * PSU_HEADROOM
+    return True
+
+
+def optimize_build(candidates: Dict[str, List[Candidate]], budget: float) -> Tuple[Dict[str, Candidate], float]:
+    """Branch-and-bound over pruned per-slot candidate lists"""
+    for slot in SLOTS:
+        candidates[slot] = sorted(prune_dominated(candidates[slot]), key=lambda c: -c.utility)
+        if not candidates[slot]:
+            raise NoBuildFound(f"No in-stock {slot} fits the budget")
+
+    bounds = [_Bound(candidates[slot]) for slot in SLOTS]
+    cheapest = [min(c.price for c in candidates[slot]) for slot in SLOTS]
+    # Cheapest possible spend on the slots after each depth
+    tail_cost = [sum(cheapest[i:]) for i in range(len(SLOTS) + 1)]
+
+    best: Dict[str, object] = {"utility": float("-inf"), "build": None}
+    chosen: Dict[str, Candidate] = {}
+    state = {"nodes": 0, "deadline": time.perf_counter() + MAX_SECONDS}
+
+    def bound(depth: int, remaining: float) -> float:
+        # Each later slot may spend what's left after the others' cheapest parts
+        total = 0.0
+        for i in range(depth, len(SLOTS)):
+            total += bounds[i].at(remaining - (tail_cost[depth] - cheapest[i]))
+        return total
+
+    def search(depth: int, spent: float, utility: float) -> None:
+        if depth == len(SLOTS):
+            if utility > best["utility"]:
+                best["utility"], best["build"] = utility, dict(chosen)
+            return
+        state["nodes"] += 1
+        if state["nodes"] > MAX_NODES or (state["nodes"] % 1024 == 0 and time.perf_counter() > state["deadline"]):
+            return
+        remaining = budget - spent
+        if utility + bound(depth, remaining) <= best["utility"]:
+            return
+
+        slot = SLOTS[depth]
+        allowance = remaining - tail_cost[depth + 1]
+        for candidate in candidates[slot]:
+            if candidate.price > allowance or not _compatible(candidate, chosen):
+                continue
+            chosen[slot] = candidate
+            search(depth + 1, spent + candidate.price, utility + candidate.utility)
+            del chosen[slot]
+
+    search(0, 0.0, 0.0)
+    if best["build"] is None:
+        raise NoBuildFound("No compatible build fits the budget")
+    return best["build"], best["utility"]
+
+
+def recommend_build(db: Session, budget: float, profile: str) -> dict:
+    """Highest-scoring compatible build under `budget` for a use-case profile"""
+    candidates = load_candidates(db, budget, profile)
+    _score(candidates, profile, budget)
+    build, utility = optimize_build(candidates, budget)
+    parts = {
+        slot: {"id": c.id, "name": c.name, "brand": c.brand, "price": round(c.price, 2)}
+        for slot, c in build.items()
+    }
+    return {
+        "profile": profile,
+        "budget": budget,
+        "total_price": round(sum(c.price for c in build.values()), 2),
+        "score": round(utility, 4),
+        "estimated_wattage": round(BASE_SYSTEM_WATTS + build["cpu"].tdp + build["gpu"].tdp),
+        "components": {slot: parts[slot] for slot in SLOTS if slot in parts},
+    }
@@ -0,0 +1,300 @@
+"""
+Bulk vendor price-feed ingestion.
+
+Feeds are CSV (with a header row) or NDJSON, one offer per row:
+
+    component_id | component, vendor_id | vendor, price, in_stock, url
+
+Components and vendors may be given by id or by exact name (case
+insensitive); a feed pushed for one vendor can omit the vendor column. The
+feed is streamed row by row, resolved against in-memory id/name maps
+loaded once up front, and upserted in multi-row
+`INSERT ... ON CONFLICT (component_id, vendor_id) DO UPDATE` batches, each
+committed on its own, so memory stays bounded by the batch size however
+large the feed is.
+
+These are Core writes, so the ORM flush hooks do not see them: each batch
+appends price history, fires crossed price watches, refreshes the price
+summaries, drops cached catalog entries and notifies open price streams
+explicitly.
+"""
+import csv
+import io
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..models.component import Component, ComponentPrice, Vendor
+from .catalog_cache import invalidate_components
+from .price_history import record_price_points
+from .price_stream import notify_price_changes
+from .price_summary import refresh_price_summaries
+from .price_watch import current_prices, match_price_changes
+
+FEED_FORMATS = ("csv", "ndjson")
+
+# Rows per upsert batch and commit
+BATCH_SIZE = 2000
+
+# Rejected rows are all counted, but only the first ones are reported back
+MAX_REPORTED_REJECTS = 1000
+
+MAX_PRICE = Decimal("9999999999.99")
+_TRUE = {"1", "true", "t", "yes", "y", "in stock", "in_stock"}
+_FALSE = {"0", "false", "f", "no", "n", "out of stock", "out_of_stock"}
+
+
+class FeedRowError(ValueError):
+    pass
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """Feed format from a file name or content type, None if it can't be told"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def read_feed(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line number, row, parse error) for each record of a binary feed stream"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            try:
+                for row in reader:
+                    yield reader.line_num, row, None
+            except csv.Error as exc:
+                # The reader can't resynchronise after a malformed record, so the rest
+                # of the feed is dropped; earlier batches are already committed
+                yield reader.line_num, None, f"Malformed CSV ({exc}); the rest of the feed was not read"
+            return
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, "Malformed JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            yield line_number, row, None
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+class CatalogMaps:
+    """Component and vendor lookups by id and by lower-cased name, loaded once per feed"""
+
+    def __init__(self, db: Session):
+        self.component_ids = set()
+        self.component_names: Dict[str, int] = {}
+        for component_id, name in db.execute(select(Component.id, Component.name)):
+            self.component_ids.add(component_id)
+            self.component_names[name.lower()] = component_id
+        self.vendor_ids = set()
+        self.vendor_names: Dict[str, int] = {}
+        for vendor_id, name in db.execute(select(Vendor.id, Vendor.name)):
+            self.vendor_ids.add(vendor_id)
+            self.vendor_names[name.lower()] = vendor_id
+
+    @staticmethod
+    def _resolve(kind: str, raw_id, raw_name, ids: set, names: Dict[str, int]) -> int:
+        if raw_id not in (None, ""):
+            try:
+                resolved = int(raw_id)
+            except (TypeError, ValueError):
+                raise FeedRowError(f"Invalid {kind}_id '{raw_id}'")
+            if resolved not in ids:
+                raise FeedRowError(f"Unknown {kind}_id {resolved}")
+            return resolved
+        if raw_name not in (None, ""):
+            resolved = names.get(str(raw_name).strip().lower())
+            if resolved is None:
+                raise FeedRowError(f"Unknown {kind} '{raw_name}'")
+            return resolved
+        raise FeedRowError(f"Missing {kind}_id or {kind}")
+
+    def component(self, raw_id, raw_name) -> int:
+        return self._resolve("component", raw_id, raw_name, self.component_ids, self.component_names)
+
+    def vendor(self, raw_id, raw_name) -> int:
+        return self._resolve("vendor", raw_id, raw_name, self.vendor_ids, self.vendor_names)
+
+
+def _parse_price(raw) -> Decimal:
+    try:
+        price = Decimal(str(raw).strip().replace(",", "")).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        raise FeedRowError(f"Invalid price '{raw}'")
+    if not price.is_finite() or price <= 0 or price > MAX_PRICE:
+        raise FeedRowError(f"Price out of range '{raw}'")
+    return price
+
+
+def _parse_in_stock(raw) -> bool:
+    if raw is None or raw == "":
+        return True
+    if isinstance(raw, bool):
+        return raw
+    value = str(raw).strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise FeedRowError(f"Invalid in_stock '{raw}'")
+
+
+def parse_row(row: dict, maps: CatalogMaps, vendor_id: Optional[int] = None) -> dict:
+    """Validate one feed row into a component_prices row; raises FeedRowError"""
+    row_vendor = row.get("vendor_id"), row.get("vendor")
+    if vendor_id is not None and not any(v not in (None, "") for v in row_vendor):
+        resolved_vendor = vendor_id
+    else:
+        resolved_vendor = maps.vendor(*row_vendor)
+        if vendor_id is not None and resolved_vendor != vendor_id:
+            raise FeedRowError("Row is for a different vendor than the feed")
+    if row.get("price") in (None, ""):
+        raise FeedRowError("Missing price")
+    url = row.get("url") or None
+    return {
+        "component_id": maps.component(row.get("component_id"), row.get("component")),
+        "vendor_id": resolved_vendor,
+        "price": _parse_price(row["price"]),
+        "in_stock": _parse_in_stock(row.get("in_stock")),
+        "url": str(url)[:500] if url else None,
+    }
+
+
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Price feeds are not supported on {dialect}")
+    table = ComponentPrice.__table__
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.component_id, table.c.vendor_id],
+        set_={
+            "price": stmt.excluded.price,
+            "in_stock": stmt.excluded.in_stock,
+            "url": func.coalesce(stmt.excluded.url, table.c.url),
+            "updated_at": func.now(),
+        },
+    )
+
+
+def upsert_prices(db: Session, rows: List[dict]) -> None:
+    """Upsert one batch and commit it, keeping summaries and the catalog cache in step.
+
+    The statement is compiled once and executed with the whole batch as
+    parameters; psycopg2 sends it as multi-row VALUES pages.
+    """
+    connection = db.connection()
+    component_ids = {row["component_id"] for row in rows}
+    replaced = current_prices(connection, component_ids)
+    connection.execute(_upsert_statement(connection.dialect.name), rows)
+    record_price_points(connection, rows)
+    match_price_changes(connection, [
+        {**row, "old_price": replaced.get((row["component_id"], row["vendor_id"]))} for row in rows
+    ])
+    refresh_price_summaries(connection, component_ids)
+    db.commit()
+    invalidate_components(component_ids)
+    notify_price_changes(component_ids)
+
+
+def ingest_feed(
+    db: Session,
+    stream: IO[bytes],
+    fmt: str,
+    vendor_id: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+) -> dict:
+    """Stream a feed into component_prices and report throughput and rejected rows"""
+    if fmt not in FEED_FORMATS:
+        raise ValueError(f"Unsupported feed format '{fmt}'")
+    started = time.perf_counter()
+    maps = CatalogMaps(db)
+    if vendor_id is not None and vendor_id not in maps.vendor_ids:
+        raise FeedRowError(f"Unknown vendor_id {vendor_id}")
+
+    rows_read = upserted = rejected_count = batches = 0
+    rejected = []
+    # Keyed by (component, vendor) so a repeated offer in one batch keeps its last value;
+    # Postgres refuses to update the same row twice in one statement
+    batch: Dict[Tuple[int, int], dict] = {}
+
+    for line, row, error in read_feed(stream, fmt):
+        rows_read += 1
+        if error is None:
+            try:
+                parsed = parse_row(row, maps, vendor_id)
+            except FeedRowError as exc:
+                error = str(exc)
+        if error is not None:
+            rejected_count += 1
+            if len(rejected) < MAX_REPORTED_REJECTS:
+                rejected.append({"line": line, "reason": error})
+            continue
+        batch[(parsed["component_id"], parsed["vendor_id"])] = parsed
+        if len(batch) >= batch_size:
+            upsert_prices(db, list(batch.values()))
+            upserted += len(batch)
+            batches += 1
+            batch.clear()
+
+    if batch:
+        upsert_prices(db, list(batch.values()))
+        upserted += len(batch)
+        batches += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "format": fmt,
+        "rows_read": rows_read,
+        "rows_upserted": upserted,
+        "rows_rejected": rejected_count,
+        "batches": batches,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_read / elapsed, 1) if elapsed > 0 else float(rows_read),
+        "rejected": rejected,
+        "rejected_truncated": rejected_count > len(rejected),
+    }
+
+
+if __name__ == "__main__":
+    # Load a feed file: python -m app.services.price_feed feed.csv [--vendor-id 3]
+    import argparse
+    from ..database import SessionLocal
+    from ..models import forum, user  # noqa: F401  (configures every mapper)
+
+    parser = argparse.ArgumentParser(description="Ingest a CSV or NDJSON vendor price feed")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FEED_FORMATS)
+    parser.add_argument("--vendor-id", type=int)
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot tell the feed format from the file name, pass --format")
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as feed:
+            report = ingest_feed(db, feed, fmt, args.vendor_id)
+    finally:
+        db.close()
+    print(f"✅ {report['rows_upserted']} prices upserted, {report['rows_rejected']} rejected "
+          f"({report['rows_per_second']:.0f} rows/s)")
+    for reject in report["rejected"][:20]:
+        print(f"   line {reject['line']}: {reject['reason']}")
@@ -0,0 +1,168 @@
+"""
+Component price history.
+
+`component_prices` holds only the current offer per vendor, so every price
+write also appends a point to `component_price_history`: ORM writes through
+a flush hook, Core bulk writes (price feeds) by calling
+`record_price_points` themselves.
+
+Raw points are kept for `RAW_RETENTION_DAYS`; `compact_price_history`
+folds older ones into one daily row per component and vendor with the
+day's low, high and closing price. A component's history therefore stays
+at roughly one row per vendor per day however often vendors update, and a
+range read is one index scan on (component_id, recorded_at).
+"""
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from sqlalchemy import event, inspect, select, distinct, delete, false
+from sqlalchemy.orm import Session
+from ..models.component import ComponentPrice, ComponentPriceHistory, Vendor
+
+RAW_RETENTION_DAYS = 30
+
+# Components compacted per statement batch
+BATCH_SIZE = 100
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def record_price_points(connection, rows: Iterable[dict], recorded_at: Optional[datetime] = None) -> None:
+    """Append raw history points for rows with component_id, vendor_id, price and in_stock"""
+    recorded_at = recorded_at or _utcnow()
+    points = [
+        {
+            "component_id": row["component_id"],
+            "vendor_id": row["vendor_id"],
+            "recorded_at": recorded_at,
+            "price": row["price"],
+            "low_price": row["price"],
+            "high_price": row["price"],
+            "in_stock": True if row.get("in_stock") is None else bool(row["in_stock"]),
+            "is_daily": False,
+        }
+        for row in rows
+    ]
+    if points:
+        connection.execute(ComponentPriceHistory.__table__.insert(), points)
+
+
+def _changed_prices(session: Session) -> List[dict]:
+    rows = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, ComponentPrice):
+            continue
+        if obj not in session.new:
+            attrs = inspect(obj).attrs
+            if not any(attrs[name].history.has_changes() for name in ("price", "in_stock", "component_id", "vendor_id")):
+                continue
+        rows.append({
+            "component_id": obj.component_id,
+            "vendor_id": obj.vendor_id,
+            "price": obj.price,
+            "in_stock": obj.in_stock,
+        })
+    return rows
+
+
+@event.listens_for(Session, "after_flush")
+def _record_after_flush(session, flush_context):
+    rows = _changed_prices(session)
+    if rows:
+        record_price_points(session.connection(), rows)
+
+
+# ========== Compaction ==========
+def compact_price_history(connection, before: Optional[datetime] = None) -> int:
+    """Fold raw points recorded before `before` (default: the retention window) into daily rows.
+
+    Only whole days are compacted, so the cutoff is rounded down to midnight
+    UTC. Returns the number of raw points folded.
+    """
+    before = before or _utcnow() - timedelta(days=RAW_RETENTION_DAYS)
+    cutoff = before.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    history = ComponentPriceHistory.__table__
+    is_raw = history.c.is_daily == false()
+
+    component_ids = [
+        row[0] for row in connection.execute(
+            select(distinct(history.c.component_id)).where(is_raw, history.c.recorded_at < cutoff)
+        )
+    ]
+    folded = 0
+    for start in range(0, len(component_ids), BATCH_SIZE):
+        batch = component_ids[start:start + BATCH_SIZE]
+        in_range = (history.c.component_id.in_(batch), is_raw, history.c.recorded_at < cutoff)
+        days: "OrderedDict[tuple, dict]" = OrderedDict()
+        for component_id, vendor_id, recorded_at, price, in_stock in connection.execute(
+            select(history.c.component_id, history.c.vendor_id, history.c.recorded_at, history.c.price, history.c.in_stock)
+            .where(*in_range)
+            .order_by(history.c.component_id, history.c.vendor_id, history.c.recorded_at, history.c.id)
+        ):
+            folded += 1
+            day = recorded_at.replace(hour=0, minute=0, second=0, microsecond=0)
+            entry = days.get((component_id, vendor_id, day))
+            if entry is None:
+                days[(component_id, vendor_id, day)] = {
+                    "component_id": component_id, "vendor_id": vendor_id, "recorded_at": day,
+                    "price": price, "low_price": price, "high_price": price,
+                    "in_stock": in_stock, "is_daily": True,
+                }
+            else:
+                # Rows arrive in time order, so the last one closes the day
+                entry["price"] = price
+                entry["in_stock"] = in_stock
+                entry["low_price"] = min(entry["low_price"], price)
+                entry["high_price"] = max(entry["high_price"], price)
+        connection.execute(delete(history).where(*in_range))
+        if days:
+            connection.execute(history.insert(), list(days.values()))
+    return folded
+
+
+# ========== Reads ==========
+def get_price_series(
+    db: Session,
+    component_id: int,
+    start: datetime,
+    end: datetime,
+    vendor_id: Optional[int] = None,
+) -> List[dict]:
+    """Per-vendor price series for a component over [start, end], oldest point first"""
+    history = ComponentPriceHistory
+    query = (
+        select(
+            history.vendor_id, Vendor.name, history.recorded_at, history.price,
+            history.low_price, history.high_price, history.in_stock, history.is_daily
+        )
+        .join(Vendor, history.vendor_id == Vendor.id)
+        .where(history.component_id == component_id, history.recorded_at >= start, history.recorded_at <= end)
+        .order_by(history.recorded_at, history.id)
+    )
+    if vendor_id is not None:
+        query = query.where(history.vendor_id == vendor_id)
+
+    series: "OrderedDict[int, dict]" = OrderedDict()
+    for vid, vendor_name, recorded_at, price, low, high, in_stock, is_daily in db.execute(query):
+        entry = series.setdefault(vid, {"vendor_id": vid, "vendor_name": vendor_name, "points": []})
+        entry["points"].append({
+            "recorded_at": recorded_at,
+            "price": price,
+            "low_price": low,
+            "high_price": high,
+            "in_stock": in_stock,
+            "is_daily": is_daily,
+        })
+    return list(series.values())
+
+
+if __name__ == "__main__":
+    # Compact old points, e.g. from a daily cron: python -m app.services.price_history [retention days]
+    import sys
+    from ..database import engine
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else RAW_RETENTION_DAYS
+    with engine.begin() as conn:
+        folded = compact_price_history(conn, _utcnow() - timedelta(days=days))
+    print(f"✅ Compacted {folded} price history points older than {days} days")
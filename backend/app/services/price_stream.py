@@ -0,0 +1,172 @@
+"""
+Live lowest-price updates for open builds.
+
+A client subscribes with the component ids in its build and first receives
+their current price summaries. After that, committed price writes only
+mark their components as changed; once per interval the worker loads the
+summaries of the changed components that someone is watching in a single
+query and sends each subscriber one `prices` event holding just the
+components whose lowest prices differ from what it was last sent. A bulk
+feed touching thousands of rows therefore costs one query and at most one
+message per client per interval.
+
+ORM price writes are picked up by a flush hook; Core bulk writers must
+call `notify_price_changes` after committing. Like the event broker this
+is per process: a client hears about price writes committed by the worker
+it is connected to.
+"""
+import asyncio
+import logging
+import threading
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from ..config import settings
+from ..database import get_engine
+from ..models.component import ComponentPriceSummary
+from .broker import Broker, Subscription, broker
+from .price_summary import touched_component_ids
+
+logger = logging.getLogger(__name__)
+
+Summary = Optional[Tuple[Optional[Decimal], Optional[Decimal], int, bool]]
+
+
+def price_topic(component_id: int) -> str:
+    return f"price:{component_id}"
+
+
+def load_summaries(db, component_ids: Iterable[int]) -> Dict[int, Summary]:
+    """Price summary per component (None when it has no prices); db is a Session or Connection"""
+    summaries = ComponentPriceSummary.__table__
+    ids = sorted(set(component_ids))
+    found = {
+        row.component_id: (row.lowest_price, row.lowest_in_stock_price, row.vendor_count, bool(row.in_stock))
+        for row in db.execute(select(summaries).where(summaries.c.component_id.in_(ids)))
+    }
+    return {component_id: found.get(component_id) for component_id in ids}
+
+
+def _summary_json(summary: Summary) -> Optional[dict]:
+    if summary is None:
+        return None
+    lowest, lowest_in_stock, vendor_count, in_stock = summary
+    return {
+        "lowest_price": str(lowest) if lowest is not None else None,
+        "lowest_in_stock_price": str(lowest_in_stock) if lowest_in_stock is not None else None,
+        "vendor_count": vendor_count,
+        "in_stock": in_stock,
+    }
+
+
+class PriceStream:
+    def __init__(self, broker: Broker, interval: float):
+        self.broker = broker
+        self.interval = interval
+        self._changed: set = set()
+        self._lock = threading.Lock()
+        # Last summary sent to each subscriber, per component; touched on the event loop only
+        self._sent: Dict[Subscription, Dict[int, Summary]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_changed(self, component_ids: Iterable[int]) -> None:
+        """Queue components for the next flush; callable from any thread"""
+        if not self._sent:
+            return
+        with self._lock:
+            self._changed.update(component_ids)
+
+    def subscribe(self, component_ids: List[int]) -> Optional[Subscription]:
+        """Watch the components, or None when the worker is at capacity"""
+        subscription = self.broker.subscribe([price_topic(i) for i in component_ids])
+        if subscription is None:
+            return None
+        self._sent[subscription] = {}
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.broker.unsubscribe(subscription)
+        self._sent.pop(subscription, None)
+
+    def send_snapshot(self, subscription: Subscription, summaries: Dict[int, Summary]) -> None:
+        """Send a subscriber the current summaries it will receive changes against"""
+        self._send(subscription, summaries)
+
+    def _send(self, subscription: Subscription, summaries: Dict[int, Summary]) -> None:
+        self._sent[subscription].update(summaries)
+        self.broker.send(subscription, "prices", {
+            str(component_id): _summary_json(summary) for component_id, summary in summaries.items()
+        })
+
+    async def _run(self) -> None:
+        # Stops once nobody is watching; the next subscription restarts it
+        while self._sent:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                # The batch is dropped; the next write to those components queues them again
+                logger.exception("Price stream flush failed")
+
+    async def flush(self) -> None:
+        """Send each subscriber the changed lowest prices among its components"""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        watchers = {
+            component_id: subscribers
+            for component_id in changed
+            if (subscribers := [s for s in self.broker.subscribers(price_topic(component_id)) if s in self._sent])
+        }
+        if not watchers:
+            return
+        summaries = await self.load(list(watchers))
+
+        updates: Dict[Subscription, Dict[int, Summary]] = {}
+        for component_id, subscribers in watchers.items():
+            summary = summaries[component_id]
+            for subscription in subscribers:
+                sent = self._sent.get(subscription)
+                if sent is not None and sent.get(component_id) != summary:
+                    updates.setdefault(subscription, {})[component_id] = summary
+        for subscription, changes in updates.items():
+            if subscription in self._sent:
+                self._send(subscription, changes)
+
+    async def load(self, component_ids: List[int]) -> Dict[int, Summary]:
+        """Current summaries, read on a short-lived connection off the event loop"""
+        def read():
+            with get_engine().connect() as connection:
+                return load_summaries(connection, component_ids)
+        return await run_in_threadpool(read)
+
+
+price_stream = PriceStream(broker, settings.price_stream_interval_seconds)
+
+
+def notify_price_changes(component_ids: Iterable[int]) -> None:
+    """Queue committed price changes for open price streams (for Core writers)"""
+    price_stream.mark_changed(component_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session, flush_context):
+    touched = touched_component_ids(session)
+    if touched:
+        session.info.setdefault("pending_price_changes", set()).update(touched)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session):
+    touched = session.info.pop("pending_price_changes", None)
+    if touched:
+        notify_price_changes(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("pending_price_changes", None)
@@ -0,0 +1,82 @@
+"""
+Component price summary maintenance.
+
+`component_price_summaries` holds one row per priced component with its
+lowest price, lowest in-stock price, vendor count and stock flag, so the
+component listing can filter and sort by price with a single indexed join
+instead of aggregating `component_prices` on every request.
+
+Summaries are refreshed automatically whenever ComponentPrice rows are
+written through an ORM session. Code that writes prices with Core
+statements (bulk imports) must call `refresh_price_summaries` itself.
+"""
+from typing import Iterable, Optional
+from sqlalchemy import event, select, func, case, distinct, inspect, true
+from sqlalchemy.orm import Session
+from ..models.component import ComponentPrice, ComponentPriceSummary
+
+# Keeps IN (...) lists well under driver parameter limits
+BATCH_SIZE = 500
+
+
+def _summary_select():
+    prices = ComponentPrice.__table__
+    in_stock = prices.c.in_stock == true()
+    return select(
+        prices.c.component_id,
+        func.min(prices.c.price),
+        func.min(case((in_stock, prices.c.price))),
+        func.count(distinct(prices.c.vendor_id)),
+        func.max(case((in_stock, 1), else_=0)) == 1,
+    ).group_by(prices.c.component_id)
+
+
+def refresh_price_summaries(connection, component_ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute price summaries for the given components, or all of them when None"""
+    summaries = ComponentPriceSummary.__table__
+    columns = ["component_id", "lowest_price", "lowest_in_stock_price", "vendor_count", "in_stock"]
+
+    if component_ids is None:
+        connection.execute(summaries.delete())
+        connection.execute(summaries.insert().from_select(columns, _summary_select()))
+        return
+
+    ids = sorted(set(component_ids))
+    prices = ComponentPrice.__table__
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        connection.execute(summaries.delete().where(summaries.c.component_id.in_(batch)))
+        connection.execute(summaries.insert().from_select(
+            columns,
+            _summary_select().where(prices.c.component_id.in_(batch))
+        ))
+
+
+def touched_component_ids(session: Session) -> set:
+    """Components whose prices change with the objects being flushed"""
+    touched = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, ComponentPrice):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if obj.component_id is not None:
+            touched.add(obj.component_id)
+        # A price moved to another component also changes the old one
+        touched.update(i for i in inspect(obj).attrs.component_id.history.deleted if i is not None)
+    return touched
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_after_flush(session, flush_context):
+    touched = touched_component_ids(session)
+    if touched:
+        refresh_price_summaries(session.connection(), touched)
+
+
+if __name__ == "__main__":
+    # Backfill summaries for an existing database: python -m app.services.price_summary
+    from ..database import engine
+    with engine.begin() as conn:
+        refresh_price_summaries(conn)
+    print("✅ Price summaries rebuilt")
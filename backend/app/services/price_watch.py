@@ -0,0 +1,175 @@
+"""
+Price watch matching.
+
+A watch fires once, the first time any vendor offers its component at or
+below the target price. Watches are created already fired when the
+component is at the target, so an active watch means every offer has
+stayed above its target since it was created. A price change from `old`
+to `new` can then only fire the watches with new <= target < old, and
+the (component_id, is_active, target_price) index turns that into a range
+scan over exactly those watches, whatever the number of watches on the
+component.
+
+Matching runs in the writing transaction: ORM price writes through a
+flush hook, Core bulk writes (price feeds) by calling
+`match_price_changes` with the prices they replaced. Fired alerts are
+written to the `notifications` outbox for a dispatcher to deliver.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, bindparam, event, inspect, or_, select, true
+from sqlalchemy.orm import Session
+from ..models.component import Component, ComponentPrice
+from ..models.watch import Notification, PriceWatch
+
+# Price changes matched per statement
+BATCH_SIZE = 200
+
+# Keeps IN (...) lists well under driver parameter limits
+ID_BATCH_SIZE = 500
+
+
+def current_prices(connection, component_ids: Iterable[int]) -> Dict[Tuple[int, int], Decimal]:
+    """Current price per (component_id, vendor_id), for writers that replace prices in bulk"""
+    prices = ComponentPrice.__table__
+    ids = sorted(set(component_ids))
+    current = {}
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        for component_id, vendor_id, price in connection.execute(
+            select(prices.c.component_id, prices.c.vendor_id, prices.c.price)
+            .where(prices.c.component_id.in_(ids[start:start + ID_BATCH_SIZE]))
+        ):
+            current[(component_id, vendor_id)] = price
+    return current
+
+
+def _money(value) -> str:
+    return str(Decimal(str(value)).quantize(Decimal("0.01")))
+
+
+def _fire(connection, fired: List[dict]) -> None:
+    """Deactivate fired watches and queue their alerts"""
+    if not fired:
+        return
+    now = datetime.now(timezone.utc)
+    watches = PriceWatch.__table__
+    connection.execute(
+        watches.update()
+        .where(watches.c.id == bindparam("watch_id"), watches.c.is_active == true())
+        .values(is_active=False, triggered_at=now, triggered_price=bindparam("price")),
+        [{"watch_id": f["watch_id"], "price": f["price"]} for f in fired],
+    )
+    connection.execute(Notification.__table__.insert(), [
+        {
+            "user_id": f["user_id"],
+            "kind": "price_alert",
+            "payload": {
+                "watch_id": f["watch_id"],
+                "component_id": f["component_id"],
+                "component_name": f["component_name"],
+                "vendor_id": f["vendor_id"],
+                "price": _money(f["price"]),
+                "target_price": _money(f["target_price"]),
+                "in_stock": f["in_stock"],
+            },
+            "created_at": now,
+        }
+        for f in fired
+    ])
+
+
+def match_price_changes(connection, changes: Iterable[dict]) -> int:
+    """Fire the watches crossed by price changes; returns how many fired.
+
+    Each change has component_id, vendor_id, price, in_stock and old_price
+    (None for a new offer). Only drops can cross a target.
+    """
+    drops = [
+        c for c in changes
+        if c["price"] is not None and (c.get("old_price") is None or c["price"] < c["old_price"])
+    ]
+    watches = PriceWatch.__table__
+    components = Component.__table__
+    best: Dict[int, dict] = {}
+    for start in range(0, len(drops), BATCH_SIZE):
+        batch = drops[start:start + BATCH_SIZE]
+        crossed = or_(*[
+            and_(
+                watches.c.component_id == c["component_id"],
+                watches.c.target_price >= c["price"],
+                *([watches.c.target_price < c["old_price"]] if c.get("old_price") is not None else []),
+            )
+            for c in batch
+        ])
+        rows = connection.execute(
+            select(watches.c.id, watches.c.user_id, watches.c.component_id, watches.c.target_price, components.c.name)
+            .join(components, watches.c.component_id == components.c.id)
+            .where(watches.c.is_active == true(), crossed)
+        ).all()
+        for watch_id, user_id, component_id, target, name in rows:
+            for change in batch:
+                if change["component_id"] != component_id or change["price"] > target:
+                    continue
+                if change.get("old_price") is not None and target >= change["old_price"]:
+                    continue
+                # A watch crossed by several offers alerts once, with the lowest
+                if watch_id not in best or change["price"] < best[watch_id]["price"]:
+                    best[watch_id] = {
+                        "watch_id": watch_id, "user_id": user_id, "component_id": component_id,
+                        "component_name": name, "target_price": target,
+                        "vendor_id": change["vendor_id"], "price": change["price"],
+                        "in_stock": bool(change.get("in_stock", True)),
+                    }
+    _fire(connection, list(best.values()))
+    return len(best)
+
+
+def check_new_watch(connection, watch: PriceWatch) -> bool:
+    """Fire a just-created watch if some offer is already at or below its target"""
+    prices = ComponentPrice.__table__
+    offer = connection.execute(
+        select(prices.c.vendor_id, prices.c.price, prices.c.in_stock)
+        .where(prices.c.component_id == watch.component_id, prices.c.price <= watch.target_price)
+        .order_by(prices.c.price)
+        .limit(1)
+    ).first()
+    if offer is None:
+        return False
+    name = connection.execute(select(Component.name).where(Component.id == watch.component_id)).scalar()
+    _fire(connection, [{
+        "watch_id": watch.id, "user_id": watch.user_id, "component_id": watch.component_id,
+        "component_name": name, "target_price": watch.target_price,
+        "vendor_id": offer.vendor_id, "price": offer.price, "in_stock": bool(offer.in_stock),
+    }])
+    return True
+
+
+def _price_changes(session: Session) -> List[dict]:
+    changes = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, ComponentPrice):
+            continue
+        old_price: Optional[Decimal] = None
+        if obj not in session.new:
+            attrs = inspect(obj).attrs
+            if not attrs.price.history.has_changes():
+                continue
+            moved = attrs.component_id.history.has_changes() or attrs.vendor_id.history.has_changes()
+            if not moved:
+                old_price = next(iter(attrs.price.history.deleted), None)
+        changes.append({
+            "component_id": obj.component_id,
+            "vendor_id": obj.vendor_id,
+            "price": Decimal(str(obj.price)) if obj.price is not None else None,
+            "old_price": Decimal(str(old_price)) if old_price is not None else None,
+            "in_stock": obj.in_stock,
+        })
+    return changes
+
+
+@event.listens_for(Session, "after_flush")
+def _match_after_flush(session, flush_context):
+    changes = _price_changes(session)
+    if changes:
+        match_price_changes(session.connection(), changes)
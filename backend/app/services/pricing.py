@@ -0,0 +1,103 @@
+"""
+Batched build pricing.
+
+Prices any set of components with a single query over `component_prices`
+joined to vendors, and derives the cheapest offer per component, the
+cheapest build total and a per-vendor breakdown (what buying everything a
+vendor carries from that vendor would cost).
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Mapping, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.component import ComponentPrice, Vendor
+
+
+def fetch_offers(db: Session, component_ids: Iterable[int]) -> Dict[int, List[dict]]:
+    """All vendor offers for the given components, cheapest first, in one query"""
+    ids = sorted({int(i) for i in component_ids})
+    offers: Dict[int, List[dict]] = defaultdict(list)
+    if not ids:
+        return offers
+    rows = db.execute(
+        select(
+            ComponentPrice.component_id, ComponentPrice.vendor_id, Vendor.name,
+            ComponentPrice.price, ComponentPrice.in_stock, ComponentPrice.url
+        )
+        .join(Vendor, ComponentPrice.vendor_id == Vendor.id)
+        .where(ComponentPrice.component_id.in_(ids))
+        .order_by(ComponentPrice.component_id, ComponentPrice.price)
+    )
+    for component_id, vendor_id, vendor_name, price, in_stock, url in rows:
+        offers[component_id].append({
+            "vendor_id": vendor_id,
+            "vendor_name": vendor_name,
+            "price": Decimal(price),
+            "in_stock": bool(in_stock),
+            "url": url,
+        })
+    return offers
+
+
+def price_build(db: Session, components: Mapping[str, int]) -> dict:
+    """Price a build given as {slot: component_id}.
+
+    The total uses each component's cheapest offer regardless of stock, as
+    saved builds always have; the per-vendor breakdown lists what each
+    vendor can supply and which components it is missing.
+    """
+    slots = {slot: int(component_id) for slot, component_id in components.items() if component_id is not None}
+    offers = fetch_offers(db, slots.values())
+
+    priced = []
+    total = Decimal("0")
+    missing = []
+    vendor_totals: Dict[int, dict] = {}
+    for slot, component_id in slots.items():
+        component_offers = offers.get(component_id, [])
+        cheapest: Optional[dict] = component_offers[0] if component_offers else None
+        if cheapest is None:
+            missing.append(component_id)
+        else:
+            total += cheapest["price"]
+        priced.append({
+            "slot": slot,
+            "component_id": component_id,
+            "cheapest": cheapest,
+            "offers": component_offers,
+        })
+
+        # Offers are sorted by price, so the first offer per vendor is its best
+        seen = set()
+        for offer in component_offers:
+            if offer["vendor_id"] in seen:
+                continue
+            seen.add(offer["vendor_id"])
+            entry = vendor_totals.setdefault(offer["vendor_id"], {
+                "vendor_id": offer["vendor_id"],
+                "vendor_name": offer["vendor_name"],
+                "total": Decimal("0"),
+                "slots": set(),
+            })
+            entry["total"] += offer["price"]
+            entry["slots"].add(slot)
+
+    vendors = []
+    for entry in vendor_totals.values():
+        vendors.append({
+            "vendor_id": entry["vendor_id"],
+            "vendor_name": entry["vendor_name"],
+            "total": entry["total"],
+            "component_count": len(entry["slots"]),
+            "missing_component_ids": [slots[s] for s in slots if s not in entry["slots"]],
+        })
+    # Vendors that can supply the most parts first, then cheapest
+    vendors.sort(key=lambda v: (-v["component_count"], v["total"]))
+
+    return {
+        "total_price": total,
+        "components": priced,
+        "vendors": vendors,
+        "missing_component_ids": missing,
+    }
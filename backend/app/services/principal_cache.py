@@ -0,0 +1,82 @@
+"""
+Authenticated-user cache.
+
+Every authenticated request used to decode its JWT and then load the User
+row. Both results are now kept in process: decoded tokens for the rest of
+their validity, and active users as immutable `Principal`s keyed by id, so
+a warm request identifies its caller without touching the database.
+
+User writes made through a Session (deactivation, username or email
+changes, deletes) drop the principal once the transaction commits; writers
+that bypass the ORM must call `invalidate_principal` themselves. The TTL
+bounds staleness from writes made by other processes.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.user import User
+from ..utils.cache import TTLCache
+
+principal_cache = TTLCache(maxsize=settings.principal_cache_size, ttl=settings.principal_cache_ttl_seconds)
+
+# Decoded tokens expire with the token itself, whatever the cache-wide TTL
+token_cache = TTLCache(maxsize=settings.principal_cache_size, ttl=settings.access_token_expire_minutes * 60)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller: the User columns routes read, detached from any session"""
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=bool(user.is_active),
+            created_at=user.created_at,
+        )
+
+
+def get_principal(user_id: int) -> Optional[Principal]:
+    return principal_cache.get(("user", user_id))
+
+
+def cache_principal(principal: Principal) -> None:
+    # Only active users are cached; inactive ones are rejected on every lookup
+    if principal.is_active:
+        principal_cache.set(("user", principal.id), principal)
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """Drop a cached principal (all when None)"""
+    principal_cache.invalidate("user", user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session, flush_context):
+    stale = {
+        obj.id for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, User) and (obj in session.deleted or session.is_modified(obj))
+    }
+    if stale:
+        session.info.setdefault("pending_principal_invalidations", set()).update(stale)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop("pending_principal_invalidations", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("pending_principal_invalidations", None)
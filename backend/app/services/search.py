@@ -0,0 +1,343 @@
+"""
+Component full-text search.
+
+Every component has a row in `component_search_documents` holding its name
+and brand (title) and its flattened spec values (body). The row is rebuilt
+by a flush hook whenever a component is written.
+
+On PostgreSQL, searches run against a weighted tsvector GIN index with
+prefix matching, plus a pg_trgm index on the title for typo tolerance.
+Other dialects (SQLite test setups) use an in-process inverted index that
+is loaded from the documents table on first use and updated on commit.
+It is per-process, so it only sees writes made by the same worker.
+"""
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, event, select, case, func, literal, or_
+from sqlalchemy.orm import Session, Query
+from ..models.component import Component, ComponentSearchDocument, component_search_vector
+
+# Upper bound on matches the in-process index hands back to SQL as an IN list
+MAX_MATCHES = 1000
+BATCH_SIZE = 500
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+
+# Field weights and match-quality multipliers for in-process ranking
+TITLE_WEIGHT = 3.0
+BODY_WEIGHT = 1.0
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.5
+MAX_PREFIX_EXPANSIONS = 50
+MAX_FUZZY_EXPANSIONS = 10
+MIN_FUZZY_SIMILARITY = 0.3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens, keeping decimals like '3.5ghz' whole"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def flatten_specs(specs: Optional[dict]) -> str:
+    """Spec values as plain text; true flags contribute their key instead"""
+    parts = []
+    for key, value in (specs or {}).items():
+        if value is True:
+            parts.append(key.replace("_", " "))
+        elif value not in (None, False):
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+def build_document(name: str, brand: Optional[str], specs: Optional[dict]) -> dict:
+    return {
+        "title": " ".join(p for p in (name, brand) if p),
+        "body": flatten_specs(specs),
+    }
+
+
+# ========== Document maintenance ==========
+def refresh_search_documents(connection, component_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    """Rebuild search documents for the given components, or all of them when None"""
+    components = Component.__table__
+    documents = ComponentSearchDocument.__table__
+    query = select(components.c.id, components.c.name, components.c.brand, components.c.specs)
+
+    if component_ids is None:
+        connection.execute(documents.delete())
+        batches = [connection.execute(query).all()]
+    else:
+        ids = sorted(set(component_ids))
+        batches = []
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            connection.execute(documents.delete().where(documents.c.component_id.in_(batch)))
+            batches.append(connection.execute(query.where(components.c.id.in_(batch))).all())
+
+    rows = [
+        {"component_id": row.id, **build_document(row.name, row.brand, row.specs)}
+        for batch in batches for row in batch
+    ]
+    if rows:
+        connection.execute(documents.insert(), rows)
+    return rows
+
+
+def _touched_component_ids(session: Session) -> set:
+    touched = set()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Component) and (obj in session.new or session.is_modified(obj)):
+            touched.add(obj.id)
+    return touched
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_after_flush(session, flush_context):
+    touched = _touched_component_ids(session)
+    if not touched:
+        return
+    rows = refresh_search_documents(session.connection(), touched)
+    if session.bind is not None and session.bind.dialect.name != "postgresql":
+        session.info.setdefault("pending_search_documents", []).extend(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session):
+    rows = session.info.pop("pending_search_documents", None)
+    if rows and _memory_index is not None:
+        for row in rows:
+            _memory_index.add(row["component_id"], row["title"], row["body"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop("pending_search_documents", None)
+
+
+# ========== In-process inverted index ==========
+class InvertedIndex:
+    """Token -> postings index with prefix and trigram (typo) expansion.
+
+    Postings are kept per field so every (field, expansion) pair forms a tier
+    with a single score. Searches walk the rarest query term's tiers best-first
+    and stop as soon as no remaining candidate can enter the top results.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._title: Dict[str, set] = {}
+        self._body: Dict[str, set] = {}
+        self._doc_tokens: Dict[int, Tuple[set, set]] = {}
+        self._vocabulary: List[str] = []
+        self._trigrams: Dict[str, set] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    @staticmethod
+    def _token_trigrams(token: str) -> set:
+        padded = f"  {token} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _known(self, token: str) -> bool:
+        return token in self._title or token in self._body
+
+    def add(self, doc_id: int, title: str, body: str) -> None:
+        title_tokens = set(tokenize(title))
+        body_tokens = set(tokenize(body)) - title_tokens
+
+        with self._lock:
+            self.remove(doc_id)
+            for postings, tokens in ((self._title, title_tokens), (self._body, body_tokens)):
+                for token in tokens:
+                    if not self._known(token):
+                        self._vocabulary.insert(bisect_left(self._vocabulary, token), token)
+                        for gram in self._token_trigrams(token):
+                            self._trigrams[gram].add(token)
+                    postings.setdefault(token, set()).add(doc_id)
+            self._doc_tokens[doc_id] = (title_tokens, body_tokens)
+
+    def extend(self, doc_id: int, body: str) -> None:
+        """Add more body text to an indexed document without re-reading what it already holds"""
+        with self._lock:
+            title_tokens, body_tokens = self._doc_tokens.setdefault(doc_id, (set(), set()))
+            for token in set(tokenize(body)) - title_tokens - body_tokens:
+                if not self._known(token):
+                    self._vocabulary.insert(bisect_left(self._vocabulary, token), token)
+                    for gram in self._token_trigrams(token):
+                        self._trigrams[gram].add(token)
+                self._body.setdefault(token, set()).add(doc_id)
+                body_tokens.add(token)
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            fields = self._doc_tokens.pop(doc_id, None)
+            if fields is None:
+                return
+            for postings, tokens in zip((self._title, self._body), fields):
+                for token in tokens:
+                    postings[token].discard(doc_id)
+                    if not postings[token]:
+                        del postings[token]
+                    if not self._known(token):
+                        self._vocabulary.pop(bisect_left(self._vocabulary, token))
+                        for gram in self._token_trigrams(token):
+                            self._trigrams[gram].discard(token)
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens matching a query token, with a match-quality factor"""
+        expansions = []
+        if self._known(term):
+            expansions.append((term, 1.0))
+        start = bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+            if not token.startswith(term):
+                break
+            if token != term:
+                expansions.append((token, PREFIX_FACTOR))
+        if expansions or len(term) < 3:
+            return expansions
+
+        grams = self._token_trigrams(term)
+        overlap: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for token in self._trigrams.get(gram, ()):
+                overlap[token] += 1
+        scored = []
+        for token, shared in overlap.items():
+            similarity = shared / (len(grams) + len(self._token_trigrams(token)) - shared)
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                scored.append((token, FUZZY_FACTOR * similarity))
+        scored.sort(key=lambda item: -item[1])
+        return scored[:MAX_FUZZY_EXPANSIONS]
+
+    def _tiers(self, term: str) -> List[Tuple[float, set]]:
+        """(score, ids) tiers for one query term, best first, weighted by selectivity"""
+        tiers = []
+        for token, factor in self._expand(term):
+            if token in self._title:
+                tiers.append((TITLE_WEIGHT * factor, self._title[token]))
+            if token in self._body:
+                tiers.append((BODY_WEIGHT * factor, self._body[token]))
+        if not tiers:
+            return []
+        matched = sum(len(ids) for _, ids in tiers)
+        idf = math.log(1 + max(len(self._doc_tokens), 1) / matched)
+        return sorted(((score * idf, ids) for score, ids in tiers), key=lambda tier: -tier[0])
+
+    def search(self, text: str, limit: int = MAX_MATCHES, allowed: Optional[set] = None) -> List[Tuple[int, float]]:
+        """Ids matching every query token, best first, as (id, score) pairs.
+
+        With `allowed`, only those ids are considered, so filters applied
+        elsewhere don't cut into the `limit` best matches.
+        """
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return []
+
+        with self._lock:
+            per_term = []
+            for term in terms:
+                tiers = self._tiers(term)
+                if not tiers:
+                    return []
+                per_term.append(tiers)
+
+            # Drive from the rarest term and probe the others by set membership
+            per_term.sort(key=lambda tiers: sum(len(ids) for _, ids in tiers))
+            driver, others = per_term[0], per_term[1:]
+            others_best = sum(tiers[0][0] for tiers in others)
+
+            scores: Dict[int, float] = {}
+            for weight, ids in driver:
+                # Small slack so float summation order never hides a best-possible hit
+                ceiling = weight + others_best - 1e-9
+                if len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] >= ceiling:
+                    break
+                at_ceiling = sum(1 for score in scores.values() if score >= ceiling)
+                for doc_id in ids:
+                    if doc_id in scores or (allowed is not None and doc_id not in allowed):
+                        continue
+                    score = weight
+                    for tiers in others:
+                        best = next((s for s, other_ids in tiers if doc_id in other_ids), None)
+                        if best is None:
+                            break
+                        score += best
+                    else:
+                        scores[doc_id] = score
+                        if score >= ceiling:
+                            at_ceiling += 1
+                            # Nothing later in the walk can outrank a full set of best-possible hits
+                            if at_ceiling >= limit:
+                                break
+                if at_ceiling >= limit:
+                    break
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+_memory_index: Optional[InvertedIndex] = None
+_memory_index_lock = threading.Lock()
+
+
+def get_memory_index(db: Session) -> InvertedIndex:
+    """The process-wide fallback index, loaded from the documents table on first use"""
+    global _memory_index
+    if _memory_index is None:
+        with _memory_index_lock:
+            if _memory_index is None:
+                index = InvertedIndex()
+                for row in db.execute(select(ComponentSearchDocument.__table__)):
+                    index.add(row.component_id, row.title, row.body)
+                _memory_index = index
+    return _memory_index
+
+
+# ========== Query integration ==========
+def apply_component_search(query: Query, db: Session, text: str, limit: Optional[int] = None) -> Tuple[Query, object]:
+    """Restrict a Component query to search matches; returns the query and a rank expression.
+
+    Apply it after every other filter. The in-process fallback then searches
+    only the components those filters leave, keeping every match, or just
+    the `limit` best when the caller pages by relevance.
+    """
+    terms = tokenize(text)
+    if not terms:
+        return query.filter(literal(False)), literal(0)
+
+    if db.bind.dialect.name == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = component_search_vector()
+        phrase = " ".join(terms)
+        query = query.join(ComponentSearchDocument, ComponentSearchDocument.component_id == Component.id).filter(
+            or_(vector.op("@@")(tsquery), literal(phrase).op("<%")(ComponentSearchDocument.title))
+        )
+        rank = func.ts_rank(vector, tsquery) + func.word_similarity(phrase, ComponentSearchDocument.title)
+        return query, rank
+
+    index = get_memory_index(db)
+    allowed = None
+    if query.whereclause is not None:
+        allowed = {component_id for (component_id,) in query.with_entities(Component.id).order_by(None)}
+    matches = index.search(text, limit=limit or max(len(index), 1), allowed=allowed)
+    if not matches:
+        return query.filter(literal(False)), literal(0)
+    scores = dict(matches)
+    # Rendered inline: a broad term can match more ids than SQLite allows bound parameters
+    ids = bindparam("search_ids", list(scores), expanding=True, literal_execute=True)
+    query = query.filter(Component.id.in_(ids))
+    return query, case(scores, value=Component.id, else_=0)
+
+
+if __name__ == "__main__":
+    # Backfill documents for an existing database: python -m app.services.search
+    from ..database import engine
+    with engine.begin() as conn:
+        count = len(refresh_search_documents(conn))
+    print(f"✅ Search documents rebuilt for {count} components")
@@ -0,0 +1,188 @@
+"""
+Typed spec attributes.
+
+`Component.specs` is free-form JSON with values like "3.5GHz", "8GB GDDR6"
+or "2460MHz". Whenever a component is written, each spec is parsed into a
+`component_attributes` row holding either a number in a canonical unit or
+an enum-like text value, so spec range filters ("tdp<=65",
+"boost_clock>=5GHz") run against an index instead of loading every row.
+
+Values with a unit and a trailing word ("8GB GDDR6") produce two attributes:
+the number under the spec's key and the word under `<key>_type`.
+"""
+import re
+from typing import Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import event, select, and_
+from sqlalchemy.orm import Session
+from ..models.component import Component, ComponentAttribute
+
+BATCH_SIZE = 500
+
+# Unit (lower-cased) -> (canonical unit, multiplier)
+UNITS = {
+    "ghz": ("MHz", 1000.0),
+    "mhz": ("MHz", 1.0),
+    "hz": ("Hz", 1.0),
+    "tb": ("GB", 1000.0),
+    "gb": ("GB", 1.0),
+    "mb": ("GB", 0.001),
+    "gb/s": ("MB/s", 1000.0),
+    "mb/s": ("MB/s", 1.0),
+    "mm": ("mm", 1.0),
+    "cm": ("mm", 10.0),
+    "ms": ("ms", 1.0),
+    "w": ("W", 1.0),
+    "rpm": ("rpm", 1.0),
+    '"': ("in", 1.0),
+    "in": ("in", 1.0),
+}
+
+_QUANTITY_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([A-Za-z/"]*)\s*(?:\s([A-Za-z0-9]+))?\s*$')
+_LATENCY_RE = re.compile(r"^\s*CL(\d+)\s*$", re.IGNORECASE)
+_FILTER_RE = re.compile(r"^\s*([a-z0-9_]+)\s*(<=|>=|<|>|=)\s*(.+?)\s*$")
+
+# Boolean specs are stored as numbers, so equality filters on them compare 1/0
+_BOOLEANS = {"true": 1.0, "false": 0.0}
+
+
+def parse_value(value) -> Optional[Tuple[Optional[float], Optional[str], Optional[str], Optional[str]]]:
+    """Parse one spec value into (number, canonical unit, text, trailing type word)"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return float(value), None, None, None
+    if isinstance(value, (int, float)):
+        return float(value), None, None, None
+    text = str(value).strip()
+    if not text:
+        return None
+
+    latency = _LATENCY_RE.match(text)
+    if latency:
+        return float(latency.group(1)), "CL", None, None
+
+    match = _QUANTITY_RE.match(text)
+    if match:
+        number, unit, kind = match.groups()
+        if not unit:
+            if not kind:
+                return float(number), None, None, None
+        elif unit.lower() in UNITS:
+            canonical, multiplier = UNITS[unit.lower()]
+            return float(number) * multiplier, canonical, None, kind
+    return None, None, text[:255], None
+
+
+def extract_attributes(component_id: int, specs: Optional[dict]) -> List[dict]:
+    """Attribute rows for one component's specs"""
+    rows = []
+    for key, value in (specs or {}).items():
+        parsed = parse_value(value)
+        if parsed is None:
+            continue
+        number, unit, text, kind = parsed
+        rows.append({
+            "component_id": component_id, "name": key,
+            "num_value": number, "text_value": text, "unit": unit,
+        })
+        if kind:
+            rows.append({
+                "component_id": component_id, "name": f"{key}_type",
+                "num_value": None, "text_value": kind, "unit": None,
+            })
+    return rows
+
+
+def refresh_component_attributes(connection, component_ids: Optional[Iterable[int]] = None) -> None:
+    """Re-extract attributes for the given components, or all of them when None"""
+    components = Component.__table__
+    attributes = ComponentAttribute.__table__
+    query = select(components.c.id, components.c.specs)
+
+    if component_ids is None:
+        connection.execute(attributes.delete())
+        batches = [connection.execute(query).all()]
+    else:
+        ids = sorted(set(component_ids))
+        batches = []
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = ids[start:start + BATCH_SIZE]
+            connection.execute(attributes.delete().where(attributes.c.component_id.in_(batch)))
+            batches.append(connection.execute(query.where(components.c.id.in_(batch))).all())
+
+    rows = [attr for batch in batches for row in batch for attr in extract_attributes(row.id, row.specs)]
+    if rows:
+        connection.execute(attributes.insert(), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_after_flush(session, flush_context):
+    touched = {
+        obj.id for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Component) and (obj in session.new or session.is_modified(obj))
+    }
+    if touched:
+        refresh_component_attributes(session.connection(), touched)
+
+
+def parse_spec_filters(filters: Iterable[str]) -> List[Tuple[str, str, Optional[float], Optional[str]]]:
+    """Parse `name<op>value` filters such as 'tdp<=65' or 'boost_clock>=5GHz'.
+
+    Returns (name, operator, number, text); values with units are converted
+    to the attribute's canonical unit, so '5GHz' compares as 5000 (MHz), and
+    'curved=true' matches the boolean spec stored as 1.
+    """
+    parsed = []
+    for raw in filters:
+        match = _FILTER_RE.match(raw)
+        if not match:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid spec filter '{raw}', expected e.g. 'tdp<=65' or 'socket=AM5'"
+            )
+        name, op, value = match.groups()
+        if op == "=" and value.lower() in _BOOLEANS:
+            value = _BOOLEANS[value.lower()]
+        value = parse_value(value)
+        if value is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Spec filter '{raw}' needs a value"
+            )
+        number, _, text, _ = value
+        if op != "=" and number is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Spec filter '{raw}' needs a numeric value"
+            )
+        parsed.append((name, op, number, text))
+    return parsed
+
+
+def apply_spec_filters(query, filters: Iterable[str]):
+    """Restrict a Component query to components whose attributes satisfy every filter"""
+    comparisons = {
+        "<=": lambda col, v: col <= v,
+        ">=": lambda col, v: col >= v,
+        "<": lambda col, v: col < v,
+        ">": lambda col, v: col > v,
+        "=": lambda col, v: col == v,
+    }
+    for name, op, number, text in parse_spec_filters(filters):
+        if number is not None:
+            condition = comparisons[op](ComponentAttribute.num_value, number)
+        else:
+            condition = ComponentAttribute.text_value == text
+        query = query.filter(Component.id.in_(
+            select(ComponentAttribute.component_id).where(and_(ComponentAttribute.name == name, condition))
+        ))
+    return query
+
+
+if __name__ == "__main__":
+    # Backfill attributes for an existing database: python -m app.services.spec_attributes
+    from ..database import engine
+    with engine.begin() as conn:
+        refresh_component_attributes(conn)
+    print("✅ Component attributes rebuilt")
@@ -1,32 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Callable, Optional, Tuple, TypeVar
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from ..config import settings
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models.user import User
 from ..schemas.user import TokenData
+from ..services.principal_cache import Principal, cache_principal, get_principal, token_cache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+T = TypeVar("T")
+
+# bcrypt releases the GIL, so a few dedicated threads hash in parallel
+# without taking the request threadpool away from other routes
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="bcrypt")
+
+
+class _HashQueueTimeout(Exception):
+    pass
+
+
+# passlib and jose (with cryptography) are imported on first use, keeping
+# them off the cold-start path of requests that never authenticate
+@lru_cache()
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+
+
+def _bcrypt_secret(password: str) -> str:
+    # bcrypt has a 72-byte limit, truncate so hashing and verifying agree
+    return password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # bcrypt has a 72-byte limit, truncate to match hashing
-    password_bytes = plain_password.encode('utf-8')[:72]
-    return pwd_context.verify(password_bytes.decode('utf-8', errors='ignore'), hashed_password)
+    return get_pwd_context().verify(_bcrypt_secret(plain_password), hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    # bcrypt has a 72-byte limit, truncate to avoid errors
-    password_bytes = password.encode('utf-8')[:72]
-    return pwd_context.hash(password_bytes.decode('utf-8', errors='ignore'))
+    return get_pwd_context().hash(_bcrypt_secret(password))
+
+
+async def _run_hashing(fn: Callable[..., T], *args) -> T:
+    """Run fn on the hashing pool; 503 if it waited in the queue past the timeout.
+
+    Jobs that time out are dropped before hashing, so a login storm drains
+    quickly instead of burning CPU on requests whose clients gave up.
+    """
+    queued_at = time.monotonic()
+    
+    def job():
+        if time.monotonic() - queued_at > settings.password_hash_queue_timeout_seconds:
+            raise _HashQueueTimeout()
+        return fn(*args)
+    
+    try:
+        return await asyncio.wrap_future(_hash_executor.submit(job))
+    except _HashQueueTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def hash_password(password: str) -> str:
+    """get_password_hash on the hashing pool"""
+    return await _run_hashing(get_password_hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify on the hashing pool; also returns a fresh hash when the stored one uses an outdated cost"""
+    return await _run_hashing(get_pwd_context().verify_and_update, _bcrypt_secret(plain_password), hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -37,38 +94,100 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def decode_access_token(token: str) -> TokenData:
+    """Validate a bearer token and return its claims; raises 401 on any failure.
+
+    Valid tokens are memoized until they expire, so a repeat request skips
+    the signature check.
+    """
+    token_data = token_cache.get(("token", token))
+    if token_data is not None:
+        return token_data
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        token_data = TokenData(user_id=user_id)
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == token_data.user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        subject = payload.get("sub")
+        if subject is None:
+            raise _credentials_exception()
+        token_data = TokenData(user_id=int(subject))
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(("token", token), token_data, ttl=remaining)
+    return token_data
+
+
+def _active_principal(user: Optional[User]) -> Principal:
+    if user is None or not user.is_active:
+        raise _credentials_exception()
+    principal = Principal.from_user(user)
+    cache_principal(principal)
+    return principal
+
+
+# The user lookup is synchronous, so without the async engine the dependency
+# is a plain function that FastAPI runs in the threadpool, off the event loop.
+# Either way a cached principal answers without a query.
+def _get_current_user_sync(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    token_data = decode_access_token(token)
+    principal = get_principal(token_data.user_id)
+    if principal is not None:
+        return principal
+    return _active_principal(db.query(User).filter(User.id == token_data.user_id).first())
+
+
+async def _get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    token_data = decode_access_token(token)
+    principal = get_principal(token_data.user_id)
+    if principal is not None:
+        return principal
+    user = (await db.execute(select(User).where(User.id == token_data.user_id))).scalar_one_or_none()
+    return _active_principal(user)
+
 
+get_current_user = _get_current_user_async if settings.async_database else _get_current_user_sync
 
-async def get_current_user_optional(
+
+def _get_current_user_optional_sync(
     db: Session = Depends(get_db),
     token: Optional[str] = Depends(oauth2_scheme)
-) -> Optional[User]:
-    """Get current user if authenticated, otherwise return None"""
+) -> Optional[Principal]:
     if not token:
         return None
     try:
-        return await get_current_user(token, db)
+        return _get_current_user_sync(token, db)
     except HTTPException:
         return None
+
+
+async def _get_current_user_optional_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: Optional[str] = Depends(oauth2_scheme)
+) -> Optional[Principal]:
+    if not token:
+        return None
+    try:
+        return await _get_current_user_async(token, db)
+    except HTTPException:
+        return None
+
+
+# Get current user if authenticated, otherwise None
+get_current_user_optional = (
+    _get_current_user_optional_async if settings.async_database else _get_current_user_optional_sync
+)
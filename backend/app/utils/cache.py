@@ -0,0 +1,88 @@
+"""
+Bounded in-process LRU cache with per-entry TTL.
+
+Keys are tuples whose first element names a scope, e.g. ("categories",) or
+("component", 42), so writers can drop a whole scope or a single entry.
+Safe to share between the threadpool workers that run sync routes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[Hashable, ...], default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Tuple[Hashable, ...], value: Any, ttl: Optional[float] = None) -> None:
+        """Store value for key; ttl overrides the cache-wide lifetime for this entry"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Tuple[Hashable, ...], loader: Callable[[], Any]) -> Any:
+        """Cached value for key, calling loader and storing its result on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, scope: Hashable, ident: Optional[Hashable] = None) -> None:
+        """Drop every entry in a scope, or only those for one identifier within it"""
+        with self._lock:
+            doomed = [
+                key for key in self._entries
+                if key[0] == scope and (ident is None or (len(key) > 1 and key[1] == ident))
+            ]
+            for key in doomed:
+                del self._entries[key]
+            self.invalidations += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
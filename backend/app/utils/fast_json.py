@@ -0,0 +1,47 @@
+"""
+JSON for trusted response data.
+
+Rows read straight from the database as plain dicts don't need pydantic
+validation or `jsonable_encoder`'s recursive walk before encoding. `dumps`
+writes them in the same format pydantic's JSON mode does (Decimal as a
+string, UTC datetimes with a Z suffix), so a response body is the same
+either way. It uses orjson when installed and falls back to the stdlib
+encoder otherwise.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON for dicts, lists and scalars (incl. Decimal and datetime)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class TrustedJSONResponse(Response):
+    """A JSON response encoded with `dumps`. Returning one from a route skips
+    its response_model, so only use it for data already in that shape."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
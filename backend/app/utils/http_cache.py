@@ -0,0 +1,88 @@
+"""
+HTTP caching helpers: strong ETags and conditional GETs.
+
+A response body is serialized once and stored in a `TTLCache` together with
+an ETag derived from its content hash, so the tag is the same in every
+process and behind a CDN. A request whose `If-None-Match` matches the cached
+tag gets a 304 without touching the database or serializing anything.
+Headers stored with a body (such as a page's next cursor) are part of its
+ETag and are repeated on the 304, since they describe the same
+representation.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from .cache import TTLCache
+from .fast_json import dumps
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def render_json(content: Any, headers: Optional[Dict[str, str]] = None) -> CachedBody:
+    """Serialize content to JSON and tag it with a strong, content-derived ETag"""
+    body = json.dumps(jsonable_encoder(content), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return _tagged(body, headers)
+
+
+def render_trusted_json(content: Any, headers: Optional[Dict[str, str]] = None) -> CachedBody:
+    """render_json for plain dicts already in the response shape: no encoder pass, same bytes"""
+    return _tagged(dumps(content), headers)
+
+
+def _tagged(body: bytes, headers: Optional[Dict[str, str]]) -> CachedBody:
+    headers = dict(headers or {})
+    digest = hashlib.sha256(body)
+    for name, value in sorted(headers.items()):
+        digest.update(f"\n{name.lower()}: {value}".encode("utf-8"))
+    etag = '"' + digest.hexdigest()[:32] + '"'
+    return CachedBody(body=body, etag=etag, headers=headers)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as If-None-Match requires: W/ prefixes are ignored, '*' matches anything"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def cached_response(request: Request, entry: CachedBody, cache_control: str) -> Response:
+    """The cached body, or a 304 with its headers but no body when the client's ETag is current"""
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def conditional_response(
+    request: Request,
+    cache: TTLCache,
+    key: Tuple[Hashable, ...],
+    loader: Callable[[], CachedBody],
+    cache_control: str,
+) -> Response:
+    """Serve key from cache (loading it on a miss), answering 304 when the client's ETag is current"""
+    return cached_response(request, cache.get_or_load(key, loader), cache_control)
+
+
+async def conditional_response_async(
+    request: Request,
+    cache: TTLCache,
+    key: Tuple[Hashable, ...],
+    loader: Callable[[], Awaitable[CachedBody]],
+    cache_control: str,
+) -> Response:
+    """conditional_response for async routes, awaiting the loader on a miss"""
+    entry = cache.get(key)
+    if entry is None:
+        entry = await loader()
+        cache.set(key, entry)
+    return cached_response(request, entry, cache_control)
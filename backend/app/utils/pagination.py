@@ -0,0 +1,71 @@
+"""
+Opaque keyset cursors for list endpoints.
+
+A cursor encodes the sort mode plus the sort-key values of the last row on
+a page. The next page filters on "key after cursor" against a composite
+index, so page N costs the same as page 1 and concurrent inserts do not
+shift rows between pages the way OFFSET does.
+"""
+import base64
+import json
+import math
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, List
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"d": str(value)}
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "d" in value:
+            return Decimal(value["d"])
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+    return value
+
+
+def _valid_key(value: Any) -> bool:
+    """A decoded sort key a comparison can bind: a finite scalar in database range, datetime or None"""
+    if value is None or isinstance(value, (str, datetime)):
+        return True
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return -2**63 <= value < 2**63
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return isinstance(value, Decimal) and value.is_finite()
+
+
+def encode_cursor(mode: str, *keys: Any) -> str:
+    """Encode a sort mode and the last row's sort keys into an opaque cursor"""
+    payload = json.dumps([mode, *[_encode_value(k) for k in keys]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, mode: str, key_count: int) -> List[Any]:
+    """Decode a cursor, checking it was issued for the same sort mode"""
+    invalid = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in payload]
+    except (ValueError, TypeError, KeyError, InvalidOperation):
+        raise invalid
+    if not isinstance(payload, list) or len(values) != key_count + 1 or values[0] != mode:
+        raise invalid
+    # The last key is always the row id tie-breaker
+    keys = values[1:]
+    if not all(_valid_key(k) for k in keys) or type(keys[-1]) is not int:
+        raise invalid
+    return keys
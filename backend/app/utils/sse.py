@@ -0,0 +1,50 @@
+"""
+Server-sent event responses over broker subscriptions.
+
+Streams need a long-lived server process, so routes refuse them in
+serverless mode. A stream sends a keepalive comment when idle, which is
+also when it notices a disconnected client and releases its subscription.
+"""
+from typing import Callable
+from fastapi import HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from ..config import settings
+from ..services.broker import KEEPALIVE, Subscription
+
+# Browsers reconnect after this many milliseconds when a stream ends
+RETRY_MILLISECONDS = 3000
+
+
+def require_streaming() -> None:
+    if settings.serverless:
+        raise HTTPException(status_code=404, detail="Event streams are not available in serverless mode")
+
+
+def too_many_streams() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many open event streams",
+        headers={"Retry-After": "5"},
+    )
+
+
+def event_stream_response(
+    request: Request, subscription: Subscription, release: Callable[[Subscription], None]
+) -> StreamingResponse:
+    """Stream a subscription's events until the client leaves or is evicted, then release it"""
+    async def stream():
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n".encode()
+            async for message in subscription.messages(settings.event_keepalive_seconds):
+                if message is KEEPALIVE and await request.is_disconnected():
+                    break
+                yield message
+        finally:
+            release(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # No caching, and no response buffering by nginx-style proxies
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,91 @@
+"""
+Cold start: interpreter launch to first response through the Mangum handler.
+
+Each run is a fresh interpreter that imports `app.main` and sends one API
+Gateway (HTTP API v2) event to `handler`, as Vercel/Lambda would, for a
+route that skips the database (/health) and one that queries it. Runs
+compare the regular startup with SERVERLESS=true (no create_all, lazy
+engine and auth libraries):
+
+    cd backend
+    python -m benchmarks.cold_start --runs 10
+    python -m benchmarks.cold_start --database-url postgresql://...
+
+Against a networked Postgres the create_all round trips dominate; SQLite
+mostly shows the import cost.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from .concurrency import DEFAULT_DATABASE_URL
+
+MODES = {"eager": "false", "serverless": "true"}
+PATHS = ("/health", "/api/components/1")
+
+
+def _event(path):
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"host": "bench", "accept": "application/json"},
+        "requestContext": {
+            "http": {"method": "GET", "path": path, "protocol": "HTTP/1.1", "sourceIp": "127.0.0.1", "userAgent": "bench"},
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+
+
+def run_worker(path, launched_at):
+    started = time.perf_counter()
+    from app.main import handler
+    imported = time.perf_counter()
+    response = handler(_event(path), {})
+    responded = time.perf_counter()
+    print(json.dumps({
+        "status": response["statusCode"],
+        "import_ms": round((imported - started) * 1000, 1),
+        "first_response_ms": round((responded - imported) * 1000, 1),
+        "total_ms": round((time.time() - launched_at) * 1000, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--launched-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.launched_at)
+        return
+
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    # Serverless runs expect the schema to exist, as after a deploy step; the
+    # seed data gives the database route a row to find
+    subprocess.run([sys.executable, "-m", "app.seed"], env=env, check=True, stdout=subprocess.DEVNULL)
+
+    print(f"{'mode':<12}{'path':<20}{'import ms':>11}{'1st resp ms':>13}{'total ms':>10}")
+    for mode, serverless in MODES.items():
+        for path in PATHS:
+            samples = []
+            for _ in range(args.runs):
+                output = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.cold_start", "--worker", path, "--launched-at", repr(time.time())],
+                    env=dict(env, SERVERLESS=serverless), check=True, capture_output=True, text=True
+                ).stdout
+                samples.append(json.loads(output.strip().splitlines()[-1]))
+            median = {key: statistics.median(s[key] for s in samples) for key in ("import_ms", "first_response_ms", "total_ms")}
+            print(f"{mode:<12}{path:<20}{median['import_ms']:>11}{median['first_response_ms']:>13}{median['total_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
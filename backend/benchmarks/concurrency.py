@@ -0,0 +1,176 @@
+"""
+Concurrency under mixed load: blocking auth vs threadpool vs async engine.
+
+Drives the app in-process over ASGI with many concurrent clients issuing a
+mix of authenticated reads (builds, /me) and public reads (forum threads,
+component listing and details). Each mode runs in a fresh interpreter,
+since the engine mode is read from settings at import:
+
+- blocking:   ASYNC_DATABASE=false with the old `async def get_current_user`
+              running its sync query on the event loop
+- threadpool: ASYNC_DATABASE=false, sync dependencies run off the loop
+- async:      ASYNC_DATABASE=true (aiosqlite / asyncpg)
+
+    cd backend
+    python -m benchmarks.concurrency --clients 50 --seconds 10
+    python -m benchmarks.concurrency --database-url postgresql://...
+
+SQLite queries take microseconds, so gaps widen against a networked
+Postgres where every query waits on a round trip. `--query-latency-ms`
+simulates that round trip on any database: each statement first waits,
+blocking its thread on the sync engine and yielding to the event loop on
+the async one, as a network driver would.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from .stats import percentile
+
+MODES = ("blocking", "threadpool", "async")
+DEFAULT_DATABASE_URL = "sqlite:///./benchmark.db"
+
+
+async def _drive(app, token, component_ids, thread_ids, clients, seconds):
+    import httpx
+
+    auth = {"Authorization": f"Bearer {token}"}
+    mix = [
+        (35, lambda: ("/api/builds", auth)),
+        (15, lambda: ("/api/auth/me", auth)),
+        (20, lambda: ("/api/forum/threads?limit=20", None)),
+        (10, lambda: (f"/api/forum/threads/{random.choice(thread_ids)}", None)),
+        (10, lambda: (f"/api/components/{random.choice(component_ids)}", None)),
+        (10, lambda: (f"/api/components?limit=20&skip={random.randint(0, 100)}", None)),
+    ]
+    weights = [w for w, _ in mix]
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(http):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            url, headers = random.choices(mix, weights)[0][1]()
+            started = time.perf_counter()
+            response = await http.get(url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        started = time.perf_counter()
+        await asyncio.gather(*[client(http) for _ in range(clients)])
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else 0.0,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def _install_blocking_auth(app):
+    """Restore the pre-async dependency: a sync query inside an async def, on the event loop"""
+    from fastapi import Depends
+    from sqlalchemy.orm import Session
+    from app.database import get_db
+    from app.models.user import User
+    from app.utils import auth
+
+    async def blocking_get_current_user(token: str = Depends(auth.oauth2_scheme), db: Session = Depends(get_db)):
+        token_data = auth.decode_access_token(token)
+        return db.query(User).filter(User.id == token_data.user_id).first()
+
+    app.dependency_overrides[auth.get_current_user] = blocking_get_current_user
+
+
+def _install_query_latency(latency_ms):
+    """Delay every statement by a simulated database round trip"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.util import await_only
+
+    delay = latency_ms / 1000
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _round_trip(conn, cursor, statement, parameters, context, executemany):
+        if conn.dialect.is_async:
+            await_only(asyncio.sleep(delay))
+        else:
+            time.sleep(delay)
+
+
+def run_worker(mode, clients, seconds, latency_ms=0.0):
+    from app.main import app
+    from app.database import SessionLocal
+    from app.models.component import Component
+    from app.models.forum import ForumThread
+    from app.models.user import User
+    from app.utils.auth import create_access_token
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).first()
+        component_ids = [i for (i,) in db.query(Component.id).limit(500)]
+        thread_ids = [i for (i,) in db.query(ForumThread.id).limit(500)]
+    finally:
+        db.close()
+    if mode == "blocking":
+        _install_blocking_auth(app)
+    if latency_ms:
+        _install_query_latency(latency_ms)
+    token = create_access_token({"sub": str(user.id)})
+    result = asyncio.run(_drive(app, token, component_ids, thread_ids, clients, seconds))
+    result["mode"] = mode
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--query-latency-ms", type=float, default=0.0,
+                        help="simulated database round trip added to every statement")
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.clients, args.seconds, args.query_latency_ms)
+        return
+
+    env = dict(os.environ, DATABASE_URL=args.database_url)
+    # Seed once (idempotent) so every mode reads the same data
+    subprocess.run(
+        [sys.executable, "-c", "from app.main import app; from app.seed import seed_database; seed_database()"],
+        env=env, check=True, stdout=subprocess.DEVNULL
+    )
+
+    print(f"{'mode':<12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode in args.modes:
+        # One pooled connection per client, so pool waits don't skew the comparison
+        worker_env = dict(
+            env, ASYNC_DATABASE="true" if mode == "async" else "false",
+            DATABASE_POOL_SIZE=str(args.clients)
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.concurrency", "--worker", mode,
+             "--clients", str(args.clients), "--seconds", str(args.seconds),
+             "--query-latency-ms", str(args.query_latency_ms)],
+            env=worker_env, check=True, capture_output=True, text=True
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<12}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Login storm: sign-in throughput and catalog latency while bcrypt is busy.
+
+Runs the app in-process over ASGI. Catalog clients browse components
+throughout three phases, while login clients hammer:
+
+- idle:   nothing (catalog baseline)
+- inline: a replica of the old sync login route, hashing on the request
+          threadpool that catalog routes also use
+- pool:   /api/auth/login, hashing on the dedicated bcrypt pool
+
+    cd backend
+    python -m benchmarks.login_storm --login-clients 64 --catalog-clients 16 --seconds 10
+
+Logins rejected with 503 waited in the hashing queue past
+PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS; they are counted but not as sign-ins.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from .concurrency import DEFAULT_DATABASE_URL
+from .stats import percentile
+
+PHASES = ("idle", "inline", "pool")
+INLINE_LOGIN_PATH = "/bench/login-inline"
+DEMO_CREDENTIALS = {"username": "demo@pcease.in", "password": "demo123"}
+
+
+def _install_inline_login(app):
+    """The pre-pool login route: a sync handler that verifies on the request threadpool"""
+    from fastapi import Depends, HTTPException
+    from fastapi.security import OAuth2PasswordRequestForm
+    from sqlalchemy.orm import Session
+    from app.database import get_db
+    from app.models.user import User
+    from app.utils.auth import create_access_token, verify_password
+
+    def inline_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+        user = db.query(User).filter(User.email == form_data.username).first()
+        if not user or not verify_password(form_data.password, user.hashed_password):
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        return {"access_token": create_access_token({"sub": str(user.id)}), "token_type": "bearer"}
+
+    app.add_api_route(INLINE_LOGIN_PATH, inline_login, methods=["POST"])
+
+
+async def _phase(http, login_path, component_ids, login_clients, catalog_clients, seconds):
+    catalog_latencies, logins, rejected, errors = [], 0, 0, 0
+    deadline = time.perf_counter() + seconds
+
+    async def browse():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            if random.random() < 0.5:
+                url = f"/api/components/{random.choice(component_ids)}"
+            else:
+                url = f"/api/components?limit=20&skip={random.randint(0, 100)}"
+            started = time.perf_counter()
+            response = await http.get(url)
+            catalog_latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    async def sign_in():
+        nonlocal logins, rejected, errors
+        while time.perf_counter() < deadline:
+            response = await http.post(login_path, data=DEMO_CREDENTIALS)
+            if response.status_code == 200:
+                logins += 1
+            elif response.status_code == 503:
+                rejected += 1
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    tasks = [browse() for _ in range(catalog_clients)]
+    if login_path:
+        tasks += [sign_in() for _ in range(login_clients)]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return {
+        "logins_per_second": round(logins / elapsed, 1),
+        "rejected": rejected,
+        "catalog_rps": round(len(catalog_latencies) / elapsed, 1),
+        "catalog_p50_ms": round(percentile(catalog_latencies, 50) * 1000, 2),
+        "catalog_p99_ms": round(percentile(catalog_latencies, 99) * 1000, 2),
+        "errors": errors,
+    }
+
+
+async def _run(phases, login_clients, catalog_clients, seconds):
+    import httpx
+    from app.main import app
+    from app.database import SessionLocal
+    from app.models.component import Component
+    from app.seed import seed_database
+
+    seed_database()
+    db = SessionLocal()
+    try:
+        component_ids = [i for (i,) in db.query(Component.id).limit(500)]
+    finally:
+        db.close()
+    _install_inline_login(app)
+    paths = {"idle": None, "inline": INLINE_LOGIN_PATH, "pool": "/api/auth/login"}
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        print(f"{'phase':<8}{'logins/s':>10}{'503s':>7}{'catalog/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for phase in phases:
+            r = await _phase(http, paths[phase], component_ids, login_clients, catalog_clients, seconds)
+            print(
+                f"{phase:<8}{r['logins_per_second']:>10}{r['rejected']:>7}{r['catalog_rps']:>11}"
+                f"{r['catalog_p50_ms']:>10}{r['catalog_p99_ms']:>10}{r['errors']:>8}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--login-clients", type=int, default=64)
+    parser.add_argument("--catalog-clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--phases", nargs="+", choices=PHASES, default=list(PHASES))
+    args = parser.parse_args()
+
+    # Settings are read at import, so the URL and pool size must be set first
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DATABASE_POOL_SIZE", str(args.login_clients + args.catalog_clients))
+    asyncio.run(_run(args.phases, args.login_clients, args.catalog_clients, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Serialization: validated list responses vs FAST_SERIALIZATION.
+
+Runs the app in-process over ASGI and requests the large list endpoints
+back to back, once per path:
+
+- validated: ORM objects through pydantic `from_attributes` validation,
+             or hand-built dicts re-validated by the response_model
+- fast:      column rows as plain dicts encoded straight to JSON
+             (orjson when installed, else the stdlib encoder)
+
+The catalog cache is cleared before every request so each one serializes.
+The forum gets a synthetic board first, so thread and reply pages are full.
+Both paths must return the same JSON, and the benchmark checks that.
+
+    cd backend
+    python -m benchmarks.serialization --requests 500
+"""
+import argparse
+import asyncio
+import os
+import time
+from .concurrency import DEFAULT_DATABASE_URL
+from .stats import percentile
+
+PATHS = ("validated", "fast")
+BENCH_THREAD_TITLE = "Serialization benchmark thread"
+
+
+def _ensure_forum(threads: int, replies: int) -> int:
+    """Synthetic threads and one long thread; returns that thread's id"""
+    from app.database import SessionLocal
+    from app.models.forum import ForumReply, ForumThread
+    from app.models.user import User
+    from app.services.forum_activity import rebuild_thread_activity
+
+    db = SessionLocal()
+    try:
+        existing = db.query(ForumThread.id).filter(ForumThread.title == BENCH_THREAD_TITLE).first()
+        if existing:
+            return existing.id
+        user_id = db.query(User.id).first().id
+        db.add_all(
+            ForumThread(user_id=user_id, title=f"Benchmark build #{i}", content="Need advice " * 40,
+                        category="Discussion")
+            for i in range(threads)
+        )
+        long_thread = ForumThread(user_id=user_id, title=BENCH_THREAD_TITLE, content="Replies below",
+                                  category="Discussion")
+        db.add(long_thread)
+        db.flush()
+        db.add_all(
+            ForumReply(thread_id=long_thread.id, user_id=user_id, content=f"Reply {i}: " + "looks good " * 20)
+            for i in range(replies)
+        )
+        db.flush()
+        rebuild_thread_activity(db.connection(), [long_thread.id])
+        db.commit()
+        return long_thread.id
+    finally:
+        db.close()
+
+
+async def _measure(http, url, requests):
+    from app.services.catalog_cache import catalog_cache
+
+    latencies, rows = [], 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        catalog_cache.clear()
+        began = time.perf_counter()
+        response = await http.get(url)
+        latencies.append(time.perf_counter() - began)
+        response.raise_for_status()
+        body = response.json()
+        rows += len(body) if isinstance(body, list) else len(body["replies"])
+    elapsed = time.perf_counter() - started
+    return {
+        "rows_per_second": round(rows / elapsed),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "body": body,
+    }
+
+
+async def _run(requests, threads, replies):
+    import httpx
+    from app.config import settings
+    from app.main import app
+    from app.seed import seed_database
+    from app.utils import fast_json
+
+    seed_database()
+    thread_id = _ensure_forum(threads, replies)
+    endpoints = {
+        "components": "/api/components?limit=100",
+        "threads": "/api/forum/threads?limit=100",
+        "replies": f"/api/forum/threads/{thread_id}/replies?limit=200",
+        "thread": f"/api/forum/threads/{thread_id}?reply_limit=200",
+    }
+    print(f"encoder: {'orjson' if fast_json.orjson else 'stdlib json'}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        print(f"{'endpoint':<12}{'path':<11}{'rows/s':>10}{'p50 ms':>9}{'p99 ms':>9}  same body")
+        for name, url in endpoints.items():
+            bodies = {}
+            for path in PATHS:
+                settings.fast_serialization = path == "fast"
+                await _measure(http, url, 5)  # warm up
+                r = await _measure(http, url, requests)
+                bodies[path] = r["body"]
+                same = "" if path == "validated" else ("yes" if bodies["fast"] == bodies["validated"] else "NO")
+                print(f"{name:<12}{path:<11}{r['rows_per_second']:>10}{r['p50_ms']:>9}{r['p99_ms']:>9}  {same}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=200)
+    parser.add_argument("--replies", type=int, default=200)
+    args = parser.parse_args()
+
+    # Settings are read at import, so the URL must be set first
+    os.environ["DATABASE_URL"] = args.database_url
+    asyncio.run(_run(args.requests, args.threads, args.replies))
+
+
+if __name__ == "__main__":
+    main()
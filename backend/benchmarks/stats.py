@@ -0,0 +1,11 @@
+"""
+Latency statistics shared by the benchmarks.
+"""
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of samples (0.0 when empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
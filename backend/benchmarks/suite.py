@@ -0,0 +1,457 @@
+"""
+Endpoint benchmark suite with JSON baselines.
+
+Drives every API endpoint through the ASGI app in-process, one endpoint at
+a time, against a synthetic catalog (see benchmarks.catalog). For each
+endpoint it reports throughput, latency percentiles and SQL statements per
+request, counted on every engine, so a change that adds a query per row
+shows up even when latency hides it.
+
+Event streams (/api/forum/events, /api/prices/stream) stay open
+indefinitely and are skipped. Write endpoints add rows, so regenerate the
+catalog when runs must be strictly comparable. SQLite allows one writer at
+a time, so endpoints whose writes are heavy enough to hit "database is
+locked" (price feeds) run one request at a time there; each result records
+the concurrency it ran at. Errors are counted by status code.
+
+    cd backend
+    python -m benchmarks.suite --size 10k --generate --save
+    python -m benchmarks.suite --size 10k --compare benchmarks/baselines/10k-sqlite.json
+
+With --compare, the exit status is 1 when an endpoint's p99 grew past
+--threshold or it issues more queries per request than the baseline.
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from .catalog import BENCH_USER, SIZES, generate_catalog
+from .stats import percentile
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+SKIPPED_ROUTES = {
+    ("GET", "/api/forum/events"): "event stream",
+    ("GET", "/api/prices/stream"): "event stream",
+}
+
+
+class QueryCounter:
+    """Counts statements executed on any engine, sync or async"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def install(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        event.listen(Engine, "before_cursor_execute", self)
+
+
+@dataclass
+class Context:
+    """Ids and state the request builders draw from"""
+    headers: Dict[str, str]
+    component_ids: List[int]
+    by_category: Dict[str, List[int]]
+    thread_ids: List[int]
+    long_thread_id: int
+    cursors: Dict[str, str] = field(default_factory=dict)
+    # Rows created during setup for the delete endpoints to consume
+    doomed: Dict[str, deque] = field(default_factory=dict)
+    serial: itertools.count = field(default_factory=lambda: itertools.count(1))
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    route: str
+    build: Callable[[Context, random.Random], dict]
+    # Run one request at a time on SQLite, whose single writer lock they would contend for
+    sqlite_serial: bool = False
+
+
+def _get(url):
+    return lambda ctx, rng: {"url": url}
+
+
+def _authed(build):
+    return lambda ctx, rng: {**build(ctx, rng), "headers": ctx.headers}
+
+
+def _build_components(ctx, rng):
+    return {slug: rng.choice(ctx.by_category[slug]) for slug in ("cpu", "motherboard", "ram", "psu", "gpu", "storage")}
+
+
+def _feed(ctx, rng):
+    rows = "".join(f"{rng.choice(ctx.component_ids)},1,{rng.randint(1000, 90000)},true\n" for _ in range(100))
+    return {
+        "url": "/api/price-feeds",
+        "files": {"file": ("feed.csv", io.BytesIO(("component_id,vendor_id,price,in_stock\n" + rows).encode()), "text/csv")},
+    }
+
+
+ENDPOINTS = [
+    # Auth
+    Endpoint("auth.login", "POST", "/api/auth/login", lambda ctx, rng: {
+        "url": "/api/auth/login", "data": {"username": BENCH_USER["email"], "password": BENCH_USER["password"]},
+    }),
+    Endpoint("auth.register", "POST", "/api/auth/register", lambda ctx, rng: {
+        "url": "/api/auth/register",
+        "json": {"email": f"bench-{os.getpid()}-{next(ctx.serial)}@bench.pcease.in",
+                 "username": f"b{os.getpid()}x{next(ctx.serial)}", "password": "bench123"},
+    }),
+    Endpoint("auth.me", "GET", "/api/auth/me", _authed(_get("/api/auth/me"))),
+    # Catalog
+    Endpoint("categories.list", "GET", "/api/categories", _get("/api/categories")),
+    Endpoint("categories.create", "POST", "/api/categories", lambda ctx, rng: {
+        "url": "/api/categories", "json": {"name": f"Bench {os.getpid()}-{next(ctx.serial)}",
+                                           "slug": f"bench-{os.getpid()}-{next(ctx.serial)}"},
+    }),
+    Endpoint("vendors.list", "GET", "/api/vendors", _get("/api/vendors")),
+    Endpoint("vendors.create", "POST", "/api/vendors", lambda ctx, rng: {
+        "url": "/api/vendors", "json": {"name": f"Bench vendor {os.getpid()}-{next(ctx.serial)}"},
+    }),
+    Endpoint("components.list", "GET", "/api/components", lambda ctx, rng: {
+        "url": f"/api/components?limit=100&skip={rng.randint(0, 500)}",
+    }),
+    Endpoint("components.list.category", "GET", "/api/components", lambda ctx, rng: {
+        "url": f"/api/components?category={rng.choice(list(ctx.by_category))}&sort=price-high&limit=50",
+    }),
+    Endpoint("components.list.cursor", "GET", "/api/components", lambda ctx, rng: {
+        "url": "/api/components", "params": {"limit": 100, "cursor": ctx.cursors["components"]},
+    }),
+    Endpoint("components.list.search", "GET", "/api/components", lambda ctx, rng: {
+        "url": "/api/components",
+        "params": {"search": rng.choice(["ryzen 7", "rtx 4070", "ddr5", "nvme", "850w", "b650"]), "sort": "relevance"},
+    }),
+    Endpoint("components.list.spec", "GET", "/api/components", lambda ctx, rng: {
+        "url": "/api/components", "params": {"category": "cpu", "spec": [f"tdp<={rng.choice([65, 105, 125])}", "socket=AM5"]},
+    }),
+    Endpoint("components.facets", "GET", "/api/components/facets", lambda ctx, rng: {
+        "url": "/api/components/facets", "params": {"category": rng.choice(list(ctx.by_category))},
+    }),
+    Endpoint("components.detail", "GET", "/api/components/{component_id}", lambda ctx, rng: {
+        "url": f"/api/components/{rng.choice(ctx.component_ids)}",
+    }),
+    Endpoint("components.price_history", "GET", "/api/components/{component_id}/price-history", lambda ctx, rng: {
+        "url": f"/api/components/{rng.choice(ctx.component_ids)}/price-history",
+    }),
+    Endpoint("components.create", "POST", "/api/components", lambda ctx, rng: {
+        "url": "/api/components",
+        "json": {"name": f"Bench part {next(ctx.serial)}", "brand": "Bench", "category_id": 1, "specs": {"tdp": 65}},
+    }),
+    Endpoint("price_feeds.upload", "POST", "/api/price-feeds", _feed, sqlite_serial=True),
+    Endpoint("stats", "GET", "/api/stats", _get("/api/stats")),
+    Endpoint("stats.cache", "GET", "/api/stats/cache", _get("/api/stats/cache")),
+    # Builds
+    Endpoint("builds.list", "GET", "/api/builds", _authed(_get("/api/builds"))),
+    Endpoint("builds.create", "POST", "/api/builds", _authed(lambda ctx, rng: {
+        "url": "/api/builds", "json": {"name": "Bench build", "components": _build_components(ctx, rng)},
+    })),
+    Endpoint("builds.price", "POST", "/api/builds/price", lambda ctx, rng: {
+        "url": "/api/builds/price", "json": {"components": _build_components(ctx, rng)},
+    }),
+    Endpoint("builds.delete", "DELETE", "/api/builds/{build_id}", _authed(lambda ctx, rng: {
+        "url": f"/api/builds/{ctx.doomed['builds'].popleft()}",
+    })),
+    Endpoint("compatibility.check", "POST", "/api/compatibility/check", lambda ctx, rng: {
+        "url": "/api/compatibility/check", "json": {"components": _build_components(ctx, rng)},
+    }),
+    Endpoint("advisor.recommend", "POST", "/api/advisor/recommend", lambda ctx, rng: {
+        "url": "/api/advisor/recommend",
+        "json": {"budget": rng.choice([60000, 100000, 150000, 250000]),
+                 "profile": rng.choice(["gaming", "workstation", "budget"])},
+    }),
+    # Forum
+    Endpoint("forum.threads", "GET", "/api/forum/threads", lambda ctx, rng: {
+        "url": f"/api/forum/threads?sort={rng.choice(['newest', 'activity'])}",
+    }),
+    Endpoint("forum.threads.cursor", "GET", "/api/forum/threads", lambda ctx, rng: {
+        "url": "/api/forum/threads", "params": {"sort": "activity", "cursor": ctx.cursors["threads"]},
+    }),
+    Endpoint("forum.threads.search", "GET", "/api/forum/threads", lambda ctx, rng: {
+        "url": "/api/forum/threads",
+        "params": {"search": rng.choice(["ryzen", "bios update", "worth it", "gaming"]), "sort": "relevance"},
+    }),
+    Endpoint("forum.thread", "GET", "/api/forum/threads/{thread_id}", lambda ctx, rng: {
+        "url": f"/api/forum/threads/{rng.choice(ctx.thread_ids)}",
+    }),
+    Endpoint("forum.thread.long", "GET", "/api/forum/threads/{thread_id}", lambda ctx, rng: {
+        "url": f"/api/forum/threads/{ctx.long_thread_id}",
+    }),
+    Endpoint("forum.thread.header", "GET", "/api/forum/threads/{thread_id}/header", lambda ctx, rng: {
+        "url": f"/api/forum/threads/{rng.choice(ctx.thread_ids)}/header",
+    }),
+    Endpoint("forum.replies", "GET", "/api/forum/threads/{thread_id}/replies", lambda ctx, rng: {
+        "url": f"/api/forum/threads/{ctx.long_thread_id}/replies",
+        "params": {"limit": 100, "cursor": ctx.cursors["replies"]},
+    }),
+    Endpoint("forum.threads.create", "POST", "/api/forum/threads", _authed(lambda ctx, rng: {
+        "url": "/api/forum/threads", "json": {"title": "Bench thread", "content": "Benchmark post", "category": "Discussion"},
+    })),
+    Endpoint("forum.replies.create", "POST", "/api/forum/threads/{thread_id}/replies", _authed(lambda ctx, rng: {
+        "url": f"/api/forum/threads/{rng.choice(ctx.thread_ids)}/replies", "json": {"content": "Benchmark reply"},
+    })),
+    Endpoint("forum.threads.delete", "DELETE", "/api/forum/threads/{thread_id}", _authed(lambda ctx, rng: {
+        "url": f"/api/forum/threads/{ctx.doomed['threads'].popleft()}",
+    })),
+    # Price watches
+    Endpoint("watches.list", "GET", "/api/watches", _authed(_get("/api/watches"))),
+    Endpoint("watches.create", "POST", "/api/watches", _authed(lambda ctx, rng: {
+        "url": "/api/watches", "json": {"component_id": rng.choice(ctx.component_ids), "target_price": 100},
+    })),
+    Endpoint("watches.delete", "DELETE", "/api/watches/{watch_id}", _authed(lambda ctx, rng: {
+        "url": f"/api/watches/{ctx.doomed['watches'].popleft()}",
+    })),
+    Endpoint("watches.notifications", "GET", "/api/watches/notifications", _authed(_get("/api/watches/notifications"))),
+]
+
+
+async def _setup(http, requests: int) -> Context:
+    """Sign in, sample ids, fetch cursors and create the rows the delete endpoints remove"""
+    from app.database import SessionLocal
+    from app.models.component import Category, Component
+    from app.models.forum import ForumThread
+
+    response = await http.post("/api/auth/login", data={"username": BENCH_USER["email"], "password": BENCH_USER["password"]})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    db = SessionLocal()
+    try:
+        # The same ids every run, so per-request query counts are comparable
+        rng = random.Random(0)
+        def sample(query):
+            ids = sorted(i for (i,) in query)
+            return rng.sample(ids, k=min(2000, len(ids)))
+        by_category = {
+            slug: sample(db.query(Component.id).join(Category).filter(Category.slug == slug))
+            for (slug,) in db.query(Category.slug).filter(Category.slug.in_(
+                ["cpu", "gpu", "motherboard", "ram", "storage", "psu", "pcCase", "monitor"]
+            ))
+        }
+        ctx = Context(
+            headers=headers,
+            component_ids=[i for ids in by_category.values() for i in ids],
+            by_category=by_category,
+            thread_ids=sample(db.query(ForumThread.id)),
+            long_thread_id=db.query(ForumThread.id).order_by(ForumThread.reply_count.desc()).first()[0],
+        )
+    finally:
+        db.close()
+
+    for name, url, params in [
+        ("components", "/api/components", {"limit": 100}),
+        ("threads", "/api/forum/threads", {"sort": "activity"}),
+        ("replies", f"/api/forum/threads/{ctx.long_thread_id}/replies", {"limit": 10}),
+    ]:
+        ctx.cursors[name] = (await http.get(url, params=params)).headers.get("X-Next-Cursor")
+
+    ctx.doomed = {"builds": deque(), "threads": deque(), "watches": deque()}
+    for _ in range(requests):
+        for kind, url, body in [
+            ("builds", "/api/builds", {"name": "Doomed build", "components": {}}),
+            ("threads", "/api/forum/threads", {"title": "Doomed thread", "content": "To be deleted"}),
+            ("watches", "/api/watches", {"component_id": ctx.component_ids[0], "target_price": 1}),
+        ]:
+            response = await http.post(url, json=body, headers=headers)
+            response.raise_for_status()
+            ctx.doomed[kind].append(response.json()["id"])
+    return ctx
+
+
+async def _measure(http, endpoint: Endpoint, ctx: Context, counter: QueryCounter, requests: int, concurrency: int,
+                   cold: bool) -> dict:
+    from app.services.catalog_cache import catalog_cache
+
+    rng = random.Random(endpoint.name)
+    latencies, errors = [], Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            kwargs = endpoint.build(ctx, rng)
+            if cold:
+                catalog_cache.clear()
+            started = time.perf_counter()
+            response = await http.request(endpoint.method, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] += 1
+
+    queries_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(errors.values()),
+        "error_statuses": dict(errors),
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p90_ms": ms(percentile(latencies, 90)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(max(latencies)),
+        "queries_per_request": round((counter.count - queries_before) / requests, 2),
+    }
+
+
+def _uncovered_routes(app) -> List[str]:
+    from fastapi.routing import APIRoute
+    covered = {(e.method, e.route) for e in ENDPOINTS} | set(SKIPPED_ROUTES)
+    return [
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute) and route.path.startswith("/api/")
+        for method in route.methods if (method, route.path) not in covered
+    ]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _run(args) -> dict:
+    import httpx
+    from app.config import settings
+    from app.database import SessionLocal, get_engine
+    from app.main import app
+    from app.models.component import Component
+
+    db = SessionLocal()
+    try:
+        components = db.query(Component).count()
+    finally:
+        db.close()
+    if components == 0:
+        if not args.generate:
+            raise SystemExit("The database is empty; pass --generate to build the synthetic catalog")
+        print(f"Generating a {args.size} catalog...")
+        print(generate_catalog(args.components or SIZES[args.size]))
+        components = args.components or SIZES[args.size]
+
+    uncovered = _uncovered_routes(app)
+    if uncovered:
+        print(f"⚠️  Endpoints without a benchmark: {', '.join(uncovered)}")
+
+    counter = QueryCounter()
+    counter.install()
+    endpoints = [e for e in ENDPOINTS if not args.only or any(part in e.name for part in args.only)]
+    results = {}
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        ctx = await _setup(http, args.requests + 5)
+        print(f"{'endpoint':<28}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+        serial = get_engine().dialect.name == "sqlite"
+        for endpoint in endpoints:
+            concurrency = 1 if serial and endpoint.sqlite_serial else args.concurrency
+            await _measure(http, endpoint, ctx, counter, 5, 1, args.cold)  # warm up
+            r = await _measure(http, endpoint, ctx, counter, args.requests, concurrency, args.cold)
+            results[endpoint.name] = r
+            print(f"{endpoint.name:<28}{r['rps']:>9}{r['p50_ms']:>9}{r['p90_ms']:>9}{r['p99_ms']:>9}"
+                  f"{r['queries_per_request']:>9}{r['errors']:>8}")
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "database": get_engine().dialect.name,
+            "components": components,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cold_cache": args.cold,
+            "python": platform.python_version(),
+            "settings": {
+                "async_database": settings.async_database,
+                "fast_serialization": settings.fast_serialization,
+                "bcrypt_rounds": settings.bcrypt_rounds,
+            },
+        },
+        "endpoints": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Print per-endpoint changes against a baseline; returns the regressions"""
+    regressions = []
+    print(f"\n{'endpoint':<28}{'p99 ms':>18}{'req/s':>18}{'queries':>14}")
+    for name, r in results["endpoints"].items():
+        base = baseline["endpoints"].get(name)
+        if base is None:
+            print(f"{name:<28}{'(new)':>18}")
+            continue
+        slower = r["p99_ms"] > base["p99_ms"] * (1 + threshold)
+        more_queries = r["queries_per_request"] > base["queries_per_request"] + 0.1
+        flag = " ⚠️" if slower or more_queries else ""
+        print(f"{name:<28}{base['p99_ms']:>8} → {r['p99_ms']:<7}{base['rps']:>8} → {r['rps']:<7}"
+              f"{base['queries_per_request']:>5} → {r['queries_per_request']:<6}{flag}")
+        if slower:
+            regressions.append(f"{name}: p99 {base['p99_ms']} → {r['p99_ms']} ms")
+        if more_queries:
+            regressions.append(f"{name}: {base['queries_per_request']} → {r['queries_per_request']} queries/request")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size", choices=SIZES, default="10k")
+    parser.add_argument("--components", type=int, help="exact component count when generating")
+    parser.add_argument("--database-url", help="defaults to sqlite:///./benchmark-<size>.db")
+    parser.add_argument("--generate", action="store_true", help="generate the catalog if the database is empty")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--cold", action="store_true", help="clear the catalog cache before every request")
+    parser.add_argument("--only", nargs="+", help="endpoint name substrings to run")
+    parser.add_argument("--save", nargs="?", const="", metavar="PATH",
+                        help="write results as a baseline (default baselines/<size>-<database>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p99 growth before flagging")
+    args = parser.parse_args()
+
+    # Settings are read at import, so the URL and pool size must be set first
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///./benchmark-{args.size}.db"
+    os.environ.setdefault("DATABASE_POOL_SIZE", str(args.concurrency + 2))
+    results = asyncio.run(_run(args))
+
+    if args.save is not None:
+        path = args.save or os.path.join(BASELINE_DIR, f"{args.size}-{results['meta']['database']}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
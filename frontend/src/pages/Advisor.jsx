@@ -1,38 +1,49 @@
 import { useState } from 'react'
 import { Link } from 'react-router-dom'
+import { getBuildRecommendation } from '../services/api'
 import './Advisor.css'
 
+// Each use case maps to one of the optimizer's scoring profiles
 const useCases = [
-    { id: 'gaming', name: 'Gaming', desc: 'High FPS, ray tracing' },
-    { id: 'productivity', name: 'Productivity', desc: 'Office, multitasking' },
-    { id: 'content', name: 'Content Creation', desc: 'Video editing, 3D' },
-    { id: 'budget', name: 'Budget Build', desc: 'Best value for money' }
+    { id: 'gaming', name: 'Gaming', desc: 'High FPS, ray tracing', profile: 'gaming' },
+    { id: 'productivity', name: 'Productivity', desc: 'Office, multitasking', profile: 'workstation' },
+    { id: 'content', name: 'Content Creation', desc: 'Video editing, 3D', profile: 'workstation' },
+    { id: 'budget', name: 'Budget Build', desc: 'Best value for money', profile: 'budget' }
 ]
 
+const slotNames = {
+    cpu: 'CPU', gpu: 'GPU', ram: 'RAM', motherboard: 'Motherboard',
+    storage: 'Storage', psu: 'PSU', pcCase: 'Case'
+}
+
 export default function Advisor() {
     const [budget, setBudget] = useState(50000)
     const [useCase, setUseCase] = useState('gaming')
     const [loading, setLoading] = useState(false)
     const [recommendation, setRecommendation] = useState(null)
+    const [error, setError] = useState('')
 
     const getRecommendation = async () => {
+        const selected = useCases.find(u => u.id === useCase)
         setLoading(true)
-        // Simulated AI recommendation - in production, call backend
-        await new Promise(r => setTimeout(r, 1500))
-
-        setRecommendation({
-            title: `${useCases.find(u => u.id === useCase)?.name} Build`,
-            budget: budget,
-            components: [
-                { category: 'CPU', name: budget > 80000 ? 'AMD Ryzen 7 7700X' : 'AMD Ryzen 5 5600', price: budget > 80000 ? 28000 : 12000 },
-                { category: 'GPU', name: budget > 80000 ? 'RTX 4070' : 'RTX 4060', price: budget > 80000 ? 52000 : 30000 },
-                { category: 'RAM', name: '16GB DDR5 5600MHz', price: 5000 },
-                { category: 'Motherboard', name: 'B650 Gaming', price: 15000 },
-                { category: 'Storage', name: '1TB NVMe SSD', price: 6000 },
-                { category: 'PSU', name: '650W 80+ Gold', price: 6000 }
-            ]
-        })
-        setLoading(false)
+        setError('')
+        try {
+            const result = await getBuildRecommendation(budget, selected.profile)
+            setRecommendation({
+                title: `${selected.name} Build`,
+                budget: budget,
+                components: Object.entries(result.components).map(([slot, comp]) => ({
+                    category: slotNames[slot] || slot,
+                    name: comp.name,
+                    price: parseFloat(comp.price)
+                }))
+            })
+        } catch (e) {
+            setRecommendation(null)
+            setError(e.message)
+        } finally {
+            setLoading(false)
+        }
     }
 
     const totalPrice = recommendation?.components.reduce((s, c) => s + c.price, 0) || 0
@@ -85,6 +96,7 @@ export default function Advisor() {
                         >
                             {loading ? 'Analyzing...' : 'Get Recommendations'}
                         </button>
+                        {error && <div className="advisor-error">{error}</div>}
                     </section>
 
                     {recommendation && (
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react'
 import { useSearchParams } from 'react-router-dom'
-import { getComponents, getCategories, formatPrice, getLowestPrice } from '../services/api'
+import { getComponents, getComponentFacets, getCategories, formatPrice, getLowestPrice } from '../services/api'
 import './Browse.css'
 
 const categoryNames = {
@@ -14,19 +14,31 @@ export default function Browse() {
     const [loading, setLoading] = useState(true)
     const [search, setSearch] = useState('')
     const [category, setCategory] = useState(searchParams.get('category') || '')
+    const [brand, setBrand] = useState('')
     const [sort, setSort] = useState('price-low')
+    const [facets, setFacets] = useState(null)
     const [detail, setDetail] = useState(null)
 
     useEffect(() => {
         setLoading(true)
-        getComponents({ category, search, sort })
+        getComponents({ category, brand, search, sort })
             .then(setComponents)
             .catch(() => setComponents([]))
             .finally(() => setLoading(false))
-    }, [category, search, sort])
+    }, [category, brand, search, sort])
+
+    // Counts per category and brand for the current filters
+    useEffect(() => {
+        getComponentFacets({ category, brand, search })
+            .then(setFacets)
+            .catch(() => setFacets(null))
+    }, [category, brand, search])
+
+    const facetCount = (list, value) => list?.find(f => f.value === value)?.count ?? 0
 
     const handleCategoryChange = (cat) => {
         setCategory(cat)
+        setBrand('')
         if (cat) {
             setSearchParams({ category: cat })
         } else {
@@ -58,17 +70,26 @@ export default function Browse() {
                         <button
                             className={`chip ${!category ? 'active' : ''}`}
                             onClick={() => handleCategoryChange('')}
-                        >All</button>
+                        >All{facets && <span className="chip-count">{facets.categories.reduce((sum, f) => sum + f.count, 0)}</span>}</button>
                         {Object.entries(categoryNames).map(([key, name]) => (
                             <button
                                 key={key}
                                 className={`chip ${category === key ? 'active' : ''}`}
                                 onClick={() => handleCategoryChange(key)}
-                            >{name}</button>
+                            >
+                                {name}
+                                {facets && <span className="chip-count">{facetCount(facets.categories, key)}</span>}
+                            </button>
                         ))}
                     </div>
 
                     <div className="filter-row">
+                        <select value={brand} onChange={e => setBrand(e.target.value)}>
+                            <option value="">All brands</option>
+                            {facets?.brands.map(b => (
+                                <option key={b.value} value={b.value}>{b.value} ({b.count})</option>
+                            ))}
+                        </select>
                         <select value={sort} onChange={e => setSort(e.target.value)}>
                             <option value="price-low">Price: Low to High</option>
                             <option value="price-high">Price: High to Low</option>
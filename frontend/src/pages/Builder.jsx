@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react'
-import { getComponents, formatPrice, getLowestPrice, saveBuild } from '../services/api'
+import { getComponents, formatPrice, getLowestPrice, saveBuild, priceBuild, subscribePrices, checkCompatibility } from '../services/api'
 import { useAuth } from '../context/AuthContext'
 import './Builder.css'
 
@@ -23,6 +23,54 @@ export default function Builder() {
     const [loading, setLoading] = useState(false)
     const [saving, setSaving] = useState(false)
     const [buildName, setBuildName] = useState('My Build')
+    const [pricing, setPricing] = useState(null)
+    const [compatibility, setCompatibility] = useState(null)
+    // Bumped when a pushed price change makes the current pricing stale
+    const [priceVersion, setPriceVersion] = useState(0)
+
+    // Live total from the server, which prices the whole build in one query
+    useEffect(() => {
+        if (!Object.keys(components).length) {
+            setPricing(null)
+            return
+        }
+        let cancelled = false
+        priceBuild(components)
+            .then(result => { if (!cancelled) setPricing(result) })
+            .catch(() => { if (!cancelled) setPricing(null) })
+        return () => { cancelled = true }
+    }, [components, priceVersion])
+
+    // Re-check compatibility whenever the selection changes
+    useEffect(() => {
+        if (Object.keys(components).length < 2) {
+            setCompatibility(null)
+            return
+        }
+        let cancelled = false
+        checkCompatibility(components)
+            .then(result => { if (!cancelled) setCompatibility(result) })
+            .catch(() => { if (!cancelled) setCompatibility(null) })
+        return () => { cancelled = true }
+    }, [components])
+
+    // Re-price only when the server pushes a changed lowest price
+    useEffect(() => {
+        const ids = Object.values(components)
+        if (!ids.length) return
+        const events = subscribePrices(ids)
+        let snapshot = true
+        events.addEventListener('prices', () => {
+            // The snapshot matches what was just priced, except after a reconnect
+            if (snapshot) {
+                snapshot = false
+                return
+            }
+            setPriceVersion(v => v + 1)
+        })
+        events.addEventListener('evicted', () => setPriceVersion(v => v + 1))
+        return () => events.close()
+    }, [components])
 
     const openSlotModal = async (slotKey) => {
         setActiveSlot(slotKey)
@@ -56,9 +104,10 @@ export default function Builder() {
         })
     }
 
-    const totalPrice = Object.values(build).reduce((sum, comp) => {
-        return sum + (getLowestPrice(comp) || 0)
-    }, 0)
+    const totalPrice = pricing
+        ? parseFloat(pricing.total_price)
+        : Object.values(build).reduce((sum, comp) => sum + (getLowestPrice(comp) || 0), 0)
+    const bestVendor = pricing?.vendors.find(v => v.missing_component_ids.length === 0)
 
     const handleSave = async () => {
         if (!user) {
@@ -143,6 +192,30 @@ export default function Builder() {
                             <span>Total</span>
                             <span className="price">{formatPrice(totalPrice)}</span>
                         </div>
+                        {bestVendor && (
+                            <div className="single-vendor-price">
+                                <span>All from {bestVendor.vendor_name}</span>
+                                <span>{formatPrice(parseFloat(bestVendor.total))}</span>
+                            </div>
+                        )}
+                        {compatibility && (
+                            <div className="compatibility">
+                                <div className={`compatibility-status ${compatibility.compatible ? 'ok' : 'error'}`}>
+                                    {compatibility.compatible ? 'Compatible' : 'Compatibility problems'}
+                                </div>
+                                {compatibility.issues.length > 0 && (
+                                    <ul className="compatibility-issues">
+                                        {compatibility.issues.map((issue, i) => (
+                                            <li key={i} className={issue.severity}>{issue.message}</li>
+                                        ))}
+                                    </ul>
+                                )}
+                                <div className="compatibility-wattage">
+                                    Estimated draw {compatibility.estimated_wattage}W
+                                    · recommended PSU {compatibility.recommended_psu_wattage}W
+                                </div>
+                            </div>
+                        )}
                     </aside>
                 </div>
 
@@ -1,30 +1,94 @@
 import { useState, useEffect } from 'react'
-import { getThreads, getThread, createThread, createReply } from '../services/api'
+import { getThreads, getThread, getReplies, createThread, createReply, subscribeForumEvents } from '../services/api'
 import { useAuth } from '../context/AuthContext'
 import { Link } from 'react-router-dom'
 import './Forum.css'
 
 const categories = ['All', 'Build Help', 'Troubleshooting', 'Discussion', 'Showcase']
 
+// Wait for a pause in typing before searching (and reopening the event stream)
+const SEARCH_DEBOUNCE_MS = 300
+
+// Search snippet with matched words wrapped in <mark>
+function Snippet({ snippet }) {
+    const parts = []
+    let pos = 0
+    snippet.highlights.forEach(([start, end]) => {
+        parts.push(snippet.text.slice(pos, start))
+        parts.push(<mark key={start}>{snippet.text.slice(start, end)}</mark>)
+        pos = end
+    })
+    parts.push(snippet.text.slice(pos))
+    return <p className="thread-snippet">{parts}</p>
+}
+
 export default function Forum() {
     const { user } = useAuth()
     const [threads, setThreads] = useState([])
     const [loading, setLoading] = useState(true)
     const [category, setCategory] = useState('All')
+    const [sort, setSort] = useState('activity')
+    const [query, setQuery] = useState('')
+    const [search, setSearch] = useState('')
     const [activeThread, setActiveThread] = useState(null)
     const [showNewThread, setShowNewThread] = useState(false)
     const [newThread, setNewThread] = useState({ title: '', content: '', category: 'Discussion' })
     const [newReply, setNewReply] = useState('')
 
+    useEffect(() => {
+        const timer = setTimeout(() => {
+            const text = query.trim()
+            setSearch(text)
+            // "Best Match" is only offered while searching
+            if (!text) setSort(prev => prev === 'relevance' ? 'activity' : prev)
+        }, SEARCH_DEBOUNCE_MS)
+        return () => clearTimeout(timer)
+    }, [query])
+
     useEffect(() => {
         loadThreads()
-    }, [category])
+    }, [category, sort, search])
+
+    // Live updates instead of polling; search results are left as fetched
+    useEffect(() => {
+        if (search) return
+        const events = subscribeForumEvents()
+        events.addEventListener('thread', e => {
+            const thread = JSON.parse(e.data)
+            if (category !== 'All' && thread.category !== category) return
+            setThreads(prev => prev.some(t => t.id === thread.id) ? prev : [thread, ...prev])
+        })
+        events.addEventListener('reply', e => {
+            const reply = JSON.parse(e.data)
+            setThreads(prev => {
+                const thread = prev.find(t => t.id === reply.thread_id)
+                if (!thread) return prev
+                const updated = {
+                    ...thread,
+                    reply_count: thread.reply_count + 1,
+                    last_reply_at: reply.created_at,
+                    last_activity_at: reply.created_at
+                }
+                const rest = prev.filter(t => t.id !== reply.thread_id)
+                return sort === 'activity' ? [updated, ...rest] : prev.map(t => t === thread ? updated : t)
+            })
+            setActiveThread(prev => {
+                if (!prev || prev.id !== reply.thread_id || prev.replies.some(r => r.id === reply.id)) return prev
+                // Unloaded pages come before this reply; it arrives with them via "Load more"
+                const replies = prev.next_replies_cursor ? prev.replies : [...prev.replies, reply]
+                return { ...prev, replies, reply_count: prev.reply_count + 1 }
+            })
+        })
+        // Dropped as a slow consumer: the browser reconnects, so catch up on what was missed
+        events.addEventListener('evicted', () => loadThreads())
+        return () => events.close()
+    }, [category, sort, search])
 
     const loadThreads = async () => {
         setLoading(true)
         try {
             const cat = category === 'All' ? '' : category
-            const data = await getThreads({ category: cat })
+            const data = await getThreads({ category: cat, sort, search })
             setThreads(data)
         } catch {
             setThreads([])
@@ -42,6 +106,19 @@ export default function Forum() {
         }
     }
 
+    const loadMoreReplies = async () => {
+        try {
+            const { replies, nextCursor } = await getReplies(activeThread.id, activeThread.next_replies_cursor)
+            setActiveThread(prev => ({
+                ...prev,
+                replies: [...prev.replies, ...replies],
+                next_replies_cursor: nextCursor
+            }))
+        } catch {
+            alert('Failed to load replies')
+        }
+    }
+
     const handleCreateThread = async (e) => {
         e.preventDefault()
         if (!user) {
@@ -88,6 +165,14 @@ export default function Forum() {
                     )}
                 </header>
 
+                <input
+                    type="search"
+                    placeholder="Search threads and replies..."
+                    value={query}
+                    onChange={e => setQuery(e.target.value)}
+                    className="forum-search"
+                />
+
                 <div className="forum-filters">
                     {categories.map(cat => (
                         <button
@@ -96,6 +181,11 @@ export default function Forum() {
                             onClick={() => setCategory(cat)}
                         >{cat}</button>
                     ))}
+                    <select className="forum-sort" value={sort} onChange={e => setSort(e.target.value)}>
+                        <option value="activity">Recent Activity</option>
+                        <option value="newest">Newest</option>
+                        {search && <option value="relevance">Best Match</option>}
+                    </select>
                 </div>
 
                 <section className="threads-list">
@@ -111,10 +201,11 @@ export default function Forum() {
                         <article key={thread.id} className="thread-item card" onClick={() => openThread(thread.id)}>
                             <span className="thread-cat">{thread.category}</span>
                             <h3>{thread.title}</h3>
+                            {thread.snippet && <Snippet snippet={thread.snippet} />}
                             <div className="thread-meta">
                                 <span>by {thread.author_username}</span>
                                 <span>{thread.reply_count} replies</span>
-                                <span>{new Date(thread.created_at).toLocaleDateString()}</span>
+                                <span>{new Date(thread.last_activity_at || thread.created_at).toLocaleDateString()}</span>
                             </div>
                         </article>
                     ))}
@@ -185,7 +276,7 @@ export default function Forum() {
                                 </div>
 
                                 <div className="replies-section">
-                                    <h4>{activeThread.replies?.length || 0} Replies</h4>
+                                    <h4>{activeThread.reply_count} Replies</h4>
                                     {activeThread.replies?.map(reply => (
                                         <div key={reply.id} className="reply-item">
                                             <div className="reply-meta">
@@ -195,6 +286,11 @@ export default function Forum() {
                                             <p>{reply.content}</p>
                                         </div>
                                     ))}
+                                    {activeThread.next_replies_cursor && (
+                                        <button type="button" className="btn btn-ghost" onClick={loadMoreReplies}>
+                                            Load more replies
+                                        </button>
+                                    )}
                                 </div>
 
                                 {user && (
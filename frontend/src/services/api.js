@@ -41,11 +41,24 @@ export async function getComponents(params = {}) {
     if (params.category) query.append('category', params.category)
     if (params.brand) query.append('brand', params.brand)
     if (params.search) query.append('search', params.search)
+    if (params.minPrice) query.append('min_price', params.minPrice)
+    if (params.maxPrice) query.append('max_price', params.maxPrice)
     if (params.sort) query.append('sort', params.sort)
 
     return authFetch(`/components?${query}`)
 }
 
+export async function getComponentFacets(params = {}) {
+    const query = new URLSearchParams()
+    if (params.category) query.append('category', params.category)
+    if (params.brand) query.append('brand', params.brand)
+    if (params.search) query.append('search', params.search)
+    if (params.minPrice) query.append('min_price', params.minPrice)
+    if (params.maxPrice) query.append('max_price', params.maxPrice)
+
+    return authFetch(`/components/facets?${query}`)
+}
+
 export async function getComponent(id) {
     return authFetch(`/components/${id}`)
 }
@@ -55,6 +68,22 @@ export async function getVendors() {
     return authFetch('/vendors')
 }
 
+// ========== Compatibility ==========
+export async function checkCompatibility(components) {
+    return authFetch('/compatibility/check', {
+        method: 'POST',
+        body: JSON.stringify({ components })
+    })
+}
+
+// ========== Advisor ==========
+export async function getBuildRecommendation(budget, profile) {
+    return authFetch('/advisor/recommend', {
+        method: 'POST',
+        body: JSON.stringify({ budget, profile })
+    })
+}
+
 // ========== Builds ==========
 export async function getBuilds() {
     return authFetch('/builds')
@@ -67,6 +96,20 @@ export async function saveBuild(build) {
     })
 }
 
+export async function priceBuild(components) {
+    return authFetch('/builds/price', {
+        method: 'POST',
+        body: JSON.stringify({ components })
+    })
+}
+
+// Server-sent lowest-price changes for a build's components; the first event is a snapshot
+export function subscribePrices(componentIds) {
+    const query = new URLSearchParams()
+    componentIds.forEach(id => query.append('ids', id))
+    return new EventSource(`${API_BASE}/prices/stream?${query}`)
+}
+
 export async function deleteBuild(id) {
     return authFetch(`/builds/${id}`, { method: 'DELETE' })
 }
@@ -76,6 +119,7 @@ export async function getThreads(params = {}) {
     const query = new URLSearchParams()
     if (params.category) query.append('category', params.category)
     if (params.search) query.append('search', params.search)
+    if (params.sort) query.append('sort', params.sort)
 
     return authFetch(`/forum/threads?${query}`)
 }
@@ -84,6 +128,20 @@ export async function getThread(id) {
     return authFetch(`/forum/threads/${id}`)
 }
 
+// Next page of a thread's replies; the cursor for the page after it comes back in a header
+export async function getReplies(threadId, cursor) {
+    const query = new URLSearchParams({ cursor })
+    const res = await fetch(`${API_BASE}/forum/threads/${threadId}/replies?${query}`)
+    if (!res.ok) throw new Error('Failed to load replies')
+    return { replies: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') }
+}
+
+// Server-sent stream of new threads and replies (all threads, or one when threadId is given)
+export function subscribeForumEvents(threadId) {
+    const query = threadId ? `?thread_id=${threadId}` : ''
+    return new EventSource(`${API_BASE}/forum/events${query}`)
+}
+
 export async function createThread(thread) {
     return authFetch('/forum/threads', {
         method: 'POST',
@@ -109,6 +167,7 @@ export function formatPrice(price) {
 }
 
 export function getLowestPrice(component) {
+    if (component.price_summary) return parseFloat(component.price_summary.lowest_price) || null
     if (!component.prices?.length) return null
     return Math.min(...component.prices.map(p => parseFloat(p.price)))
 }